@@ -0,0 +1,140 @@
+"""
+Micro-benchmark: link extraction engines on the repo's saved HTML fixtures.
+
+Compares the lxml streaming extractor used by the httpx fetcher
+(`fetchers._StreamingLinkExtractor`) with the engines it replaced:
+  - bs4: BeautifulSoup(content, "html.parser") over the whole document
+  - html.parser stream: stdlib HTMLParser fed in chunks
+
+Every engine gets the same filtering (#, javascript:, mailto:, tel:), and
+the script checks that they all return the same links before timing them.
+
+Usage:
+    python scripts/benchmark_link_extraction.py [--repeat 5] [extra.html ...]
+"""
+
+import argparse
+import codecs
+import sys
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, List
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from mcp_doc_retriever.downloader.fetchers import (  # noqa: E402
+    NON_NAVIGATIONAL_PREFIXES,
+    STREAM_CHUNK_SIZE,
+    _StreamingLinkExtractor,
+)
+
+FIXTURE_GLOBS = [
+    "test_data/*.html",
+    "src/mcp_doc_retriever/context7/data/*.html",
+    "direct_test_downloads/content/*/*/*.html",
+    "manual_cli_test/*/content/*/*/*.html",
+]
+BASE_URL = "https://docs.example.com/section/page.html"
+
+
+def _keep(href: str) -> bool:
+    return bool(href) and not href.lower().startswith(NON_NAVIGATIONAL_PREFIXES)
+
+
+def extract_bs4(data: bytes) -> List[str]:
+    soup = BeautifulSoup(data, "html.parser")
+    base_tag = soup.find("base", href=True)
+    base = urljoin(BASE_URL, base_tag["href"]) if base_tag else BASE_URL
+    return [
+        urljoin(base, a["href"].strip())
+        for a in soup.find_all("a", href=True)
+        if _keep(a["href"].strip())
+    ]
+
+
+class _StdlibExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.hrefs: List[str] = []
+        self.base_href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.hrefs.append(href)
+        elif tag == "base" and self.base_href is None:
+            self.base_href = dict(attrs).get("href")
+
+
+def extract_html_parser_stream(data: bytes) -> List[str]:
+    parser = _StdlibExtractor()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for i in range(0, len(data), STREAM_CHUNK_SIZE):
+        parser.feed(decoder.decode(data[i : i + STREAM_CHUNK_SIZE]))
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    base = urljoin(BASE_URL, parser.base_href) if parser.base_href else BASE_URL
+    return [urljoin(base, h.strip()) for h in parser.hrefs if _keep(h.strip())]
+
+
+def extract_lxml_stream(data: bytes) -> List[str]:
+    extractor = _StreamingLinkExtractor(BASE_URL, "utf-8", fingerprint=False)
+    for i in range(0, len(data), STREAM_CHUNK_SIZE):
+        extractor.feed_bytes(data[i : i + STREAM_CHUNK_SIZE])
+    return extractor.close()
+
+
+ENGINES: Dict[str, Callable[[bytes], List[str]]] = {
+    "bs4 html.parser": extract_bs4,
+    "html.parser stream": extract_html_parser_stream,
+    "lxml stream": extract_lxml_stream,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("files", nargs="*", type=Path)
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in FIXTURE_GLOBS for p in REPO_ROOT.glob(pattern)})
+    paths += args.files
+    documents = [(p, p.read_bytes()) for p in paths]
+    total_bytes = sum(len(d) for _, d in documents)
+    print(f"{len(documents)} fixtures, {total_bytes / 1024:.0f} KiB total, {args.repeat} rounds\n")
+
+    # Same links from every engine (order included), or the timing is meaningless
+    for path, data in documents:
+        results = {name: fn(data) for name, fn in ENGINES.items()}
+        reference = results["bs4 html.parser"]
+        for name, links in results.items():
+            if links != reference:
+                print(f"WARNING: {name} differs from bs4 on {path.relative_to(REPO_ROOT) if path.is_relative_to(REPO_ROOT) else path}: "
+                      f"{len(links)} vs {len(reference)} links")
+
+    timings = {}
+    for name, fn in ENGINES.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for _, data in documents:
+                fn(data)
+        timings[name] = (time.perf_counter() - start) / args.repeat
+
+    baseline = timings["bs4 html.parser"]
+    print(f"{'engine':<20} {'ms/round':>10} {'MiB/s':>8} {'speedup':>8}")
+    for name, seconds in timings.items():
+        print(
+            f"{name:<20} {seconds * 1000:>10.1f} {total_bytes / seconds / 2**20:>8.1f} "
+            f"{baseline / seconds:>7.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
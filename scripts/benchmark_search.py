@@ -0,0 +1,153 @@
+"""
+Benchmark: perform_search latency versus number of matching pages.
+
+Builds a synthetic download of N pages (default 20,000) in a temporary
+directory, with its manifest and inverted index (as the fetch workflow
+does). In that download the keyword `bucketK` appears on K pages spread over
+the whole index. Each query asks for all K results, so result assembly
+handles every candidate.
+
+For each K the script reports the median latency and the time per candidate,
+and fits latency = a + b*K. Result assembly is linear when the per-candidate
+time stays flat and the fit explains the timings (R^2 close to 1). For
+comparison, it also times the record lookup that assembly used to do per
+result: a scan of all records with a resolve() each.
+
+Finally it removes the inverted index and times a query that needs a
+near-full keyword scan, scanning in this thread and then with process pools
+of the sizes given by --scan-processes (default: 2, 4, ... up to the core count).
+
+Usage:
+    python scripts/benchmark_search.py [--pages 20000] [--repeat 3] [--scan-processes 2,4]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from mcp_doc_retriever.searcher.inverted_index import build_inverted_index, inverted_index_path  # noqa: E402
+from mcp_doc_retriever.searcher.manifest import build_manifest, load_manifest  # noqa: E402
+from mcp_doc_retriever.searcher.scanner import shutdown_scan_pool  # noqa: E402
+from mcp_doc_retriever.searcher.searcher import SearchRequest, perform_search  # noqa: E402
+
+DOWNLOAD_ID = "bench"
+BUCKETS = [25, 100, 400, 1600]
+
+
+def build_download(base_dir: Path, pages: int) -> None:
+    host_dir = base_dir / "content" / DOWNLOAD_ID / "docs.example.com"
+    host_dir.mkdir(parents=True)
+    (base_dir / "index").mkdir()
+    with (base_dir / "index" / f"{DOWNLOAD_ID}.jsonl").open("w", encoding="utf-8") as f:
+        for i in range(pages):
+            words = " ".join(f"bucket{k}" for k in BUCKETS if i % (pages // k) == 0)
+            local_path = f"content/{DOWNLOAD_ID}/docs.example.com/page{i:05d}.html"
+            (base_dir / local_path).write_text(
+                f"<html><body><h1>Page {i}</h1><p>Reference text {i} {words}</p></body></html>",
+                encoding="utf-8",
+            )
+            url = f"https://docs.example.com/page{i:05d}"
+            f.write(json.dumps({
+                "original_url": url, "canonical_url": url,
+                "local_path": local_path, "fetch_status": "success",
+            }) + "\n")
+    build_manifest(base_dir, DOWNLOAD_ID)
+    build_inverted_index(base_dir, DOWNLOAD_ID)
+
+
+def time_search(
+    base_dir: Path, keyword: str, expected: int, repeat: int, scan_processes: int = 0
+) -> float:
+    query = SearchRequest(
+        download_id=DOWNLOAD_ID, scan_keywords=[keyword], extract_selector="p", limit=expected
+    )
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = perform_search(query, base_dir, scan_processes=scan_processes)
+        timings.append(time.perf_counter() - start)
+        assert len(results) == expected, (keyword, len(results), expected)
+    return statistics.median(timings)
+
+
+def time_legacy_lookup(base_dir: Path, samples: int = 5) -> float:
+    """Seconds per result of the record lookup result assembly used to run."""
+    abs_base = base_dir.resolve()
+    entries = load_manifest(base_dir, DOWNLOAD_ID)
+    url_map = {abs_base / e.path: e.original_url for e in entries}
+    start = time.perf_counter()
+    for entry in entries[-samples:]:
+        next(
+            (r for r in entries
+             if url_map.get(abs_base.joinpath(r.local_path).resolve(strict=False)) == entry.original_url),
+            None,
+        )
+    return (time.perf_counter() - start) / samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scan-processes", default=None, help="Comma-separated pool sizes")
+    args = parser.parse_args()
+    if args.scan_processes:
+        pool_sizes = [int(n) for n in args.scan_processes.split(",")]
+    else:
+        pool_sizes = list(range(2, (os.cpu_count() or 1) + 1, 2)) or [2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        start = time.perf_counter()
+        build_download(base_dir, args.pages)
+        print(f"Built {args.pages}-page download in {time.perf_counter() - start:.1f}s\n")
+
+        counts, latencies = [], []
+        print(f"{'candidates':>10} {'latency ms':>11} {'ms/candidate':>13}")
+        for k in BUCKETS:
+            seconds = time_search(base_dir, f"bucket{k}", k, args.repeat)
+            counts.append(k)
+            latencies.append(seconds)
+            print(f"{k:>10} {seconds * 1000:>11.1f} {seconds * 1000 / k:>13.3f}")
+
+        slope, intercept = statistics.linear_regression(counts, latencies)
+        r_squared = statistics.correlation(counts, latencies) ** 2
+        print(
+            f"\nFit: {intercept * 1000:.1f} ms + {slope * 1000:.3f} ms/candidate (R^2 = {r_squared:.4f})"
+        )
+        legacy = time_legacy_lookup(base_dir)
+        print(
+            f"Old per-result record lookup: {legacy * 1000:.1f} ms/result "
+            f"(~{legacy * counts[-1]:.0f}s extra for {counts[-1]} results)"
+        )
+
+        # Keyword scan without the inverted index: the 25 'bucket25' pages are
+        # spread over the whole download, so nearly every file is scanned
+        inverted_index_path(base_dir, DOWNLOAD_ID).unlink()
+        print(f"\nFull keyword scan of {args.pages} pages ({os.cpu_count()} cores):")
+        try:
+            sequential = time_search(base_dir, f"bucket{BUCKETS[0]}", BUCKETS[0], args.repeat)
+            print(f"{'in-thread':>12} {sequential * 1000:>9.0f} ms")
+            for processes in pool_sizes:
+                time_search(base_dir, f"bucket{BUCKETS[0]}", BUCKETS[0], 1, processes)  # Start the pool
+                seconds = time_search(base_dir, f"bucket{BUCKETS[0]}", BUCKETS[0], args.repeat, processes)
+                print(
+                    f"{processes:>2} processes {seconds * 1000:>9.0f} ms "
+                    f"({sequential / seconds:.1f}x)"
+                )
+        finally:
+            shutdown_scan_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,9 +8,10 @@ import time
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from loguru import logger
 from sse_starlette.sse import EventSourceResponse
 
@@ -35,24 +36,24 @@ from mcp_doc_retriever.core import ( # Import shared components from core.py
     # db_connection is managed within core.py
 )
 # Import other necessary modules using absolute paths
-from mcp_doc_retriever.utils import is_url_private_or_internal
+from mcp_doc_retriever.utils import is_url_private_or_internal, iterate_in_executor
 from mcp_doc_retriever.downloader.git_downloader import check_git_dependency
-from mcp_doc_retriever.searcher.searcher import perform_search
+from mcp_doc_retriever.searcher.searcher import iter_search, perform_search
 
 # Create router instance
 router = APIRouter()
 logger = logger.bind(module="api")  # Bind logger to this module
 
 
-# --- Search Helper ---
-async def _perform_search(
+# --- Search Helpers ---
+async def _prepare_search(
     download_id: str,
     scan_keywords: Optional[List[str]],
     extract_selector: Optional[str],
     extract_keywords: Optional[List[str]] = None,
     limit: int = 10,
-) -> List[SearchResultItem]:
-    """Shared search logic used by endpoints, checking DB status."""
+) -> Tuple[SearchRequest, Path]:
+    """Checks the download's DB status and the base directory, and builds the SearchRequest."""
     task_info = await get_task_status_from_db(download_id)
     if task_info is None:
         raise HTTPException(
@@ -64,49 +65,111 @@ async def _perform_search(
             detail=f"Task status is '{task_info.status}', requires 'completed'.",
         )
 
-    try:
-        base_dir_path = Path(config.DOWNLOAD_BASE_DIR).resolve()
-        if not base_dir_path.is_dir():
-            logger.error(f"Base download directory not found: {base_dir_path}")
-            raise HTTPException(
-                status_code=500,
-                detail="Server configuration error: Base download directory not found.",
-            )
+    base_dir_path = Path(config.DOWNLOAD_BASE_DIR).resolve()
+    if not base_dir_path.is_dir():
+        logger.error(f"Base download directory not found: {base_dir_path}")
+        raise HTTPException(
+            status_code=500,
+            detail="Server configuration error: Base download directory not found.",
+        )
 
-        # Construct SearchRequest carefully, handling optional fields
-        search_request = SearchRequest(
-            download_id=download_id,
-            scan_keywords=scan_keywords if scan_keywords else [],
-            extract_selector=extract_selector if extract_selector else "body",
-            extract_keywords=extract_keywords if extract_keywords else [],
-            limit=limit,
+    # Construct SearchRequest carefully, handling optional fields
+    search_request = SearchRequest(
+        download_id=download_id,
+        scan_keywords=scan_keywords if scan_keywords else [],
+        extract_selector=extract_selector if extract_selector else "body",
+        extract_keywords=extract_keywords if extract_keywords else [],
+        limit=limit,
+    )
+    return search_request, base_dir_path
+
+
+def _search_http_error(download_id: str, e: Exception) -> HTTPException:
+    """Maps a search failure to the HTTP error returned to the client."""
+    if isinstance(e, FileNotFoundError):
+        logger.error(
+            f"Search failed for '{download_id}': Index file likely missing. {e}",
+            exc_info=True,
+        )
+        return HTTPException(
+            status_code=404,
+            detail=f"Index file not found for download ID '{download_id}'. Ensure download completed successfully.",
         )
+    logger.error(f"Search failed for '{download_id}': {e}", exc_info=True)
+    return HTTPException(
+        status_code=500, detail=f"Internal error during search: {type(e).__name__}"
+    )
+
 
-        # Assuming perform_search is synchronous and needs to run in executor
+async def _perform_search(
+    download_id: str,
+    scan_keywords: Optional[List[str]],
+    extract_selector: Optional[str],
+    extract_keywords: Optional[List[str]] = None,
+    limit: int = 10,
+) -> List[SearchResultItem]:
+    """Shared search logic used by endpoints, checking DB status."""
+    search_request, base_dir_path = await _prepare_search(
+        download_id, scan_keywords, extract_selector, extract_keywords, limit
+    )
+    try:
+        # perform_search is synchronous and needs to run in executor
         loop = asyncio.get_running_loop()
         results = await loop.run_in_executor(
             shared_executor,  # Use the shared executor from main.py
             perform_search,  # The function to run
             search_request,  # Arguments for perform_search
             base_dir_path,
+            getattr(config, "SEARCH_SCAN_PROCESSES", 0),
         )
+    except Exception as e:
+        raise _search_http_error(download_id, e)
 
-        logger.info(f"Search for '{download_id}' yielded {len(results)} results.")
-        return results
-    except FileNotFoundError as e:
-        logger.error(
-            f"Search failed for '{download_id}': Index file likely missing. {e}",
-            exc_info=True,
-        )
-        raise HTTPException(
-            status_code=404,
-            detail=f"Index file not found for download ID '{download_id}'. Ensure download completed successfully.",
+    logger.info(f"Search for '{download_id}' yielded {len(results)} results.")
+    return results
+
+
+async def _stream_search(
+    download_id: str,
+    scan_keywords: Optional[List[str]],
+    extract_selector: Optional[str],
+    extract_keywords: Optional[List[str]] = None,
+    limit: int = 10,
+) -> AsyncIterator[SearchResultItem]:
+    """
+    Starts a streaming search and returns an async iterator of its results.
+    Errors found before the first result (unknown download, missing index)
+    are raised here as HTTPException. Each result is produced on the shared
+    executor; when the client disconnects, the search is closed once the
+    result being computed is done, which stops its scan and extraction.
+    """
+    search_request, base_dir_path = await _prepare_search(
+        download_id, scan_keywords, extract_selector, extract_keywords, limit
+    )
+    loop = asyncio.get_running_loop()
+    try:
+        results = await loop.run_in_executor(
+            shared_executor,
+            iter_search,
+            search_request,
+            base_dir_path,
+            getattr(config, "SEARCH_SCAN_PROCESSES", 0),
         )
     except Exception as e:
-        logger.error(f"Search failed for '{download_id}': {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"Internal error during search: {type(e).__name__}"
-        )
+        raise _search_http_error(download_id, e)
+
+    async def stream() -> AsyncIterator[SearchResultItem]:
+        count = 0
+        steps = iterate_in_executor(results, shared_executor)
+        try:
+            async for result in steps:
+                count += 1
+                yield result
+        finally:
+            await steps.aclose()  # Waits for a running step, then closes the search
+            logger.info(f"Streamed {count} search results for '{download_id}'.")
+
+    return stream()
 
 
 # --- API Endpoints ---
@@ -243,6 +306,50 @@ async def search_docs_post_body(request: SearchRequest):
     )
 
 
+@router.post("/search/stream")
+async def search_docs_stream(request: SearchRequest, http_request: Request):
+    """
+    Searches downloaded content and streams results as they are found, in
+    index order, instead of waiting for the whole list. Responds with NDJSON
+    (one SearchResultItem per line), or with SSE ('result' events, then a
+    'done' event) when the client sends `Accept: text/event-stream`.
+    """
+    logger.info(f"POST /search/stream request for: {request.download_id}")
+    if not request.scan_keywords:
+        raise HTTPException(
+            status_code=422, detail="scan_keywords cannot be empty for this endpoint."
+        )
+    results = await _stream_search(
+        download_id=request.download_id,
+        scan_keywords=request.scan_keywords,
+        extract_selector=request.extract_selector,
+        extract_keywords=request.extract_keywords,
+        limit=request.limit,
+    )
+
+    if "text/event-stream" in http_request.headers.get("accept", ""):
+        async def event_generator():
+            count = 0
+            try:
+                async for result in results:
+                    count += 1
+                    yield {"event": "result", "data": result.model_dump_json()}
+                yield {"event": "done", "data": json.dumps({"count": count})}
+            finally:
+                await results.aclose()  # Client gone: stop the search
+
+        return EventSourceResponse(event_generator())
+
+    async def ndjson_lines():
+        try:
+            async for result in results:
+                yield result.model_dump_json() + "\n"
+        finally:
+            await results.aclose()  # Client gone: stop the search
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
 @router.post("/search/{download_id}", response_model=List[SearchResultItem])
 async def search_docs_post_path(
     download_id: str,
@@ -111,6 +111,23 @@ except Exception as e:
     _config_data = {}
 
 
+# --- Setting Lookup Helpers ---
+def _setting(name: str, default):
+    """Returns MCP_<name> from the environment, else config.json, else default."""
+    env_value = os.environ.get(f"MCP_{name}")
+    if env_value is not None:
+        return env_value
+    return _config_data.get(name, default)
+
+
+def _bool_setting(name: str, default: bool) -> bool:
+    """Like `_setting`, for flags: strings "1", "true" and "yes" (any case) are True."""
+    value = _setting(name, default)
+    if isinstance(value, str):
+        return value.lower() in ("1", "true", "yes")
+    return bool(value)
+
+
 # --- Define Configuration Values with Precedence ---
 
 # DOWNLOAD_BASE_DIR: Base directory for downloads
@@ -242,6 +259,99 @@ if TIMEOUT_PLAYWRIGHT <= 0:
     )
     TIMEOUT_PLAYWRIGHT = _DEFAULT_TIMEOUT_PLAYWRIGHT
 
+# Playwright render profile (see downloader/browser_pool.RenderProfile)
+
+PLAYWRIGHT_WAIT_UNTIL = str(_setting("PLAYWRIGHT_WAIT_UNTIL", "networkidle")).lower()
+if PLAYWRIGHT_WAIT_UNTIL not in ("commit", "domcontentloaded", "load", "networkidle"):
+    logger.warning(
+        f"Invalid PLAYWRIGHT_WAIT_UNTIL '{PLAYWRIGHT_WAIT_UNTIL}'. Using default 'networkidle'."
+    )
+    PLAYWRIGHT_WAIT_UNTIL = "networkidle"
+PLAYWRIGHT_WAIT_SELECTOR = _setting("PLAYWRIGHT_WAIT_SELECTOR", None) or None
+_block_resources = _setting("PLAYWRIGHT_BLOCK_RESOURCES", "image,media,font")
+if isinstance(_block_resources, str):
+    _block_resources = _block_resources.split(",")
+PLAYWRIGHT_BLOCK_RESOURCES = [r.strip().lower() for r in _block_resources if r.strip()]
+PLAYWRIGHT_BLOCK_THIRD_PARTY = _bool_setting("PLAYWRIGHT_BLOCK_THIRD_PARTY", False)
+
+# How the crawler remembers seen URLs: 'fingerprint' (64-bit hashes),
+# 'bloom' (Bloom filter + on-disk exact check) or 'exact' (set of URL strings)
+VISITED_SET_BACKEND = str(_setting("VISITED_SET_BACKEND", "fingerprint")).lower()
+if VISITED_SET_BACKEND not in ("exact", "fingerprint", "bloom"):
+    logger.warning(
+        f"Invalid VISITED_SET_BACKEND '{VISITED_SET_BACKEND}'. Using default 'fingerprint'."
+    )
+    VISITED_SET_BACKEND = "fingerprint"
+
+# Worker processes for hashing/link extraction during web crawls (0 = in-loop)
+try:
+    PARSE_PROCESSES = max(0, int(_setting("PARSE_PROCESSES", 0)))
+except (TypeError, ValueError):
+    logger.warning("Invalid PARSE_PROCESSES value. Using default 0 (parse in the event loop).")
+    PARSE_PROCESSES = 0
+
+# Worker processes for the keyword scan of searches the inverted index cannot
+# answer (0 = scan in the request's worker thread)
+try:
+    SEARCH_SCAN_PROCESSES = max(0, int(_setting("SEARCH_SCAN_PROCESSES", 0)))
+except (TypeError, ValueError):
+    logger.warning("Invalid SEARCH_SCAN_PROCESSES value. Using default 0 (scan in-thread).")
+    SEARCH_SCAN_PROCESSES = 0
+
+# Memory budget (MB) of the LRU cache of parsed pages shared by the search
+# phases and repeated queries (0 = disabled, see searcher/doc_cache.py). With
+# SEARCH_SCAN_PROCESSES > 0 each scan worker gets an equal share of it on top
+# of the API process's cache, so search caching uses at most twice this.
+try:
+    SEARCH_DOC_CACHE_MB = max(0, int(_setting("SEARCH_DOC_CACHE_MB", 256)))
+except (TypeError, ValueError):
+    logger.warning("Invalid SEARCH_DOC_CACHE_MB value. Using default 256.")
+    SEARCH_DOC_CACHE_MB = 256
+
+# Seed web crawls from the site's sitemaps (overridable per request)
+USE_SITEMAPS = _bool_setting("USE_SITEMAPS", False)
+
+# Crawl order: 'priority' (scored frontier, see downloader/frontier.py) or 'fifo'
+FRONTIER_ORDER = str(_setting("FRONTIER_ORDER", "priority")).lower()
+if FRONTIER_ORDER not in ("priority", "fifo"):
+    logger.warning(f"Invalid FRONTIER_ORDER '{FRONTIER_ORDER}'. Using default 'priority'.")
+    FRONTIER_ORDER = "priority"
+
+# Crawl budgets: pages fetched / seconds per web crawl (0 = unlimited)
+try:
+    CRAWL_MAX_PAGES = max(0, int(_setting("CRAWL_MAX_PAGES", 0)))
+except (TypeError, ValueError):
+    logger.warning("Invalid CRAWL_MAX_PAGES value. Using default 0 (unlimited).")
+    CRAWL_MAX_PAGES = 0
+try:
+    CRAWL_TIME_BUDGET = max(0.0, float(_setting("CRAWL_TIME_BUDGET", 0)))
+except (TypeError, ValueError):
+    logger.warning("Invalid CRAWL_TIME_BUDGET value. Using default 0 (unlimited).")
+    CRAWL_TIME_BUDGET = 0.0
+
+# Record crawled pages whose text is a near-duplicate of one already saved
+# (kept on disk, skipped by searches), and optionally delete them and do not
+# follow their links. Off by default: pages sharing a large template outside
+# nav/header/footer/aside can be flagged wrongly.
+DETECT_NEAR_DUPLICATES = _bool_setting("DETECT_NEAR_DUPLICATES", False)
+DELETE_NEAR_DUPLICATES = _bool_setting("DELETE_NEAR_DUPLICATES", False)
+
+# Store crawled page bodies once by content hash under <base_dir>/blobs
+CONTENT_ADDRESSED_STORAGE = _bool_setting("CONTENT_ADDRESSED_STORAGE", False)
+
+# On-disk compression of crawled pages: 'none', 'gzip' or 'zstd' (needs zstandard)
+STORAGE_COMPRESSION = str(_setting("STORAGE_COMPRESSION", "none")).lower()
+if STORAGE_COMPRESSION not in ("none", "gzip", "zstd"):
+    logger.warning(f"Invalid STORAGE_COMPRESSION '{STORAGE_COMPRESSION}'. Using default 'none'.")
+    STORAGE_COMPRESSION = "none"
+
+# Pack crawled pages into large segment files instead of one file per URL
+SEGMENT_STORAGE = _bool_setting("SEGMENT_STORAGE", False)
+
+# Negotiate HTTP/2 with hosts that support it (needs the optional 'h2' package)
+HTTP2 = _bool_setting("HTTP2", True)
+
+
 def usage_example():
     """Demonstrates accessing the config values programmatically."""
     # Logging is already configured via Loguru
@@ -18,6 +18,7 @@ from loguru import logger
 from mcp_doc_retriever import config
 from mcp_doc_retriever.models import TaskStatus, DocDownloadRequest
 from mcp_doc_retriever.downloader.workflow import fetch_documentation_workflow
+from mcp_doc_retriever.downloader.browser_pool import RenderProfile
 
 # Configure a logger specific to this core module if desired, or use root
 logger = logger.bind(module="core")
@@ -256,10 +257,33 @@ async def run_download_workflow_task(
             if request_data.depth is not None
             else getattr(config, "DEFAULT_WEB_DEPTH", 5),
             force=request_data.force or False,
+            revalidate=request_data.revalidate or False,
             max_file_size=getattr(config, "MAX_FILE_SIZE_BYTES", 10 * 1024 * 1024),
             timeout_requests=req_timeout,
             timeout_playwright=play_timeout,
             max_concurrent_requests=getattr(config, "DEFAULT_WEB_CONCURRENCY", 50),
+            render_profile=RenderProfile(
+                wait_until=getattr(config, "PLAYWRIGHT_WAIT_UNTIL", "networkidle"),
+                wait_for_selector=getattr(config, "PLAYWRIGHT_WAIT_SELECTOR", None),
+                block_resource_types=getattr(
+                    config, "PLAYWRIGHT_BLOCK_RESOURCES", ["image", "media", "font"]
+                ),
+                block_third_party=getattr(config, "PLAYWRIGHT_BLOCK_THIRD_PARTY", False),
+            ),
+            visited_backend=getattr(config, "VISITED_SET_BACKEND", "fingerprint"),
+            parse_processes=getattr(config, "PARSE_PROCESSES", 0),
+            use_sitemaps=request_data.use_sitemaps
+            if request_data.use_sitemaps is not None
+            else getattr(config, "USE_SITEMAPS", False),
+            frontier_order=getattr(config, "FRONTIER_ORDER", "priority"),
+            max_pages=getattr(config, "CRAWL_MAX_PAGES", 0) or None,
+            time_budget=getattr(config, "CRAWL_TIME_BUDGET", 0) or None,
+            detect_duplicates=getattr(config, "DETECT_NEAR_DUPLICATES", False),
+            delete_duplicates=getattr(config, "DELETE_NEAR_DUPLICATES", False),
+            content_addressed=getattr(config, "CONTENT_ADDRESSED_STORAGE", False),
+            storage_compression=getattr(config, "STORAGE_COMPRESSION", "none"),
+            segment_storage=getattr(config, "SEGMENT_STORAGE", False),
+            http2=getattr(config, "HTTP2", True),
             executor=shared_executor,  # Pass executor to workflow if needed
             logger_override=logger.bind(workflow=download_id),
         )
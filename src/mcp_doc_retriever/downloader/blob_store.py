@@ -0,0 +1,124 @@
+"""
+Module: blob_store.py
+
+Description:
+Content-addressed storage for downloaded pages. With the store enabled, a
+page saved by a fetcher is moved to `<base_dir>/blobs/<md5[:2]>/<md5><suffix>`
+and the index record's `local_path` points at that blob. Byte-identical
+pages (shared assets, the same docs under several URLs, or the same site
+crawled by two download IDs) are therefore stored once, and the searcher,
+which reads files by `local_path`, scans them once.
+
+The page's per-URL path (`helpers.url_to_local_path`) is kept as a hard link
+to the blob, so "file exists" skips and conditional revalidation keep working
+on later crawls. Fetchers replace files atomically (temp file + rename), which
+swaps the link instead of writing through it into the shared blob. Where the
+filesystem has no hard links the per-URL file is simply dropped.
+
+The MD5 the fetchers already compute is the key. Because MD5 collisions can be
+crafted, a hit is only accepted if the existing blob has the same bytes;
+otherwise the page stays at its per-URL path.
+
+Blobs are never deleted by the crawler (another download may still use them).
+
+Third-Party Documentation:
+- os.link: https://docs.python.org/3/library/os.html#os.link
+- filecmp.cmp: https://docs.python.org/3/library/filecmp.html#filecmp.cmp
+
+Sample Input/Output:
+  store = BlobStore(Path("downloads"))
+  store.adopt(Path("downloads/content/job1/docs.example.com/page.html"), "9e107d9d...")
+  # -> (Path('downloads/blobs/9e/9e107d9d....html'), True)
+"""
+
+import filecmp
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR_NAME = "blobs"
+_DIGEST = re.compile(r"[0-9a-f]{32,128}")
+
+
+class BlobStore:
+    """
+    Content-addressed file store under `<base_dir>/blobs`, shared by all
+    downloads that use the same base directory.
+    """
+
+    def __init__(self, base_dir: Path):
+        self.root = Path(base_dir) / BLOB_DIR_NAME
+
+    def path_for(self, digest: str, suffix: str = "") -> Path:
+        """Blob path for a content digest (the suffix keeps the file type searchable)."""
+        digest = digest.lower()
+        if not _DIGEST.fullmatch(digest):
+            raise ValueError(f"Not a hex digest: {digest!r}")
+        return self.root / digest[:2] / f"{digest}{suffix.lower()}"
+
+    def adopt(self, path: Path, digest: str) -> Tuple[Path, bool]:
+        """
+        Moves a freshly saved file into the store and links its old path to
+        the blob.
+
+        Returns:
+            (path the content now lives at, True if a new blob was stored).
+            On a digest collision with different bytes the file is left where
+            it is and (path, False) is returned.
+
+        Raises:
+            OSError: If the file cannot be moved into the store.
+        """
+        path = Path(path)
+        blob = self.path_for(digest, path.suffix)
+        if blob.exists():
+            if os.path.samefile(path, blob):
+                return blob, False  # Already the blob (e.g. a 304 on a linked copy)
+            if not filecmp.cmp(path, blob, shallow=False):
+                logger.warning(f"Digest {digest} of {path} matches a blob with different bytes; not deduplicating")
+                return path, False
+            path.unlink()
+            stored = False
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(path, blob)
+            stored = True
+        try:
+            os.link(blob, path)
+        except OSError as e:
+            logger.debug(f"Could not link {path} to {blob}: {e}")
+        return blob, stored
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import hashlib
+    import tempfile
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        store = BlobStore(base)
+        body = b"<html><body>shared page</body></html>"
+        digest = hashlib.md5(body).hexdigest()
+        paths = [base / "content" / job / "a.html" for job in ("job1", "job2")]
+        results = []
+        for path in paths:
+            path.parent.mkdir(parents=True)
+            path.write_bytes(body)
+            results.append(store.adopt(path, digest))
+
+        assert results[0] == (store.path_for(digest, ".html"), True)
+        assert results[1] == (store.path_for(digest, ".html"), False)
+        assert all(p.read_bytes() == body for p in paths)
+        blobs = list(store.root.rglob("*.html"))
+        print(f"2 downloads of one page -> {len(blobs)} blob: {blobs[0].relative_to(base)}")
+
+    print("\n------------------------------------")
+    print("✓ Blob store examples passed successfully.")
+    print("------------------------------------")
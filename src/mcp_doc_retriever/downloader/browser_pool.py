@@ -0,0 +1,298 @@
+"""
+Module: browser_pool.py
+
+Description:
+Long-lived Playwright browser pool for the web crawler. Instead of launching
+a new Chromium per URL, a crawl starts one (or a few) browser processes and
+hands out reusable pages, each in its own browser context. The number of
+pages checked out at once is bounded. A page goes back to the pool after use
+(reset to about:blank) and is recycled after a number of uses or when it
+breaks. If a browser crashes it is relaunched on the next acquire. The pool
+is started lazily on first use and torn down with `close()` (or by leaving
+the `async with` block).
+
+A `RenderProfile` controls how much of each page is actually loaded. Request
+routing can abort images, media, fonts (and optionally stylesheets or
+third-party origins), since only the rendered DOM and its links are kept.
+The wait condition can be `domcontentloaded`, `load`, `networkidle` or a CSS
+selector to wait for.
+
+Third-Party Documentation:
+- Playwright (Python): https://playwright.dev/python/docs/api/class-browser
+- Browser contexts: https://playwright.dev/python/docs/browser-contexts
+
+Sample Input/Output:
+  profile = RenderProfile(wait_until="domcontentloaded", block_third_party=True)
+  async with BrowserPool(max_pages=4, profile=profile) as pool:
+      async with pool.page() as page:
+          await page.goto("https://example.com")
+          html = await page.content()
+  # -> one Chromium process served every page() call; closed on exit
+"""
+
+import asyncio
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, FrozenSet, List, Literal, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    Request,
+    Route,
+    async_playwright,
+)
+
+logger = logging.getLogger(__name__)
+
+# Default upper bound of concurrently rendered pages per crawl
+DEFAULT_MAX_PAGES = 8
+# Pages are replaced after this many navigations to cap memory growth
+DEFAULT_RECYCLE_AFTER = 50
+# Playwright resource types that never affect the DOM text or links
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+WAIT_UNTIL_MODES = ("commit", "domcontentloaded", "load", "networkidle")
+
+
+def _site_of(host: str) -> str:
+    # Approximates the registrable domain by its last two labels
+    # (docs.example.com -> example.com); good enough to tell CDNs/analytics apart
+    return ".".join(host.split(".")[-2:])
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """
+    How Playwright loads a page for the crawler.
+
+    Attributes:
+        wait_until: Navigation event `page.goto` waits for.
+        wait_for_selector: Optional CSS selector awaited after navigation
+            (for client-rendered content). If it never shows up, the page is
+            saved as rendered so far.
+        block_resource_types: Playwright resource types to abort
+            (e.g. image, media, font, stylesheet).
+        block_third_party: Abort subresources from other sites than the page.
+    """
+
+    wait_until: Literal["commit", "domcontentloaded", "load", "networkidle"] = "networkidle"
+    wait_for_selector: Optional[str] = None
+    block_resource_types: FrozenSet[str] = field(default=DEFAULT_BLOCKED_RESOURCE_TYPES)
+    block_third_party: bool = False
+
+    def __post_init__(self):
+        if self.wait_until not in WAIT_UNTIL_MODES:
+            raise ValueError(
+                f"wait_until must be one of {WAIT_UNTIL_MODES}, got '{self.wait_until}'"
+            )
+        object.__setattr__(self, "block_resource_types", frozenset(self.block_resource_types))
+
+    @property
+    def routes_requests(self) -> bool:
+        return bool(self.block_resource_types) or self.block_third_party
+
+    def should_block(
+        self, resource_type: str, request_url: str, document_url: Optional[str]
+    ) -> bool:
+        """Decides whether a subresource request is aborted."""
+        if resource_type == "document":
+            return False  # Never block navigations (or frames)
+        if resource_type in self.block_resource_types:
+            return True
+        if self.block_third_party and document_url:
+            request_host = urlparse(request_url).hostname
+            document_host = urlparse(document_url).hostname
+            if request_host and document_host:
+                return _site_of(request_host) != _site_of(document_host)
+        return False
+
+
+async def install_request_blocking(
+    target: Union[BrowserContext, Page], profile: RenderProfile
+) -> None:
+    """Routes all requests of a context or page through the profile's filter."""
+    if not profile.routes_requests:
+        return
+
+    async def _handle(route: Route, request: Request) -> None:
+        try:
+            document_url = request.frame.url
+        except Exception:
+            document_url = None  # e.g. service worker requests have no frame
+        if profile.should_block(request.resource_type, request.url, document_url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await target.route("**/*", _handle)
+
+
+class BrowserPool:
+    """
+    Bounded pool of reusable Playwright pages backed by shared browser processes.
+
+    Args:
+        max_pages: Maximum number of pages in use at the same time.
+        browsers: Number of Chromium processes to spread contexts over.
+        recycle_after: Navigations after which a page/context is replaced.
+        profile: RenderProfile whose request blocking is installed on every
+            context (and which fetchers use for their wait condition).
+        launch_kwargs: Extra keyword arguments for `chromium.launch()`.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        browsers: int = 1,
+        recycle_after: int = DEFAULT_RECYCLE_AFTER,
+        profile: Optional[RenderProfile] = None,
+        **launch_kwargs,
+    ):
+        self.profile = profile or RenderProfile()
+        self.max_pages = max(1, max_pages)
+        self.browser_count = max(1, min(browsers, self.max_pages))
+        self.recycle_after = max(1, recycle_after)
+        self.launch_kwargs = launch_kwargs
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[Optional[Browser]] = []
+        self._browser_cycle = itertools.cycle(range(self.browser_count))
+        self._slots = asyncio.Semaphore(self.max_pages)
+        # LIFO keeps recently used (warm) pages in circulation
+        self._idle: "asyncio.LifoQueue[Tuple[BrowserContext, Page, int]]" = asyncio.LifoQueue()
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    async def __aenter__(self) -> "BrowserPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Starts Playwright and launches the browsers (idempotent)."""
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("BrowserPool is closed")
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+                self._browsers = [None] * self.browser_count
+                logger.info(
+                    f"Browser pool started ({self.browser_count} browser(s), up to {self.max_pages} pages)"
+                )
+
+    async def _browser(self) -> Browser:
+        """Returns the next browser round-robin, (re)launching it if needed."""
+        await self.start()
+        index = next(self._browser_cycle)
+        async with self._lock:
+            browser = self._browsers[index]
+            if browser is None or not browser.is_connected():
+                if browser is not None:
+                    logger.warning(f"Pooled browser {index} disconnected, relaunching.")
+                browser = await self._playwright.chromium.launch(**self.launch_kwargs)
+                self._browsers[index] = browser
+            return browser
+
+    async def _new_page(self) -> Tuple[BrowserContext, Page, int]:
+        browser = await self._browser()
+        context = await browser.new_context()
+        await install_request_blocking(context, self.profile)
+        page = await context.new_page()
+        return context, page, 0
+
+    @staticmethod
+    async def _discard(context: BrowserContext) -> None:
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing pooled context: {e}")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Checks out a page for the duration of the block."""
+        async with self._slots:
+            try:
+                context, page, uses = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                context, page, uses = await self._new_page()
+
+            healthy = False
+            try:
+                yield page
+                healthy = True
+            finally:
+                uses += 1
+                reusable = (
+                    healthy
+                    and not self._closed
+                    and uses < self.recycle_after
+                    and not page.is_closed()
+                )
+                if reusable:
+                    try:
+                        # Stops timers/scripts of the previous document
+                        await page.goto("about:blank")
+                    except Exception:
+                        reusable = False
+                if reusable:
+                    self._idle.put_nowait((context, page, uses))
+                else:
+                    await self._discard(context)
+
+    async def close(self) -> None:
+        """Closes all pages, contexts, browsers and Playwright itself."""
+        async with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            while not self._idle.empty():
+                context, _page, _uses = self._idle.get_nowait()
+                await self._discard(context)
+            for browser in self._browsers:
+                if browser is not None:
+                    try:
+                        await browser.close()
+                    except Exception as e:
+                        logger.debug(f"Ignoring error while closing pooled browser: {e}")
+            self._browsers = []
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+        logger.info("Browser pool closed.")
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import time
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    async def _demo() -> None:
+        html = "<html><body><a href='/next'>next</a></body></html>"
+        async with BrowserPool(max_pages=2) as pool:
+            start = time.monotonic()
+            for i in range(5):
+                async with pool.page() as page:
+                    await page.set_content(html)
+                    links = await page.eval_on_selector_all(
+                        "a[href]", "els => els.map(e => e.getAttribute('href'))"
+                    )
+                    assert links == ["/next"], links
+            print(f"5 pages rendered with one browser in {time.monotonic() - start:.2f}s")
+            assert pool._idle.qsize() == 1
+
+    profile = RenderProfile(block_third_party=True)
+    assert profile.should_block("image", "https://docs.example.com/a.png", "https://docs.example.com/")
+    assert profile.should_block("script", "https://www.googletagmanager.com/gtag.js", "https://docs.example.com/")
+    assert not profile.should_block("script", "https://static.example.com/app.js", "https://docs.example.com/")
+    print("RenderProfile blocking rules behave as expected")
+
+    asyncio.run(_demo())
+    print("\n------------------------------------")
+    print("✓ Browser pool examples passed successfully.")
+    print("------------------------------------")
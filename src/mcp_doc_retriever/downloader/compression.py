@@ -0,0 +1,220 @@
+"""
+Module: compression.py
+
+Description:
+Optional compression of downloaded pages on disk, with a read path that
+works for compressed and plain files alike.
+
+Pages keep their usual names (`.../page-1a2b3c4d.html`), so index records,
+file-type checks and "file exists" skips are unchanged. Whether a file is
+compressed is decided from its first bytes (gzip and zstd frames start with
+fixed magic numbers that no HTML, Markdown or JSON file starts with), so a
+store may mix plain files from older crawls with compressed ones.
+
+  - `open_page_writer(fileobj, compression)` wraps a binary file being written.
+  - `open_page(path)` / `read_page_bytes(path)` return the decompressed content.
+  - `page_exists(path)` / `page_stat(path)` replace `is_file()` / `stat()`.
+
+These also accept segment locators (`segments/<id>/00001.seg/<offset>-<length>.html`,
+see segments.py), so readers need not care how a page is stored.
+
+"zstd" needs the optional `zstandard` package. Without it, `resolve_compression`
+falls back to "gzip" (standard library) with a warning. Writers are
+deterministic (gzip without timestamp or file name), so identical pages give
+identical files, which keeps `blob_store` deduplication working.
+
+Third-Party Documentation:
+- gzip: https://docs.python.org/3/library/gzip.html
+- zstandard: https://python-zstandard.readthedocs.io/en/latest/
+
+Sample Input/Output:
+  with open(tmp, "wb") as f, open_page_writer(f, "gzip") as out:
+      out.write(b"<html>...</html>")
+  read_page_bytes(tmp)  # -> b'<html>...</html>'
+"""
+
+import gzip
+import io
+import logging
+from pathlib import Path
+from typing import BinaryIO, Tuple
+
+from .segments import parse_segment_locator, read_segment_page, segment_page_exists
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STORAGE_COMPRESSIONS = ("none", "gzip", "zstd")
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def resolve_compression(name: str) -> str:
+    """
+    Validates a storage compression name, falling back to "gzip" when zstd
+    was asked for but `zstandard` is not installed.
+
+    Raises:
+        ValueError: For an unknown name.
+    """
+    name = (name or "none").lower()
+    if name not in STORAGE_COMPRESSIONS:
+        raise ValueError(
+            f"Unknown storage compression '{name}' (expected one of {', '.join(STORAGE_COMPRESSIONS)})"
+        )
+    if name == "zstd" and not ZSTD_AVAILABLE:
+        logger.warning("zstd storage needs the 'zstandard' package; using gzip instead.")
+        return "gzip"
+    return name
+
+
+class _NonClosing(io.RawIOBase):
+    """Forwards writes to a file object the caller still owns and closes."""
+
+    def __init__(self, fileobj: BinaryIO):
+        self._fileobj = fileobj
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self._fileobj.write(data)
+
+
+def open_page_writer(fileobj: BinaryIO, compression: str = "none") -> BinaryIO:
+    """
+    Returns a writable binary stream that stores what is written to it in
+    `fileobj`, compressed as requested. Closing it flushes the compressor but
+    leaves `fileobj` open.
+    """
+    if compression == "gzip":
+        return gzip.GzipFile(
+            filename="", mode="wb", compresslevel=GZIP_LEVEL, fileobj=fileobj, mtime=0
+        )
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(
+            fileobj, closefd=False
+        )
+    return _NonClosing(fileobj)
+
+
+class _GzipOwner(gzip.GzipFile):
+    """GzipFile that also closes the file it reads from."""
+
+    def __init__(self, fileobj: BinaryIO):
+        super().__init__(fileobj=fileobj, mode="rb")
+        self._owned = fileobj
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._owned.close()
+
+
+def open_page(path: Path) -> BinaryIO:
+    """
+    Opens a stored page for reading, decompressing gzip/zstd files.
+
+    Raises:
+        OSError: If the file cannot be opened, or is zstd-compressed and
+            `zstandard` is not installed.
+    """
+    if parse_segment_locator(path) is not None:
+        return io.BytesIO(_decompress(read_segment_page(path), path))
+    f = open(path, "rb")
+    try:
+        magic = f.read(4)
+        f.seek(0)
+        if magic.startswith(_GZIP_MAGIC):
+            return _GzipOwner(f)
+        if magic == _ZSTD_MAGIC:
+            if not ZSTD_AVAILABLE:
+                raise OSError(f"{path} is zstd-compressed but 'zstandard' is not installed")
+            return zstandard.ZstdDecompressor().stream_reader(f, closefd=True)
+    except BaseException:
+        f.close()
+        raise
+    return f
+
+
+def _decompress(data: bytes, path: Path) -> bytes:
+    if data.startswith(_GZIP_MAGIC):
+        return gzip.decompress(data)
+    if data[:4] == _ZSTD_MAGIC:
+        if not ZSTD_AVAILABLE:
+            raise OSError(f"{path} is zstd-compressed but 'zstandard' is not installed")
+        with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+            return reader.read()
+    return data
+
+
+def read_page_bytes(path: Path) -> bytes:
+    """The (decompressed) content of a stored page."""
+    if parse_segment_locator(path) is not None:
+        return _decompress(read_segment_page(path), path)
+    with open_page(path) as f:
+        return f.read()
+
+
+def page_exists(path: Path) -> bool:
+    """Whether a stored page (file or segment locator) can be read."""
+    path = Path(path)
+    return path.is_file() or segment_page_exists(path)
+
+
+def page_stat(path: Path) -> Tuple[int, int]:
+    """
+    (mtime_ns, size on disk) of a stored page. Segment entries never change
+    in place, so they report mtime 0 and their stored length.
+
+    Raises:
+        OSError: If the page does not exist.
+    """
+    located = parse_segment_locator(path)
+    if located is not None:
+        if not segment_page_exists(path):
+            raise FileNotFoundError(f"Segment page not found: {path}")
+        return 0, located[2]
+    stat = Path(path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def is_compressed(path: Path) -> bool:
+    if parse_segment_locator(path) is not None:
+        magic = read_segment_page(path)[:4]
+    else:
+        with open(path, "rb") as f:
+            magic = f.read(4)
+    return magic.startswith(_GZIP_MAGIC) or magic == _ZSTD_MAGIC
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import tempfile
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    page = b"<html><body>" + b"<p>Install the client with pip.</p>" * 2000 + b"</body></html>"
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in STORAGE_COMPRESSIONS:
+            resolved = resolve_compression(compression)
+            path = Path(tmp) / f"{compression}.html"
+            with open(path, "wb") as f, open_page_writer(f, resolved) as out:
+                out.write(page)
+            assert read_page_bytes(path) == page
+            print(f"{compression:>4} ({resolved}): {len(page)} -> {path.stat().st_size} bytes on disk")
+
+    print("\n------------------------------------")
+    print("✓ Page compression examples passed successfully.")
+    print("------------------------------------")
@@ -0,0 +1,223 @@
+"""
+Module: crawl_state.py
+
+Description:
+Checkpointed crawl frontier for resumable web downloads. While
+`start_recursive_download` runs, every discovered URL (with its depth) and
+every finished URL is recorded here. The changes are buffered in memory and
+committed to a per-download SQLite file (`index/<download_id>.crawl.sqlite`)
+at each checkpoint, after the index writer has fsync'ed the records of the
+finished URLs. The database therefore never claims a URL is done before its
+`IndexRecord` is on disk.
+
+If the process dies, the next crawl with the same download ID, start URL and
+depth loads the visited set and the pending frontier and continues from
+there. URLs that finished but were not yet checkpointed are processed again;
+the crawler reuses their existing index records instead of refetching them.
+The file is deleted once a crawl completes.
+
+Third-Party Documentation:
+- sqlite3: https://docs.python.org/3/library/sqlite3.html
+
+Sample Input/Output:
+  state = CrawlState(crawl_state_path(base_dir, "my_crawl"))
+  resumed = state.open("https://docs.example.com/", depth=3)
+  frontier, visited = state.load()      # [] / set() unless resumed
+  state.discovered("https://docs.example.com/a", 1)
+  state.done("https://docs.example.com/")
+  await state.checkpoint(index_writer)  # index fsync'ed, then state committed
+  state.finish()                        # crawl complete -> file removed
+"""
+
+import asyncio
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .index_writer import IndexWriter
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = "1"
+# Seconds between checkpoints during a crawl
+DEFAULT_CHECKPOINT_INTERVAL = 10.0
+
+
+def crawl_state_path(base_dir: Path, download_id: str) -> Path:
+    """Returns the checkpoint database path for a download."""
+    return Path(base_dir) / "index" / f"{download_id}.crawl.sqlite"
+
+
+class CrawlState:
+    """
+    Persisted visited set and frontier of one web crawl.
+
+    `discovered` and `done` only touch in-memory buffers; `checkpoint`
+    writes them to SQLite in one transaction (in a worker thread).
+
+    Args:
+        db_path: SQLite file holding the crawl state.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending_discovered: Dict[str, int] = {}
+        self._pending_done: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self.resumed = False
+
+    def open(self, start_url: str, depth: int, resume: bool = True) -> bool:
+        """
+        Opens the state database. An unfinished crawl with the same start URL
+        and depth is resumed (unless `resume` is False); any other existing
+        state is discarded.
+
+        Returns:
+            True if a previous crawl is being resumed.
+        """
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        expected = {
+            "schema_version": SCHEMA_VERSION,
+            "start_url": start_url,
+            "depth": str(depth),
+        }
+        self.resumed = (
+            resume and bool(meta) and all(meta.get(k) == v for k, v in expected.items())
+        )
+        if not self.resumed:
+            if meta:
+                logger.info(f"Discarding crawl state for a different crawl in {self.db_path}")
+            with conn:
+                conn.execute("DROP TABLE IF EXISTS visited")
+                conn.execute("DROP TABLE IF EXISTS frontier")
+                conn.execute("DELETE FROM meta")
+                conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", expected.items())
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY) WITHOUT ROWID")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS frontier (url TEXT PRIMARY KEY, depth INTEGER NOT NULL)"
+            )
+        return self.resumed
+
+    def load(self) -> Tuple[List[Tuple[str, int]], Set[str]]:
+        """Returns the pending frontier (in discovery order) and the visited set."""
+        return self.load_frontier(), set(self.iter_visited())
+
+    def load_frontier(self) -> List[Tuple[str, int]]:
+        """Returns the pending (URL, depth) pairs in discovery order."""
+        if self._conn is None:
+            raise RuntimeError("CrawlState is not open")
+        return [
+            (url, depth)
+            for url, depth in self._conn.execute(
+                "SELECT url, depth FROM frontier ORDER BY rowid"
+            )
+        ]
+
+    def iter_visited(self) -> Iterator[str]:
+        """Streams the visited URLs (for filling a compact visited set)."""
+        if self._conn is None:
+            raise RuntimeError("CrawlState is not open")
+        for (url,) in self._conn.execute("SELECT url FROM visited"):
+            yield url
+
+    def discovered(self, url: str, depth: int) -> None:
+        """Records a URL that was added to the queue."""
+        self._pending_discovered.setdefault(url, depth)
+
+    def done(self, url: str) -> None:
+        """Records a URL whose index record has been handed to the index writer."""
+        self._pending_done.add(url)
+
+    async def checkpoint(self, index_writer: Optional[IndexWriter] = None) -> None:
+        """
+        Makes all changes so far durable: first the index records (via the
+        writer's fsync), then the visited set and frontier.
+        """
+        async with self._lock:
+            if self._conn is None:
+                return
+            discovered, self._pending_discovered = self._pending_discovered, {}
+            done, self._pending_done = self._pending_done, set()
+            if not discovered and not done:
+                return
+            try:
+                if index_writer is not None:
+                    await index_writer.checkpoint()
+                await asyncio.to_thread(self._commit, discovered, done)
+            except (sqlite3.Error, asyncio.CancelledError) as e:
+                # Keep the changes for the next attempt (re-applying them is harmless)
+                for url, depth in discovered.items():
+                    self._pending_discovered.setdefault(url, depth)
+                self._pending_done |= done
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                logger.error(f"Failed to checkpoint crawl state to {self.db_path}: {e}")
+
+    def _commit(self, discovered: Dict[str, int], done: Set[str]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO visited (url) VALUES (?)", ((u,) for u in discovered)
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, depth) VALUES (?, ?)", discovered.items()
+            )
+            self._conn.executemany("DELETE FROM frontier WHERE url = ?", ((u,) for u in done))
+        logger.debug(
+            f"Crawl state checkpoint: +{len(discovered)} discovered, {len(done)} done ({self.db_path.name})"
+        )
+
+    def close(self) -> None:
+        """Closes the database, keeping it for a later resume."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def finish(self) -> None:
+        """Closes and removes the state of a completed crawl."""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{self.db_path}{suffix}").unlink(missing_ok=True)
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import tempfile
+
+    logging.basicConfig(level=logging.DEBUG, format="[%(levelname)s] %(message)s")
+
+    async def _demo(db_path: Path) -> None:
+        state = CrawlState(db_path)
+        assert state.open("https://docs.example.com/", 2) is False
+        state.discovered("https://docs.example.com/", 0)
+        state.discovered("https://docs.example.com/a", 1)
+        state.discovered("https://docs.example.com/b", 1)
+        state.done("https://docs.example.com/")
+        await state.checkpoint()
+        state.discovered("https://docs.example.com/c", 2)  # never checkpointed
+        state.close()  # simulated crash
+
+        resumed = CrawlState(db_path)
+        assert resumed.open("https://docs.example.com/", 2) is True
+        frontier, visited = resumed.load()
+        print(f"Resumed frontier: {frontier}")
+        assert frontier == [("https://docs.example.com/a", 1), ("https://docs.example.com/b", 1)]
+        assert len(visited) == 3
+        resumed.finish()
+        assert not db_path.exists()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_demo(Path(tmp) / "demo.crawl.sqlite"))
+
+    print("\n------------------------------------")
+    print("✓ Crawl state examples passed successfully.")
+    print("------------------------------------")
@@ -53,6 +53,7 @@ from concurrent.futures import ThreadPoolExecutor
 # Assuming these are correctly placed relative to this file
 from mcp_doc_retriever.downloader.workflow import fetch_documentation_workflow
 from mcp_doc_retriever.downloader.git_downloader import check_git_dependency
+from mcp_doc_retriever.downloader.browser_pool import RenderProfile
 from mcp_doc_retriever.utils import TIMEOUT_REQUESTS, TIMEOUT_PLAYWRIGHT  # Import defaults
 
 
@@ -126,6 +127,26 @@ def download_command(
     force: bool = typer.Option(
         False, "--force", "-f", help="Overwrite existing clone/files if they exist."
     ),
+    revalidate: bool = typer.Option(
+        False,
+        "--revalidate",
+        help="Revalidate existing pages with ETag/Last-Modified (HTTP 304) instead of skipping them.",
+    ),
+    use_sitemaps: bool = typer.Option(
+        False,
+        "--sitemaps",
+        help="Also crawl the pages listed in robots.txt Sitemap: entries and /sitemap.xml.",
+    ),
+    max_pages: Optional[int] = typer.Option(
+        None,
+        "--max-pages",
+        help="Stop a website/playwright crawl after fetching this many pages (best-scored first).",
+    ),
+    time_budget: Optional[float] = typer.Option(
+        None,
+        "--time-budget",
+        help="Stop a website/playwright crawl after this many seconds.",
+    ),
     max_file_size: Optional[int] = typer.Option(
         10 * 1024 * 1024,
         "--max-file-size",
@@ -147,6 +168,21 @@ def download_command(
         "-c",
         help="Maximum concurrent download requests for web crawls.",
     ),
+    render_wait: str = typer.Option(
+        "networkidle",
+        "--render-wait",
+        help="Playwright wait condition: commit, domcontentloaded, load or networkidle.",
+    ),
+    wait_selector: Optional[str] = typer.Option(
+        None,
+        "--wait-selector",
+        help="Playwright: CSS selector to wait for after navigation.",
+    ),
+    block_third_party: bool = typer.Option(
+        False,
+        "--block-third-party",
+        help="Playwright: abort requests to other sites (analytics, CDNs, ads).",
+    ),
     verbose: bool = typer.Option(
         False, "--verbose", "-v", help="Enable debug logging."
     ),
@@ -230,12 +266,21 @@ def download_command(
                 base_dir=base_dir,
                 depth=depth,
                 force=force,
+                revalidate=revalidate,
+                use_sitemaps=use_sitemaps,
+                max_pages=max_pages,
+                time_budget=time_budget,
                 max_file_size=max_file_size
                 if max_file_size and max_file_size > 0
                 else None,
                 timeout_requests=timeout_requests,  # Defaults handled downstream
                 timeout_playwright=timeout_playwright,  # Defaults handled downstream
                 max_concurrent_requests=max_concurrent,
+                render_profile=RenderProfile(
+                    wait_until=render_wait,
+                    wait_for_selector=wait_selector,
+                    block_third_party=block_third_party,
+                ),
                 executor=executor,  # Pass the shared executor
                 logger_override=logger,  # Pass logger instance if needed downstream (optional)
             )
@@ -2,11 +2,18 @@
 Description:
     This module provides individual URL fetching functions used by the web_downloader
     module. It includes two main functions:
-    - fetch_single_url_requests: Uses httpx for standard HTTP requests
-    - fetch_single_url_playwright: Uses Playwright for JavaScript-rendered pages
+    - fetch_single_url_requests: Uses httpx for standard HTTP requests. The body is
+      streamed to a temp file (incremental md5, max_size enforced mid-stream,
+      incremental lxml link extraction honouring <base href>, text SimHash for
+      near-duplicate detection) and atomically renamed into place, optionally
+      gzip/zstd-compressed (see compression.py; readers decompress transparently),
+      or appended to the download's segment files (see segments.py).
+    - fetch_single_url_playwright: Uses Playwright for JavaScript-rendered pages,
+      rendering on a page borrowed from a shared BrowserPool when one is given
 
 Third-Party Documentation:
     - httpx: https://www.python-httpx.org/
+    - lxml parser targets: https://lxml.de/parsing.html#the-target-parser-interface
     - playwright: https://playwright.dev/python/
 
 Sample Input/Output:
@@ -31,19 +38,386 @@ Sample Input/Output:
 """
 
 import asyncio
+import codecs
+import functools
 import hashlib
 import logging
 import os
+import tempfile
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import TYPE_CHECKING, BinaryIO, Dict, Any, Optional, List, Tuple
 from urllib.parse import urljoin
 
 import httpx
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
+from lxml import etree
+from playwright.async_api import Page, async_playwright
+
+from .browser_pool import BrowserPool, RenderProfile, install_request_blocking
+from .compression import open_page, open_page_writer, page_exists
+from .segments import SegmentStore
+from .simhash import SimHasher
+
+if TYPE_CHECKING:  # parse_pool imports this module for scan_local_copy
+    from .parse_pool import ParsePool
 
 logger = logging.getLogger(__name__)
 
+# Read size for streamed bodies; bounds per-worker memory use
+STREAM_CHUNK_SIZE = 64 * 1024
+# Segment-mode bodies larger than this are spooled to a temporary file
+SEGMENT_SPOOL_BYTES = 1024 * 1024
+
+
+# Links that do not lead to another document
+NON_NAVIGATIONAL_PREFIXES = ("#", "javascript:", "mailto:", "tel:")
+
+
+class _LinkCollector:
+    """lxml parser target that keeps only <a href> values and the first <base href>."""
+
+    def __init__(self):
+        self.hrefs: List[str] = []
+        self.base_href: Optional[str] = None
+
+    def start(self, tag, attrib):
+        if tag == "a":
+            href = attrib.get("href")
+            if href:
+                self.hrefs.append(href)
+        elif tag == "base" and self.base_href is None:
+            self.base_href = attrib.get("href") or None
+
+    def close(self):
+        return None
+
+
+# Page chrome and non-content elements, left out of the page text SimHash
+TEXT_SKIP_TAGS = frozenset(
+    {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside"}
+)
+
+
+class _LinkTextCollector(_LinkCollector):
+    """_LinkCollector that also feeds the page's content text to a SimHasher."""
+
+    def __init__(self):
+        super().__init__()
+        self.hasher = SimHasher()
+        self._skip_depth = 0
+        self._text: List[str] = []
+
+    def _flush_text(self):
+        # Text nodes may arrive in pieces; words are only split at tag boundaries
+        if self._text:
+            if not self._skip_depth:
+                self.hasher.update("".join(self._text))
+            self._text.clear()
+
+    def start(self, tag, attrib):
+        self._flush_text()
+        if tag in TEXT_SKIP_TAGS:
+            self._skip_depth += 1
+        super().start(tag, attrib)
+
+    def end(self, tag):
+        self._flush_text()
+        if tag in TEXT_SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, text):
+        self._text.append(text)
+
+    def close(self):
+        self._flush_text()
+        return None
+
+
+@functools.lru_cache(maxsize=64)
+def _lxml_encoding(encoding: Optional[str]) -> Optional[str]:
+    """Maps a response charset to a name libxml2 accepts (None = unknown)."""
+    if not encoding:
+        return None
+    for candidate in (encoding, codecs.lookup(encoding).name):
+        try:
+            etree.HTMLParser(encoding=candidate)
+            return candidate
+        except LookupError:
+            continue
+    return None
+
+
+class _StreamingLinkExtractor:
+    """
+    Collects absolute navigational <a href> links from HTML fed in byte chunks.
+
+    Uses lxml's (libxml2) HTML parser with a target object, so no tree is
+    built and only the unparsed tail of the input is buffered. Links are
+    resolved at the end against the document's <base href> (if any) or the
+    fetched URL. With `fingerprint=True` the page's content text is also
+    SimHashed; `simhash` is set by close() (None for too little text).
+    """
+
+    def __init__(self, base_url: str, encoding: Optional[str] = None, fingerprint: bool = True):
+        self.base_url = base_url
+        self._target = _LinkTextCollector() if fingerprint else _LinkCollector()
+        self.simhash: Optional[int] = None
+        self._decoder = None
+        try:
+            lxml_encoding = _lxml_encoding(encoding)
+        except LookupError:
+            lxml_encoding = None
+            encoding = None
+        if encoding and lxml_encoding is None:
+            # Charset libxml2 does not know: decode in Python and feed text
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        # Without a declared charset libxml2 sniffs BOM / <meta charset>
+        self._parser = etree.HTMLParser(target=self._target, encoding=lxml_encoding)
+        self._failed = False
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        if self._failed:
+            return
+        try:
+            if self._decoder is not None:
+                self._parser.feed(self._decoder.decode(chunk))
+            else:
+                self._parser.feed(chunk)
+        except Exception as e:
+            # Never let a parser problem abort the download itself
+            self._failed = True
+            logger.warning(f"Error extracting links from {self.base_url}: {e}")
+
+    def close(self) -> List[str]:
+        if not self._failed:
+            try:
+                if self._decoder is not None:
+                    self._parser.feed(self._decoder.decode(b"", final=True))
+                self._parser.close()
+            except etree.XMLSyntaxError:
+                pass  # e.g. an empty document; keep whatever was collected
+            except Exception as e:
+                logger.warning(f"Error extracting links from {self.base_url}: {e}")
+            if isinstance(self._target, _LinkTextCollector):
+                self._target.close()  # lxml skips it when the document is empty
+                self.simhash = self._target.hasher.digest()
+
+        base = self.base_url
+        if self._target.base_href:
+            try:
+                base = urljoin(self.base_url, self._target.base_href.strip())
+            except ValueError:
+                logger.warning(
+                    f"Ignoring invalid <base href='{self._target.base_href}'> in {self.base_url}"
+                )
+
+        links: List[str] = []
+        for raw_href in self._target.hrefs:
+            href = raw_href.strip()
+            # Basic filtering of non-navigational links
+            if not href or href.lower().startswith(NON_NAVIGATIONAL_PREFIXES):
+                continue
+            try:
+                links.append(urljoin(base, href))
+            except ValueError:
+                logger.warning(f"Could not resolve relative link '{href}' from base '{base}'")
+        return links
+
+
+class _MaxSizeExceeded(Exception):
+    """Raised when a streamed body grows beyond max_size."""
+
+    def __init__(self, size: int):
+        super().__init__(size)
+        self.size = size
+
+
+async def _stream_body(
+    response: httpx.Response,
+    out: BinaryIO,
+    max_size: Optional[int],
+    link_extractor: Optional[_StreamingLinkExtractor],
+    hash_body: bool = True,
+) -> Tuple[Optional[str], int]:
+    """
+    Copies the response body to `out` chunk by chunk while updating the md5
+    and the link extractor. The md5, size limit and link extraction apply to
+    the body as received (before any storage compression in `out`).
+
+    Returns:
+        (md5 hex digest or None if `hash_body` is False, number of bytes read)
+
+    Raises:
+        _MaxSizeExceeded: If the body is larger than `max_size`.
+    """
+    md5 = hashlib.md5()
+    size = 0
+    async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+        size += len(chunk)
+        if max_size and size > max_size:
+            raise _MaxSizeExceeded(size)
+        if hash_body:
+            md5.update(chunk)
+        out.write(chunk)
+        if link_extractor is not None:
+            link_extractor.feed_bytes(chunk)
+    return (md5.hexdigest() if hash_body else None), size
+
+
+async def _stream_body_to_file(
+    response: httpx.Response,
+    target_path: Path,
+    max_size: Optional[int],
+    link_extractor: Optional[_StreamingLinkExtractor],
+    hash_body: bool = True,
+    compression: str = "none",
+) -> Tuple[Optional[str], int]:
+    """
+    Streams the response body into a temp file in the target directory and
+    atomically renames it over `target_path` once complete. The temp file is
+    removed if the body exceeds `max_size` or the transfer fails.
+
+    Returns:
+        (md5 hex digest or None if `hash_body` is False, number of bytes read)
+    """
+    fd, tmp_name = tempfile.mkstemp(
+        dir=target_path.parent, prefix=f".{target_path.name}.", suffix=".part"
+    )
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as raw, open_page_writer(raw, compression) as f:
+            result = await _stream_body(response, f, max_size, link_extractor, hash_body)
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return result
+
+
+def _write_page_file(target_path: Path, data: bytes, compression: str = "none") -> None:
+    """
+    Writes a complete page body to a temp file in the target directory and
+    atomically renames it over `target_path`, like `_stream_body_to_file`.
+    The rename replaces a hard link into the blob store instead of writing
+    through it, and a crash mid-write leaves the previous file in place.
+    """
+    fd, tmp_name = tempfile.mkstemp(
+        dir=target_path.parent, prefix=f".{target_path.name}.", suffix=".part"
+    )
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as raw, open_page_writer(raw, compression) as out:
+            out.write(data)
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+async def _stream_body_to_segment(
+    response: httpx.Response,
+    url: str,
+    suffix: str,
+    segment_store: SegmentStore,
+    max_size: Optional[int],
+    link_extractor: Optional[_StreamingLinkExtractor],
+    hash_body: bool = True,
+    compression: str = "none",
+) -> Tuple[Optional[str], int, Path]:
+    """
+    Streams the response body (at most `max_size` bytes) into a spool file,
+    which stays in memory up to SEGMENT_SPOOL_BYTES and rolls over to disk
+    beyond that, then copies it into the download's segment under the
+    store's lock. Entries never interleave and large pages are never held
+    in memory, even without a size limit.
+
+    Returns:
+        (md5 hex digest or None, number of bytes read, locator of the entry)
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SEGMENT_SPOOL_BYTES) as spool:
+        with open_page_writer(spool, compression) as f:
+            content_md5, size = await _stream_body(response, f, max_size, link_extractor, hash_body)
+        stored_length = spool.tell()
+        spool.seek(0)
+        locator = await asyncio.to_thread(
+            segment_store.append_file, url, spool, stored_length, suffix
+        )
+    return content_md5, size, locator
+
+
+def scan_local_copy(
+    url: str,
+    target_path: Path,
+    encoding: Optional[str] = None,
+    is_html: Optional[bool] = None,
+) -> Tuple[str, List[str], Optional[int]]:
+    """
+    Reads a downloaded (possibly compressed) file in chunks and returns the
+    md5 of its content and, for HTML
+    files, its outgoing links (resolved against `url`) and text SimHash.
+    Being a plain function of picklable arguments, it also runs in a
+    ParsePool process.
+
+    Args:
+        url: URL the file was fetched from (base for relative links).
+        target_path: The local file.
+        encoding: Charset of the response, if known.
+        is_html: Whether to extract links; None guesses from the file suffix.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    if is_html is None:
+        is_html = target_path.suffix.lower() in (".html", ".htm")
+    link_extractor = _StreamingLinkExtractor(url, encoding) if is_html else None
+    md5 = hashlib.md5()
+    with open_page(target_path) as f:
+        for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+            md5.update(chunk)
+            if link_extractor is not None:
+                link_extractor.feed_bytes(chunk)
+    if link_extractor is None:
+        return md5.hexdigest(), [], None
+    links = link_extractor.close()
+    return md5.hexdigest(), links, link_extractor.simhash
+
+
+async def _not_modified_result(
+    url: str,
+    target_path: Path,
+    response: httpx.Response,
+    validators: Dict[str, str],
+    parse_pool: Optional["ParsePool"] = None,
+) -> Dict[str, Any]:
+    """
+    Builds the result for a 304 response. The local copy is re-read so the
+    caller still gets its md5 and outgoing links for recursion.
+    """
+    try:
+        if parse_pool is not None:
+            content_md5, detected_links, simhash = await parse_pool.scan(url, target_path)
+        else:
+            content_md5, detected_links, simhash = scan_local_copy(url, target_path)
+    except OSError as e:
+        return {
+            "status": "failed",
+            "error_message": f"304 Not Modified but local copy unreadable: {e}",
+            "http_status": response.status_code,
+        }
+    logger.info(f"Not modified since last crawl (304): {url}")
+    return {
+        "status": "not_modified",
+        "target_path": str(target_path),
+        "content_md5": content_md5,
+        "http_status": response.status_code,
+        "detected_links": detected_links,
+        "simhash": simhash,
+        # Servers may send refreshed validators with a 304
+        "etag": response.headers.get("etag") or validators.get("etag"),
+        "last_modified": response.headers.get("last-modified")
+        or validators.get("last_modified"),
+    }
+
+
 async def fetch_single_url_requests(
     url: str,
     target_local_path: str,
@@ -52,11 +426,25 @@ async def fetch_single_url_requests(
     timeout: int = 30,
     client: Optional[httpx.AsyncClient] = None,  # Accepts optional client
     max_size: Optional[int] = None,
+    validators: Optional[Dict[str, str]] = None,
+    parse_pool: Optional["ParsePool"] = None,
+    compression: str = "none",
+    segment_store: Optional[SegmentStore] = None,
+    stored_copy: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Fetches a single URL using httpx and saves it to the target path.
     Correctly handles optionally provided httpx.AsyncClient instances.
 
+    When `validators` from a previous crawl are given and the target file
+    exists, a conditional request (If-None-Match / If-Modified-Since) is sent
+    instead of skipping or blindly re-downloading. A 304 answer yields status
+    'not_modified' without rewriting the file.
+
+    With a `parse_pool`, the body is only streamed to disk here; hashing and
+    link extraction run in the pool's worker processes instead of the event
+    loop.
+
     Args:
         url: The URL to fetch
         target_local_path: Where to save the downloaded content (string path)
@@ -67,6 +455,14 @@ async def fetch_single_url_requests(
                 If provided, this function will *not* close it.
                 If None, a temporary client will be created and closed.
         max_size: Maximum file size to download (in bytes)
+        validators: Optional {'etag': ..., 'last_modified': ...} of the stored copy
+        parse_pool: Optional ParsePool for hashing/link extraction off the event loop
+        compression: How to store the body: "none", "gzip" or "zstd"
+        segment_store: Append the body to this download's segments instead of
+                       writing target_local_path (the result's target_path is
+                       then the segment locator)
+        stored_copy: Where the page's current copy lives if not at
+                     target_local_path (a segment locator from a previous crawl)
 
     Returns:
         Dictionary with status information and results
@@ -74,6 +470,18 @@ async def fetch_single_url_requests(
     target_path = Path(target_local_path)
     allowed_base = Path(allowed_base_dir).resolve() if allowed_base_dir else None
     http_status_code = None  # Initialize
+    # The copy a skip or a conditional request refers to, if there is one
+    existing_copy: Optional[Path] = None
+    if target_path.exists():
+        existing_copy = target_path
+    elif stored_copy and page_exists(Path(stored_copy)):
+        existing_copy = Path(stored_copy)
+    conditional_headers: Dict[str, str] = {}
+    if validators and existing_copy is not None:
+        if validators.get("etag"):
+            conditional_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            conditional_headers["If-Modified-Since"] = validators["last_modified"]
 
     # --- Path and Pre-check Validation ---
     if allowed_base:
@@ -93,16 +501,17 @@ async def fetch_single_url_requests(
                 "error_message": f"Target path validation failed: {path_val_e}",
             }
 
-    if target_path.exists() and not force:
-        logger.info(f"Skipping existing file (force=False): {target_path}")
+    if existing_copy is not None and not force and not conditional_headers:
+        logger.info(f"Skipping existing file (force=False): {existing_copy}")
         return {
             "status": "skipped",
-            "target_path": str(target_path),
+            "target_path": str(existing_copy),
             "error_message": "File exists and force=False",
         }
 
     try:
-        target_path.parent.mkdir(parents=True, exist_ok=True)
+        if segment_store is None:
+            target_path.parent.mkdir(parents=True, exist_ok=True)
     except Exception as e:
         logger.error(
             f"Failed to create directory {target_path.parent}: {e}", exc_info=True
@@ -133,26 +542,35 @@ async def fetch_single_url_requests(
         logger.debug(
             f"Sending GET stream request to {url} using {'local' if local_client else 'shared'} client."
         )
-        async with client_to_use.stream("GET", url) as response:
+        async with client_to_use.stream(
+            "GET", url, headers=conditional_headers or None
+        ) as response:
             http_status_code = response.status_code  # Store status code early
             logger.debug(f"Received response for {url}: Status {http_status_code}")
 
+            if http_status_code == 304 and conditional_headers:
+                return await _not_modified_result(
+                    url, existing_copy, response, validators, parse_pool
+                )
+
             # Check for non-success status codes (e.g., 404, 500)
             if not response.is_success:
                 error_msg = f"HTTP error {http_status_code} for URL: {url}"
                 logger.warning(error_msg)
-                # Attempt to read body for more info, but don't fail if it raises error
+                # Attempt to read the start of the body for more info, but don't fail if it raises error
                 try:
-                    body_preview = (await response.aread())[:500].decode(
-                        "utf-8", errors="replace"
-                    )
-                    error_msg += f" - Body Preview: {body_preview}"
+                    async for chunk in response.aiter_bytes():
+                        body_preview = chunk[:500].decode("utf-8", errors="replace")
+                        error_msg += f" - Body Preview: {body_preview}"
+                        break
                 except Exception:
                     pass  # Ignore if reading body fails on error status
                 return {
                     "status": "failed",
                     "error_message": error_msg,
                     "http_status": http_status_code,
+                    # Lets the crawler's scheduler honour server backoff requests
+                    "retry_after": response.headers.get("retry-after"),
                 }
 
             # Check content length before reading if max_size specified
@@ -174,102 +592,91 @@ async def fetch_single_url_requests(
                         f"Invalid Content-Length header '{content_length_header}' for {url}"
                     )
 
-            # Read the response body content
-            logger.debug(f"Reading content for {url}")
-            content = await response.aread()
-            logger.debug(f"Read {len(content)} bytes for {url}")
-
-            # Check actual size if max_size specified (in case Content-Length was missing/wrong)
-            if max_size and len(content) > max_size:
-                logger.warning(
-                    f"Downloaded content size {len(content)} exceeds max_size {max_size} for {url}"
-                )
-                return {
-                    "status": "failed",
-                    "error_message": f"Downloaded content size {len(content)} exceeds max_size {max_size}",
-                    "http_status": http_status_code,
-                }
-
-            # --- Process Content (Inside Response Context) ---
-            logger.debug(f"Processing content for {url} inside response context.")
-            content_md5 = hashlib.md5(content).hexdigest()
-            detected_links = []
-            # Access headers *inside* the context block
+            # --- Stream Body to Disk (Inside Response Context) ---
+            # Chunks go to a temp file next to the target while the md5 and the
+            # link extractor are updated incrementally, so memory per worker
+            # stays bounded by the chunk size regardless of page size. With
+            # segment storage the body is buffered (up to max_size) and appended
+            # to the segment in one write.
             content_type = response.headers.get("content-type", "").lower()
-
-            if "html" in content_type:
-                logger.debug(f"Content type for {url} is HTML, extracting links.")
-                try:
-                    # Use html.parser for resilience, pass the bytes directly
-                    soup = BeautifulSoup(content, "html.parser")
-                    for a_tag in soup.find_all("a", href=True):
-                        href = a_tag["href"].strip()
-                        # Basic filtering of non-navigational links
-                        if href and not href.startswith(
-                            ("#", "javascript:", "mailto:", "tel:")
-                        ):
-                            try:
-                                # Resolve relative URLs against the fetched URL
-                                abs_url = urljoin(url, href)
-                                detected_links.append(abs_url)
-                            except ValueError:
-                                logger.warning(
-                                    f"Could not resolve relative link '{href}' from base '{url}'"
-                                )
-                    logger.debug(f"Extracted {len(detected_links)} links from {url}")
-                except Exception as e:
-                    logger.warning(f"Error extracting links from {url}: {e}", exc_info=True)
+            is_html = "html" in content_type
+            link_extractor = None
+            if parse_pool is not None:
+                pass  # Parsed in a worker process once the file is complete
+            elif is_html:
+                logger.debug(f"Content type for {url} is HTML, extracting links while streaming.")
+                link_extractor = _StreamingLinkExtractor(url, response.charset_encoding)
             else:
                 logger.debug(
                     f"Content type '{content_type}' for {url} is not HTML, skipping link extraction."
                 )
 
-            # --- Write Content to File (Revised Error Handling) ---
-            file_written_successfully = False # Flag to track success
             try:
-                logger.debug(f"Attempting to write {len(content)} bytes to {target_path}")
-                target_path.write_bytes(content)
-                # If write_bytes completes without error, set the flag
-                file_written_successfully = True
-                logger.info(f"Successfully saved {url} to {target_path}")
-            except OSError as e: # Catch specific OS-level errors like permissions, disk full, etc.
-                error_msg = f"Failed to write file {target_path} due to OSError: {e}"
-                logger.error(error_msg, exc_info=True)
+                if segment_store is not None:
+                    content_md5, content_size, saved_path = await _stream_body_to_segment(
+                        response,
+                        url,
+                        target_path.suffix,
+                        segment_store,
+                        max_size,
+                        link_extractor,
+                        hash_body=parse_pool is None,
+                        compression=compression,
+                    )
+                else:
+                    content_md5, content_size = await _stream_body_to_file(
+                        response,
+                        target_path,
+                        max_size,
+                        link_extractor,
+                        hash_body=parse_pool is None,
+                        compression=compression,
+                    )
+                    saved_path = target_path
+            except _MaxSizeExceeded as e:
+                logger.warning(
+                    f"Downloaded content size exceeds max_size {max_size} for {url} (aborted after {e.size} bytes)"
+                )
                 return {
                     "status": "failed",
-                    "error_message": error_msg,
+                    "error_message": f"Downloaded content size exceeds max_size {max_size} (aborted after {e.size} bytes)",
                     "http_status": http_status_code,
-                    "content_md5": content_md5,
                 }
-            except Exception as e: # Catch any other unexpected errors during write
-                error_msg = f"Unexpected error writing file {target_path}: {e}"
+            except OSError as e: # Catch specific OS-level errors like permissions, disk full, etc.
+                error_msg = f"Failed to write file {target_path} due to OSError: {e}"
                 logger.error(error_msg, exc_info=True)
                 return {
                     "status": "failed",
                     "error_message": error_msg,
                     "http_status": http_status_code,
-                    "content_md5": content_md5,
                 }
 
-            # --- Success (Only if file writing flag is True) ---
-            if file_written_successfully:
-                return {
-                    "status": "success",
-                    "target_path": str(target_path),
-                    "content_md5": content_md5,
-                    "http_status": http_status_code,
-                    "detected_links": detected_links,
-                }
+            if parse_pool is not None:
+                try:
+                    content_md5, detected_links, simhash = await parse_pool.scan(
+                        url, saved_path, response.charset_encoding, is_html
+                    )
+                except OSError as e:
+                    return {
+                        "status": "failed",
+                        "error_message": f"Failed to parse saved file {saved_path}: {e}",
+                        "http_status": http_status_code,
+                    }
             else:
-                # This case should ideally not be reached if exceptions are caught,
-                # but acts as a safeguard.
-                logger.error(f"File writing did not succeed for {target_path}, but no specific exception was caught.")
-                return {
-                    "status": "failed",
-                    "error_message": "File writing failed for unknown reason after download.",
-                    "http_status": http_status_code,
-                    "content_md5": content_md5,
-                }
+                detected_links = link_extractor.close() if link_extractor else []
+                simhash = link_extractor.simhash if link_extractor else None
+            logger.debug(f"Extracted {len(detected_links)} links from {url}")
+            logger.info(f"Successfully saved {url} ({content_size} bytes) to {saved_path}")
+            return {
+                "status": "success",
+                "target_path": str(saved_path),
+                "content_md5": content_md5,
+                "http_status": http_status_code,
+                "detected_links": detected_links,
+                "simhash": simhash,
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+            }
             # --- End processing inside response context ---
 
     # --- Exception Handling ---
@@ -305,12 +712,125 @@ async def fetch_single_url_requests(
             except Exception as close_e:
                 logger.warning(f"Error closing locally created httpx client: {close_e}")
 
+async def _render_page_to_file(
+    page: Page,
+    url: str,
+    target_path: Path,
+    timeout: int,
+    profile: RenderProfile,
+    compression: str = "none",
+) -> Dict[str, Any]:
+    """
+    Navigates an already open Playwright page to `url`, saves the rendered
+    HTML to `target_path` and collects its links. The page is not closed, so
+    it can come from a BrowserPool. `profile` decides what to wait for.
+    """
+    try:
+        response = await page.goto(
+            url, timeout=timeout * 1000, wait_until=profile.wait_until
+        )
+        if not response:
+            return {
+                "status": "failed",
+                "error_message": "No response received from page",
+            }
+
+        if not response.ok:
+            return {
+                "status": "failed",
+                "error_message": f"HTTP {response.status}",
+                "http_status": response.status,
+            }
+
+        if profile.wait_for_selector:
+            try:
+                await page.wait_for_selector(
+                    profile.wait_for_selector, timeout=timeout * 1000
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Selector '{profile.wait_for_selector}' not found on {url} ({e}); saving page as rendered."
+                )
+
+        # Get rendered HTML
+        content = await page.content()
+        content_bytes = content.encode('utf-8')
+
+        # Calculate MD5
+        content_md5 = hashlib.md5(content_bytes).hexdigest()
+
+        # Text SimHash for near-duplicate detection (links come from the browser)
+        text_scanner = _StreamingLinkExtractor(url, "utf-8")
+        text_scanner.feed_bytes(content_bytes)
+        text_scanner.close()
+
+        # Extract links (single round trip to the browser for all anchors)
+        detected_links = []
+        try:
+            hrefs = await page.eval_on_selector_all(
+                'a[href]', "els => els.map(e => e.getAttribute('href'))"
+            )
+            for href in hrefs:
+                href = (href or "").strip()
+                # Same filter as the httpx path (_StreamingLinkExtractor)
+                if href and not href.lower().startswith(NON_NAVIGATIONAL_PREFIXES):
+                    abs_url = urljoin(url, href)
+                    detected_links.append(abs_url)
+        except Exception as e:
+            logger.warning(f"Error extracting links from {url}: {e}")
+
+        # Write content
+        try:
+            logger.debug(f"Attempting to write {len(content_bytes)} bytes (Playwright) to {target_path}")
+            _write_page_file(target_path, content_bytes, compression)
+            logger.info(f"Successfully saved (Playwright) {url} to {target_path}")
+        except OSError as e:
+            error_msg = f"Failed to write file (Playwright) {target_path} due to OSError: {e}"
+            logger.error(error_msg, exc_info=True)
+            return {
+                "status": "failed",
+                "error_message": error_msg,
+                "http_status": response.status,
+            }
+        except Exception as e:
+            error_msg = f"Unexpected error writing file (Playwright) {target_path}: {e}"
+            logger.error(error_msg, exc_info=True)
+            return {
+                "status": "failed",
+                "error_message": error_msg,
+                "http_status": response.status,
+            }
+
+        return {
+            "status": "success",
+            "target_path": str(target_path),
+            "content_md5": content_md5,
+            "http_status": response.status,
+            "detected_links": detected_links,
+            "simhash": text_scanner.simhash,
+        }
+
+    except Exception as e:
+        if 'ERR_BLOCKED_BY_CLIENT' in str(e):
+            return {
+                "status": "failed_paywall",
+                "error_message": "Blocked by paywall/client-side protection",
+            }
+        return {
+            "status": "failed",
+            "error_message": f"Navigation failed: {str(e)}",
+        }
+
+
 async def fetch_single_url_playwright(
     url: str,
     target_local_path: str,
     force: bool = False,
     allowed_base_dir: str = "",
     timeout: int = 30,
+    browser_pool: Optional[BrowserPool] = None,
+    render_profile: Optional[RenderProfile] = None,
+    compression: str = "none",
 ) -> Dict[str, Any]:
     """
     Fetches a single URL using Playwright and saves it to the target path.
@@ -322,6 +842,11 @@ async def fetch_single_url_playwright(
         force: Whether to overwrite existing files
         allowed_base_dir: Base directory that target_local_path must be under
         timeout: Maximum time to wait for page load in seconds
+        browser_pool: Shared BrowserPool of the crawl. If None, a browser is
+                      launched for this single call and closed afterwards.
+        render_profile: Wait condition and request blocking. Defaults to the
+                        pool's profile, or RenderProfile() without a pool.
+        compression: How to store the rendered HTML: "none", "gzip" or "zstd"
 
     Returns:
         Dictionary with status information and results
@@ -353,118 +878,30 @@ async def fetch_single_url_playwright(
             "error_message": f"Failed to create directory {target_path.parent}: {e}",
         }
 
+    if browser_pool is not None:
+        profile = render_profile or browser_pool.profile
+        try:
+            async with browser_pool.page() as page:
+                return await _render_page_to_file(
+                    page, url, target_path, timeout, profile, compression
+                )
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error_message": f"Playwright error: {str(e)}",
+            }
+
     try:
         async with async_playwright() as p:
             browser = await p.chromium.launch()
-            page = await browser.new_page()
-            
             try:
-                response = await page.goto(url, timeout=timeout * 1000, wait_until='networkidle')
-                if not response:
-                    return {
-                        "status": "failed",
-                        "error_message": "No response received from page",
-                    }
-                
-                if not response.ok:
-                    return {
-                        "status": "failed",
-                        "error_message": f"HTTP {response.status}",
-                        "http_status": response.status,
-                    }
-
-                # Get rendered HTML
-                content = await page.content()
-                content_bytes = content.encode('utf-8')
-
-                # Calculate MD5
-                content_md5 = hashlib.md5(content_bytes).hexdigest()
-
-                # Extract links
-                detected_links = []
-                try:
-                    for a in await page.query_selector_all('a[href]'):
-                        href = await a.get_attribute('href')
-                        if href and not href.startswith(('#', 'javascript:', 'mailto:')):
-                            abs_url = urljoin(url, href)
-                            detected_links.append(abs_url)
-                except Exception as e:
-                    logger.warning(f"Error extracting links from {url}: {e}")
-
-                # Write content
-                file_written_successfully = False # Flag to track success
-                try:
-                    logger.debug(f"Attempting to write {len(content_bytes)} bytes (Playwright) to {target_path}")
-                    target_path.write_bytes(content_bytes)
-                    file_written_successfully = True
-                    logger.info(f"Successfully saved (Playwright) {url} to {target_path}")
-                except OSError as e:
-                    error_msg = f"Failed to write file (Playwright) {target_path} due to OSError: {e}"
-                    logger.error(error_msg, exc_info=True)
-                    return {
-                        "status": "failed",
-                        "error_message": error_msg,
-                        "http_status": response.status if response else None,
-                    }
-                except Exception as e:
-                    error_msg = f"Unexpected error writing file (Playwright) {target_path}: {e}"
-                    logger.error(error_msg, exc_info=True)
-                    return {
-                        "status": "failed",
-                        "error_message": error_msg,
-                        "http_status": response.status if response else None,
-                    }
-
-                if file_written_successfully:
-                    # Note: The original success return block starting at line 447 is kept,
-                    # this diff only replaces the try/except block for writing.
-                    pass # Placeholder, the actual success return is handled later
-                else:
-                    logger.error(f"File writing did not succeed (Playwright) for {target_path}, returning failure.")
-                    return {
-                        "status": "failed",
-                        "error_message": "File writing failed for unknown reason after download (Playwright).",
-                        "http_status": response.status if response else None,
-                    }
-
-                # --- Success/Failure Return (Based on Flag) ---
-                if file_written_successfully:
-                    # This return was already here, just moved after the flag check
-                    return {
-                        "status": "success",
-                        "target_path": str(target_path),
-                        "content_md5": content_md5,
-                        "http_status": response.status,
-                        "detected_links": detected_links,
-                    }
-                else:
-                    logger.error(f"File writing did not succeed (Playwright) for {target_path}, returning failure.")
-                    return {
-                        "status": "failed",
-                        "error_message": "File writing failed for unknown reason after download (Playwright).",
-                        "http_status": response.status if response else None,
-                    }
-
-                return {
-                    "status": "success",
-                    "target_path": str(target_path),
-                    "content_md5": content_md5,
-                    "http_status": response.status,
-                    "detected_links": detected_links,
-                }
-
-            except Exception as e:
-                if 'ERR_BLOCKED_BY_CLIENT' in str(e):
-                    return {
-                        "status": "failed_paywall",
-                        "error_message": "Blocked by paywall/client-side protection",
-                    }
-                return {
-                    "status": "failed",
-                    "error_message": f"Navigation failed: {str(e)}",
-                }
+                profile = render_profile or RenderProfile()
+                page = await browser.new_page()
+                await install_request_blocking(page, profile)
+                return await _render_page_to_file(
+                    page, url, target_path, timeout, profile, compression
+                )
             finally:
-                await page.close()
                 await browser.close()
 
     except Exception as e:
@@ -0,0 +1,238 @@
+"""
+Module: frontier.py
+
+Description:
+Priority frontier for the web crawler. `PriorityFrontier` is an
+`asyncio.Queue` of `(url, depth)` items with the same put/get/task_done/join
+interface. Instead of first-in first-out, it hands out the lowest-scoring URL
+first. With a plain FIFO, a page with thousands of navigation links floods
+the queue ahead of the content of the pages discovered before it. With a
+score, a crawl that is cut short by a page or time budget has fetched the
+most valuable pages.
+
+Scoring is pluggable: any `Scorer` callable `(url, depth, lastmod) -> float`
+works (lower is fetched sooner; ties keep insertion order). `DefaultScorer`
+combines:
+
+  - depth, which dominates, so the crawl stays roughly breadth-first;
+  - URL-pattern weights (e.g. `/docs/`, `/api/` sooner; tag, search,
+    login and pagination pages later);
+  - sitemap `lastmod` recency, for URLs seeded from sitemaps;
+  - penalties for likely duplicates: versioned paths for a version other
+    than the start URL's (`/v2/`, `/3.11/`), query strings, print views,
+    and repeated path segments (spider traps).
+
+`fifo_scorer` gives back the plain FIFO order.
+
+Because the order is no longer strictly by depth, a URL can occasionally be
+first reached through a deeper path than the shortest one. That only matters
+for pages at the depth limit.
+
+Third-Party Documentation:
+- asyncio.Queue: https://docs.python.org/3/library/asyncio-queue.html
+- heapq: https://docs.python.org/3/library/heapq.html
+
+Sample Input/Output:
+  frontier = PriorityFrontier(DefaultScorer("https://docs.example.com/"))
+  frontier.put_nowait(("https://docs.example.com/tags/misc", 1))
+  frontier.put_nowait(("https://docs.example.com/docs/install", 1))
+  frontier.get_nowait()  # -> ('https://docs.example.com/docs/install', 1)
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import re
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+Scorer = Callable[[str, int, Optional[datetime]], float]
+
+FRONTIER_ORDERS = ("priority", "fifo")
+
+# Regex (matched against the URL path) -> score adjustment; negative is sooner
+DEFAULT_PATH_WEIGHTS: Dict[str, float] = {
+    r"/(docs?|documentation|guides?|tutorials?|manual)(/|$)": -0.5,
+    r"/(api|reference|ref)(/|$)": -0.4,
+    r"/(getting-started|quickstart|install(ation)?)(/|$)": -0.3,
+    r"/(tags?|categor(y|ies)|authors?|archives?)(/|$)": 0.6,
+    r"/page/\d+/?$": 0.6,
+    r"/(search|login|signin|signup|register|logout|share)(/|$)": 1.0,
+    r"/(blog|news|changelog|releases?)(/|$)": 0.3,
+}
+
+_VERSION_SEGMENT = re.compile(r"^(v\d+(\.\d+)*|\d+\.\d+(\.\d+)*|\d+\.x)$", re.IGNORECASE)
+_PRINT_VIEW = re.compile(r"(^|[/?&])(print|printable)([=/]|$)", re.IGNORECASE)
+
+
+def fifo_scorer(url: str, depth: int, lastmod: Optional[datetime]) -> float:
+    """Scores every URL the same, which turns the frontier into a FIFO."""
+    return 0.0
+
+
+class DefaultScorer:
+    """
+    Breadth-first-leaning scorer with URL-pattern weights and duplicate penalties.
+
+    Args:
+        start_url: Start URL of the crawl; its version segment is not penalized.
+        path_weights: Regex -> adjustment, matched against the URL path.
+        depth_weight: Score per level of depth.
+        lastmod_weight: Largest bonus for a just-modified sitemap page.
+        lastmod_half_life_days: Age at which the lastmod bonus halves.
+        version_penalty: Penalty for a version segment unlike the start URL's.
+        duplicate_penalty: Penalty for query strings, print views and repeated segments.
+    """
+
+    def __init__(
+        self,
+        start_url: str = "",
+        path_weights: Optional[Dict[str, float]] = None,
+        depth_weight: float = 1.0,
+        lastmod_weight: float = 0.5,
+        lastmod_half_life_days: float = 180.0,
+        version_penalty: float = 1.5,
+        duplicate_penalty: float = 0.5,
+    ):
+        weights = DEFAULT_PATH_WEIGHTS if path_weights is None else path_weights
+        self.path_weights = [(re.compile(p, re.IGNORECASE), w) for p, w in weights.items()]
+        self.depth_weight = depth_weight
+        self.lastmod_weight = lastmod_weight
+        self.lastmod_half_life_days = lastmod_half_life_days
+        self.version_penalty = version_penalty
+        self.duplicate_penalty = duplicate_penalty
+        self.start_versions = {
+            segment.lower()
+            for segment in urlparse(start_url).path.split("/")
+            if _VERSION_SEGMENT.match(segment)
+        }
+
+    def __call__(self, url: str, depth: int, lastmod: Optional[datetime] = None) -> float:
+        parsed = urlparse(url)
+        path = parsed.path or "/"
+        score = depth * self.depth_weight
+        for pattern, weight in self.path_weights:
+            if pattern.search(path):
+                score += weight
+
+        segments = [s for s in path.lower().split("/") if s]
+        if any(_VERSION_SEGMENT.match(s) and s not in self.start_versions for s in segments):
+            score += self.version_penalty
+        if parsed.query:
+            score += self.duplicate_penalty
+        if _PRINT_VIEW.search(path) or _PRINT_VIEW.search(parsed.query):
+            score += self.duplicate_penalty
+        if len(segments) != len(set(segments)):
+            score += self.duplicate_penalty
+
+        if lastmod is not None and self.lastmod_weight:
+            age_days = max(0.0, (datetime.now(timezone.utc) - lastmod).total_seconds() / 86400)
+            score -= self.lastmod_weight * math.pow(0.5, age_days / self.lastmod_half_life_days)
+        return score
+
+
+class PriorityFrontier(asyncio.Queue):
+    """
+    asyncio.Queue of `(url, depth)` items, served lowest score first.
+
+    `None` (the worker exit signal) always sorts last. Sitemap `lastmod`
+    values can be attached with `set_lastmod` before a URL is put.
+
+    Args:
+        scorer: Scoring callable (DefaultScorer() if None).
+        maxsize: As for asyncio.Queue.
+    """
+
+    def __init__(self, scorer: Optional[Scorer] = None, maxsize: int = 0):
+        self.scorer: Scorer = scorer if scorer is not None else DefaultScorer()
+        self._lastmods: Dict[str, datetime] = {}
+        super().__init__(maxsize)
+
+    # asyncio.Queue storage hooks, as asyncio.PriorityQueue overrides them
+    def _init(self, maxsize: int) -> None:
+        self._queue = []
+        self._counter = itertools.count()
+
+    def _put(self, item: Optional[Tuple[str, int]]) -> None:
+        if item is None:
+            priority = math.inf
+        else:
+            url, depth = item
+            priority = self.scorer(url, depth, self._lastmods.pop(url, None))
+        heapq.heappush(self._queue, (priority, next(self._counter), item))
+
+    def _get(self) -> Optional[Tuple[str, int]]:
+        return heapq.heappop(self._queue)[2]
+
+    def set_lastmod(self, url: str, lastmod: Optional[datetime]) -> None:
+        """Records a sitemap lastmod for `url`, used when it is next put."""
+        if lastmod is not None:
+            self._lastmods[url] = lastmod
+
+    def peek_scores(self, limit: int = 10) -> Iterable[Tuple[float, Tuple[str, int]]]:
+        """The `limit` best (score, item) pairs, for logging and tests."""
+        return [(score, item) for score, _, item in heapq.nsmallest(limit, self._queue)]
+
+
+def make_frontier(order: str = "priority", start_url: str = "", scorer: Optional[Scorer] = None) -> PriorityFrontier:
+    """
+    Creates the crawl frontier.
+
+    Args:
+        order: "priority" (DefaultScorer) or "fifo"; ignored if `scorer` is given.
+        start_url: Start URL of the crawl (for DefaultScorer).
+        scorer: Custom scoring callable.
+
+    Raises:
+        ValueError: For an unknown order.
+    """
+    if scorer is None:
+        if order == "priority":
+            scorer = DefaultScorer(start_url)
+        elif order == "fifo":
+            scorer = fifo_scorer
+        else:
+            raise ValueError(f"Unknown frontier order '{order}', expected one of {FRONTIER_ORDERS}")
+    return PriorityFrontier(scorer)
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    start = "https://docs.example.com/3.12/"
+    frontier = make_frontier("priority", start)
+    nav_links = [f"https://docs.example.com/3.12/tags/t{i}" for i in range(5)] + [
+        "https://docs.example.com/3.11/docs/install",
+        "https://docs.example.com/3.12/search?q=x",
+        "https://docs.example.com/3.12/docs/install",
+        "https://docs.example.com/3.12/api/reference",
+        "https://docs.example.com/3.12/docs/docs/docs/install",
+    ]
+    for link in nav_links:
+        frontier.put_nowait((link, 1))
+    frontier.set_lastmod("https://docs.example.com/3.12/whatsnew", datetime.now(timezone.utc))
+    frontier.put_nowait(("https://docs.example.com/3.12/whatsnew", 1))
+    frontier.put_nowait(None)
+
+    order = []
+    while not frontier.empty():
+        item = frontier.get_nowait()
+        if item is not None:
+            order.append(item[0])
+    for url in order:
+        print(url)
+    assert order[0] == "https://docs.example.com/3.12/docs/install"
+    assert order[-1] == "https://docs.example.com/3.12/search?q=x"
+    assert order.index("https://docs.example.com/3.11/docs/install") > order.index(
+        "https://docs.example.com/3.12/tags/t4"
+    )
+
+    fifo = make_frontier("fifo")
+    for link in nav_links:
+        fifo.put_nowait((link, 1))
+    assert [fifo.get_nowait()[0] for _ in nav_links] == nav_links
+
+    print("\n------------------------------------")
+    print("✓ Frontier examples passed successfully.")
+    print("------------------------------------")
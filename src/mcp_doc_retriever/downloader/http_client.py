@@ -0,0 +1,214 @@
+"""
+Module: http_client.py
+
+Description:
+Builds the shared `httpx.AsyncClient` used by a crawl and measures how well
+it reuses connections.
+
+  - Pool limits are set explicitly from the crawl's concurrency: at most one
+    connection per in-flight request overall, and enough idle keep-alive
+    connections to serve one host at its full per-host concurrency, kept for
+    `DEFAULT_KEEPALIVE_EXPIRY` seconds (httpx's default of 5s drops them
+    between bursts, e.g. while a host is paced by Crawl-delay).
+  - HTTP/2 is negotiated via ALPN when `http2=True` and the optional `h2`
+    package is installed (`pip install httpx[http2]`), so concurrent requests
+    to a host are multiplexed over one connection instead of each opening its
+    own TCP+TLS connection. Hosts that only speak HTTP/1.1 keep working.
+  - `ConnectionStats` hooks into httpcore's request tracing and counts, per
+    host, requests, newly opened connections, TLS handshakes and responses
+    per HTTP version. `snapshot()` / `summary()` expose them for tuning.
+
+Third-Party Documentation:
+- httpx resource limits: https://www.python-httpx.org/advanced/resource-limits/
+- httpx HTTP/2: https://www.python-httpx.org/http2/
+- httpcore trace extension: https://www.encode.io/httpcore/extensions/#trace
+
+Sample Input/Output:
+  client, stats = make_crawl_client(max_connections=50, per_host_connections=50, http2=True)
+  async with client:
+      await client.get("https://docs.example.com/")
+  stats.snapshot()["docs.example.com"]
+  # -> {'requests': 1, 'connections': 1, 'tls_handshakes': 1, 'reused': 0, 'http_versions': {'HTTP/2': 1}}
+"""
+
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (only needed by httpcore when HTTP/2 is enabled)
+
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Idle connections are kept this long for reuse (httpx default: 5s)
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+@dataclass
+class _HostConnections:
+    """Connection counters for a single host."""
+
+    requests: int = 0
+    connections: int = 0
+    tls_handshakes: int = 0
+    http_versions: Counter = field(default_factory=Counter)
+
+
+class ConnectionStats:
+    """
+    Per-host connection reuse counters, fed by httpx event hooks and httpcore
+    trace events. A request that did not open a connection reused one (an
+    idle keep-alive connection, or an HTTP/2 connection it was multiplexed on).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostConnections] = {}
+
+    def _host(self, host: str) -> _HostConnections:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostConnections()
+        return state
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        host = request.url.host
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                with self._lock:
+                    self._host(host).connections += 1
+            elif event_name == "connection.start_tls.complete":
+                with self._lock:
+                    self._host(host).tls_handshakes += 1
+
+        request.extensions["trace"] = trace
+        with self._lock:
+            self._host(host).requests += 1
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        with self._lock:
+            self._host(response.request.url.host).http_versions[response.http_version] += 1
+
+    def event_hooks(self) -> Dict[str, list]:
+        """Hooks to pass as `httpx.AsyncClient(event_hooks=...)`."""
+        return {"request": [self._on_request], "response": [self._on_response]}
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counters per host (for logging/tests)."""
+        with self._lock:
+            return {
+                host: {
+                    "requests": state.requests,
+                    "connections": state.connections,
+                    "tls_handshakes": state.tls_handshakes,
+                    "reused": max(0, state.requests - state.connections),
+                    "http_versions": dict(state.http_versions),
+                }
+                for host, state in self._hosts.items()
+            }
+
+    def summary(self) -> str:
+        """One-line totals over all hosts."""
+        hosts = self.snapshot()
+        requests = sum(h["requests"] for h in hosts.values())
+        connections = sum(h["connections"] for h in hosts.values())
+        handshakes = sum(h["tls_handshakes"] for h in hosts.values())
+        versions: Counter = Counter()
+        for h in hosts.values():
+            versions.update(h["http_versions"])
+        reuse = (1 - connections / requests) if requests else 0.0
+        by_version = ", ".join(f"{v}: {n}" for v, n in sorted(versions.items())) or "none"
+        return (
+            f"{requests} requests over {connections} connections "
+            f"({handshakes} TLS handshakes, {reuse:.0%} reused) to {len(hosts)} hosts; "
+            f"responses by version: {by_version}"
+        )
+
+
+def make_client_limits(
+    max_connections: int,
+    per_host_connections: int,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+) -> httpx.Limits:
+    """
+    Pool limits for a crawl: `max_connections` (the global request
+    concurrency) caps open connections, and up to `per_host_connections` idle
+    ones are kept alive.
+    """
+    max_connections = max(1, max_connections)
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(max_connections, max(1, per_host_connections)),
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+def make_crawl_client(
+    max_connections: int,
+    per_host_connections: int,
+    http2: bool = True,
+    stats: Optional[ConnectionStats] = None,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    timeout: Optional[httpx.Timeout] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Tuple[httpx.AsyncClient, ConnectionStats]:
+    """
+    Creates the crawl's shared client and the `ConnectionStats` it reports
+    to. HTTP/2 is only enabled when `h2` is installed; otherwise a warning is
+    logged and the client speaks HTTP/1.1.
+    """
+    if http2 and not H2_AVAILABLE:
+        logger.warning("HTTP/2 needs the 'h2' package (pip install httpx[http2]); using HTTP/1.1.")
+        http2 = False
+    stats = stats if stats is not None else ConnectionStats()
+    limits = make_client_limits(max_connections, per_host_connections, keepalive_expiry)
+    client = httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=timeout if timeout is not None else httpx.Timeout(30.0, connect=15),
+        headers=headers,
+        limits=limits,
+        http2=http2,
+        event_hooks=stats.event_hooks(),
+        transport=transport,
+    )
+    logger.debug(
+        f"Crawl client: HTTP/2 {'on' if http2 else 'off'}, max_connections={limits.max_connections}, "
+        f"keepalive={limits.max_keepalive_connections} for {keepalive_expiry:.0f}s"
+    )
+    return client, stats
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import asyncio
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    async def _demo() -> None:
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, text="ok"))
+        client, stats = make_crawl_client(50, 12, http2=True, transport=transport)
+        async with client:
+            await asyncio.gather(*(client.get(f"http://docs.example.com/p{i}") for i in range(20)))
+        # MockTransport opens no connections, so every request counts as reused
+        print(stats.snapshot())
+        print(stats.summary())
+        assert stats.snapshot()["docs.example.com"]["requests"] == 20
+        limits = make_client_limits(50, 12)
+        assert (limits.max_connections, limits.max_keepalive_connections) == (50, 12)
+
+    asyncio.run(_demo())
+    print(f"h2 installed: {H2_AVAILABLE}")
+
+    print("\n------------------------------------")
+    print("✓ HTTP client examples passed successfully.")
+    print("------------------------------------")
@@ -0,0 +1,263 @@
+"""
+Module: index_writer.py
+
+Description:
+Buffered writer for the per-download JSONL index. Crawl workers hand
+`IndexRecord`s to an `IndexWriter`, which only enqueues them. A single
+writer task keeps the index file open and does all the file I/O:
+
+  - Batching: every record already waiting in the queue (up to `batch_size`)
+    goes out in one write call.
+  - Flushing: buffered data is flushed to the OS once `flush_records` records
+    are pending or `flush_interval` seconds have passed since the last flush,
+    so readers see new records promptly without a flush per URL.
+  - Durability: the file is fsync'ed every `fsync_every` records, on
+    `checkpoint()` and when the writer is closed.
+
+Workers only wait if the bounded queue is full, i.e. the disk is far behind.
+
+Third-Party Documentation:
+- aiofiles: https://github.com/Tinche/aiofiles
+- asyncio queues: https://docs.python.org/3/library/asyncio-queue.html
+
+Sample Input/Output:
+  async with IndexWriter(Path("downloads/index/my_crawl.jsonl")) as writer:
+      await writer.write(record)   # returns once queued
+      await writer.checkpoint()    # returns once everything queued so far is fsync'ed
+  # -> records appended to my_crawl.jsonl, file flushed, synced and closed
+"""
+
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Union
+
+import aiofiles
+
+from .models import IndexRecord
+
+logger = logging.getLogger(__name__)
+
+# Records written per write call (taken from whatever is already queued)
+DEFAULT_BATCH_SIZE = 256
+# Pending (unflushed) records that trigger a flush
+DEFAULT_FLUSH_RECORDS = 512
+# Maximum age of unflushed data, in seconds
+DEFAULT_FLUSH_INTERVAL = 1.0
+# Records between automatic fsyncs
+DEFAULT_FSYNC_EVERY = 2000
+# Queue bound; workers only block when this many records are waiting
+DEFAULT_MAX_QUEUED = 10000
+
+_STOP = object()
+
+
+class IndexWriter:
+    """
+    Single-task, batching appender for a JSONL index file.
+
+    Args:
+        index_path: The JSONL index file (opened in append mode).
+        batch_size: Maximum records serialized into one write call.
+        flush_records: Unflushed records that trigger a flush.
+        flush_interval: Seconds after which unflushed data is flushed anyway.
+        fsync_every: Records between automatic fsyncs (0 disables them).
+        max_queued: Bound of the record queue.
+    """
+
+    def __init__(
+        self,
+        index_path: Path,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_records: int = DEFAULT_FLUSH_RECORDS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        fsync_every: int = DEFAULT_FSYNC_EVERY,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+    ):
+        self.index_path = Path(index_path)
+        self.batch_size = max(1, batch_size)
+        self.flush_records = max(1, flush_records)
+        self.flush_interval = flush_interval
+        self.fsync_every = max(0, fsync_every)
+        self._queue: "asyncio.Queue[Union[str, asyncio.Future, object]]" = asyncio.Queue(
+            maxsize=max(1, max_queued)
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.records_written = 0
+        self.write_errors = 0
+
+    async def __aenter__(self) -> "IndexWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Starts the writer task (idempotent)."""
+        if self._closed:
+            raise RuntimeError("IndexWriter is closed")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"index-writer:{self.index_path.name}")
+
+    async def write(self, record: IndexRecord) -> None:
+        """Queues a record for appending; serialization happens here, I/O does not."""
+        if self._closed:
+            raise RuntimeError("IndexWriter is closed")
+        self.start()
+        if self._task.done():
+            # The writer task died (e.g. the file could not be opened); it already logged why
+            self.write_errors += 1
+            logger.error(f"Index writer is not running, dropping record for {record.canonical_url}")
+            return
+        await self._queue.put(record.model_dump_json(exclude_none=True))
+
+    async def checkpoint(self) -> None:
+        """Waits until every record queued so far is written, flushed and fsync'ed."""
+        if self._closed:
+            return
+        self.start()
+        if self._task.done():
+            return
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put(done)
+        await done
+
+    async def close(self) -> None:
+        """Writes everything still queued, fsyncs and closes the file."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self._queue.put(_STOP)
+        try:
+            await self._task
+        except Exception as e:
+            logger.error(f"Index writer for {self.index_path} failed: {e}", exc_info=True)
+        logger.debug(
+            f"Index writer closed for {self.index_path} ({self.records_written} records written)"
+        )
+
+    async def _run(self) -> None:
+        async with aiofiles.open(self.index_path, "a", encoding="utf-8") as f:
+            unflushed = 0
+            unsynced = 0
+            last_flush = time.monotonic()
+            getter: Optional[asyncio.Task] = None
+            stop = False
+            try:
+                while not stop:
+                    if getter is None:
+                        getter = asyncio.ensure_future(self._queue.get())
+                    timeout = None
+                    if unflushed:
+                        timeout = max(0.0, last_flush + self.flush_interval - time.monotonic())
+                    # asyncio.wait (unlike wait_for) never drops an item on timeout
+                    done, _ = await asyncio.wait({getter}, timeout=timeout)
+                    if not done:
+                        await self._flush(f)
+                        unflushed, last_flush = 0, time.monotonic()
+                        continue
+
+                    items = [getter.result()]
+                    getter = None
+                    while len(items) < self.batch_size:
+                        try:
+                            items.append(self._queue.get_nowait())
+                        except asyncio.QueueEmpty:
+                            break
+
+                    lines: List[str] = []
+                    checkpoints: List[asyncio.Future] = []
+                    for item in items:
+                        if item is _STOP:
+                            stop = True
+                        elif isinstance(item, asyncio.Future):
+                            checkpoints.append(item)
+                        else:
+                            lines.append(item)
+
+                    if lines:
+                        await self._write_lines(f, lines)
+                        unflushed += len(lines)
+                        unsynced += len(lines)
+
+                    sync_due = self.fsync_every and unsynced >= self.fsync_every
+                    if stop or checkpoints or sync_due:
+                        await self._flush(f, sync=True)
+                        unflushed, unsynced, last_flush = 0, 0, time.monotonic()
+                    elif unflushed >= self.flush_records or (
+                        unflushed and time.monotonic() - last_flush >= self.flush_interval
+                    ):
+                        await self._flush(f)
+                        unflushed, last_flush = 0, time.monotonic()
+
+                    for waiter in checkpoints:
+                        if not waiter.done():
+                            waiter.set_result(None)
+            finally:
+                if getter is not None:
+                    getter.cancel()
+                # Release anyone still waiting on a checkpoint (e.g. after cancellation)
+                while not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if isinstance(item, asyncio.Future) and not item.done():
+                        item.set_result(None)
+
+    async def _write_lines(self, f, lines: List[str]) -> None:
+        try:
+            await f.write("\n".join(lines) + "\n")
+            self.records_written += len(lines)
+        except Exception as e:
+            self.write_errors += len(lines)
+            logger.critical(
+                f"CRITICAL: Failed to write {len(lines)} index records to {self.index_path}: {e}",
+                exc_info=True,
+            )
+
+    async def _flush(self, f, sync: bool = False) -> None:
+        try:
+            await f.flush()
+            if sync:
+                await asyncio.to_thread(os.fsync, f.fileno())
+        except Exception as e:
+            logger.error(f"Failed to flush index file {self.index_path}: {e}")
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import json
+    import tempfile
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    async def _demo(path: Path) -> None:
+        async with IndexWriter(path, batch_size=64) as writer:
+            start = time.monotonic()
+            for i in range(5000):
+                await writer.write(
+                    IndexRecord(
+                        original_url=f"http://example.com/{i}",
+                        canonical_url=f"http://example.com/{i}",
+                        local_path=f"content/demo/example.com/{i}.html",
+                        fetch_status="success",
+                    )
+                )
+            await writer.checkpoint()
+            print(f"5000 records queued and synced in {time.monotonic() - start:.3f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_file = Path(tmp) / "demo.jsonl"
+        asyncio.run(_demo(index_file))
+        lines = index_file.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 5000
+        assert json.loads(lines[-1])["canonical_url"] == "http://example.com/4999"
+
+    print("\n------------------------------------")
+    print("✓ Index writer examples passed successfully.")
+    print("------------------------------------")
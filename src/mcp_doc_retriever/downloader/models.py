@@ -23,19 +23,31 @@ class IndexRecord(BaseModel):
         canonical_url: The canonical version of the URL after normalization/redirects.
         local_path: Filesystem path where the content was saved (if successful). String for flexibility.
         content_md5: MD5 hash of the downloaded content (if calculated).
+        etag: ETag response header, sent back as If-None-Match when revalidating.
+        last_modified: Last-Modified response header, sent back as If-Modified-Since.
         fetch_status: Outcome of the fetch attempt. Includes specific failure reasons.
+            'not_modified' means the server answered 304 and the local copy is current.
+            'duplicate' means the page's text is a near-duplicate of `duplicate_of`;
+            searches skip it. Its file is kept (local_path) unless the crawl
+            deletes duplicates, in which case local_path is empty.
         http_status: HTTP status code received from the server (if applicable).
         error_message: Description of the error if fetch_status indicates failure.
         content_blocks: List of extracted content blocks (code, json, text) found on the page.
         code_snippets: Deprecated field for backward compatibility, prefer content_blocks.
+        simhash: 64-bit SimHash of the page text (16 hex digits), for near-duplicate detection.
+        duplicate_of: Canonical URL of the page this one duplicates ('duplicate' status).
     """
 
     original_url: str
     canonical_url: str
     local_path: str  # Store as string, Path object might not serialize well directly to JSONL
     content_md5: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
     fetch_status: Literal[
         "success",
+        "not_modified",
+        "duplicate",
         "failed_request",
         "failed_robotstxt",
         "failed_paywall",
@@ -52,6 +64,8 @@ class IndexRecord(BaseModel):
     # Use simple forward reference string for ContentBlock
     content_blocks: Optional[List['ContentBlock']] = None
     code_snippets: Optional[list[dict]] = Field(None, description="Deprecated, use content_blocks")
+    simhash: Optional[str] = None
+    duplicate_of: Optional[str] = None
 
 # --- End Pydantic Model Moved from models.py ---
 
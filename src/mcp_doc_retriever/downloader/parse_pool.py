@@ -0,0 +1,167 @@
+"""
+Module: parse_pool.py
+
+Description:
+Process pool for the CPU-bound part of crawling. With a `ParsePool`, the
+async fetchers only stream response bodies to disk. MD5 hashing, HTML
+link extraction and text SimHashing of the saved file
+(`fetchers.scan_local_copy`) run in a `ProcessPoolExecutor`, so a crawl
+can use more than the one core the event loop runs on.
+
+The number of files being parsed at once is bounded by `max_in_flight`.
+A crawl worker that wants to submit more waits for a slot before it
+takes its next URL from the queue. That is the back-pressure that keeps
+fetching from running ahead of parsing.
+
+Workers are started with the "spawn" method, so scripts that create a
+ParsePool need the usual `if __name__ == "__main__":` guard. If a worker
+process dies, the pool is restarted and the job that failed is parsed in a
+thread instead.
+
+Third-Party Documentation:
+- concurrent.futures: https://docs.python.org/3/library/concurrent.futures.html
+- asyncio executors: https://docs.python.org/3/library/asyncio-eventloop.html#executing-code-in-thread-or-process-pools
+
+Sample Input/Output:
+  async with ParsePool(processes=4) as pool:
+      md5, links, simhash = await pool.scan("https://docs.example.com/a.html", Path("a.html"))
+  # -> ('9e107d9d372bb6826bd81d3542a419d6', ['https://docs.example.com/b.html', ...], 0x5f1c...)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .fetchers import scan_local_copy
+
+logger = logging.getLogger(__name__)
+
+# Parse jobs queued or running per worker process
+IN_FLIGHT_PER_PROCESS = 4
+
+
+def default_parse_processes() -> int:
+    """Worker processes to use when asked for 'all cores' (keeps one for the loop)."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class ParsePool:
+    """
+    Bounded ProcessPoolExecutor front-end for hashing and link extraction.
+
+    Args:
+        processes: Worker processes (defaults to cores - 1).
+        max_in_flight: Jobs submitted at once; further callers wait.
+    """
+
+    def __init__(self, processes: Optional[int] = None, max_in_flight: Optional[int] = None):
+        self.processes = max(1, processes or default_parse_processes())
+        self.max_in_flight = max(1, max_in_flight or self.processes * IN_FLIGHT_PER_PROCESS)
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._closed = False
+
+    async def __aenter__(self) -> "ParsePool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._closed:
+            raise RuntimeError("ParsePool is closed")
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Parse pool started with {self.processes} processes")
+        return self._executor
+
+    async def scan(
+        self,
+        url: str,
+        path: Path,
+        encoding: Optional[str] = None,
+        is_html: Optional[bool] = None,
+    ) -> Tuple[str, List[str], Optional[int]]:
+        """
+        Returns (md5, links, simhash) of a saved file, computed in a worker process.
+
+        Raises:
+            OSError: If the worker cannot read the file.
+        """
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(
+                    executor, scan_local_copy, url, Path(path), encoding, is_html
+                )
+            except BrokenProcessPool:
+                logger.warning(f"Parse worker died while parsing {url}; restarting the pool")
+                if self._executor is executor:
+                    self._executor = None
+                    executor.shutdown(wait=False)
+                return await asyncio.to_thread(
+                    scan_local_copy, url, Path(path), encoding, is_html
+                )
+
+    async def close(self) -> None:
+        """Waits for running jobs and stops the worker processes."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, wait=True)
+            self._executor = None
+            logger.info("Parse pool closed.")
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    links_html = "".join(f"<li><a href='/page/{i}.html'>Page {i}</a></li>" for i in range(2000))
+    html = f"<html><body><ul>{links_html}</ul>{'<p>filler text</p>' * 5000}</body></html>"
+
+    async def _demo(paths: List[Path]) -> None:
+        start = time.monotonic()
+        for path in paths:
+            scan_local_copy("https://docs.example.com/", path)
+        serial = time.monotonic() - start
+
+        async with ParsePool() as pool:
+            await pool.scan("https://docs.example.com/", paths[0])  # Warm up workers
+            start = time.monotonic()
+            results = await asyncio.gather(
+                *(pool.scan("https://docs.example.com/", path) for path in paths)
+            )
+            parallel = time.monotonic() - start
+        assert all(len(links) == 2000 for _, links, _ in results)
+        assert results[0][1][0] == "https://docs.example.com/page/0.html"
+        print(
+            f"{len(paths)} pages: {serial:.2f}s in-process, {parallel:.2f}s with "
+            f"{pool.processes} parse processes"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = []
+        for i in range(16):
+            page = Path(tmp) / f"page{i}.html"
+            page.write_text(html, encoding="utf-8")
+            pages.append(page)
+        asyncio.run(_demo(pages))
+
+    print("\n------------------------------------")
+    print("✓ Parse pool examples passed successfully.")
+    print("------------------------------------")
@@ -0,0 +1,307 @@
+"""
+Module: scheduler.py
+
+Description:
+Per-host politeness scheduler for the web crawler. `start_recursive_download`
+keeps its global semaphore as an upper bound, and every fetch additionally
+goes through a `HostScheduler` slot for the target host, which provides:
+
+  - Pacing: a token bucket of capacity one per host (a minimum spacing
+    between request starts). It is disabled by default; robots.txt
+    `Crawl-delay` / `Request-rate` (read from the cached `RobotFileParser`)
+    set the spacing.
+  - Adaptive concurrency (AIMD): each host starts at a modest concurrency and
+    grows it additively while responses are healthy. It halves it on
+    429/5xx and shrinks it when latency rises well above the best latency
+    observed for that host.
+  - Backoff: a `Retry-After` header (or an exponential default) on 429/503
+    pauses new requests to the host until the deadline passes.
+
+Third-Party Documentation:
+- asyncio: https://docs.python.org/3/library/asyncio-sync.html
+- urllib.robotparser: https://docs.python.org/3/library/urllib.robotparser.html
+
+Sample Input/Output:
+  scheduler = HostScheduler(max_concurrency=50)
+  scheduler.configure_host("docs.example.com", robots_parser, "MCPBot/1.0")
+  async with scheduler.slot("docs.example.com") as slot:
+      response = await client.get(url)
+      slot.record(response.status_code, response.headers.get("retry-after"))
+  scheduler.snapshot("docs.example.com")
+  # -> {'limit': 12.5, 'in_flight': 0, 'interval': 0.0, 'ewma_latency': 0.21, ...}
+"""
+
+import asyncio
+import email.utils
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean "slow down" rather than "this URL is broken"
+THROTTLE_STATUS_CODES = {429, 503}
+# Default pause when a throttling response carries no usable Retry-After
+DEFAULT_BACKOFF_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 300.0
+# Latency above this multiple of the host's best EWMA latency counts as congestion
+LATENCY_CONGESTION_FACTOR = 3.0
+EWMA_ALPHA = 0.2
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+@dataclass
+class _HostState:
+    """Mutable scheduling state for a single host."""
+
+    limit: float
+    interval: float = 0.0  # Minimum seconds between request starts (0 = unpaced)
+    next_start: float = 0.0  # Monotonic time at which the next request may start
+    blocked_until: float = 0.0
+    in_flight: int = 0
+    ewma_latency: Optional[float] = None
+    best_latency: Optional[float] = None
+    last_decrease: float = 0.0
+    consecutive_throttles: int = 0
+    configured: bool = False
+    condition: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+
+class HostSlot:
+    """Handle for one in-flight request; report its outcome via `record`."""
+
+    def __init__(self, scheduler: "HostScheduler", host: str):
+        self._scheduler = scheduler
+        self._host = host
+        self._started = time.monotonic()
+        self.recorded = False
+
+    def record(self, status_code: Optional[int], retry_after: Optional[str] = None) -> None:
+        """Feeds the response status (None for transport errors) back to the scheduler."""
+        self.recorded = True
+        self._scheduler._on_response(
+            self._host, status_code, time.monotonic() - self._started, retry_after
+        )
+
+
+class HostScheduler:
+    """
+    Per-host request pacing plus AIMD concurrency controller.
+
+    Args:
+        max_concurrency: Upper bound for concurrent requests to one host.
+        initial_concurrency: Starting per-host limit (defaults to a quarter of max).
+        min_concurrency: Floor the limit never shrinks below.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        initial_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        if initial_concurrency is None:
+            initial_concurrency = max(self.min_concurrency, self.max_concurrency // 4)
+        self.initial_concurrency = min(
+            self.max_concurrency, max(self.min_concurrency, initial_concurrency)
+        )
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(limit=float(self.initial_concurrency))
+            self._hosts[host] = state
+        return state
+
+    def is_configured(self, host: str) -> bool:
+        """True once `configure_host` ran for this host."""
+        return self._state(host).configured
+
+    def configure_host(
+        self, host: str, robots_parser: Optional[RobotFileParser], user_agent: str
+    ) -> None:
+        """
+        Applies robots.txt pacing for a host. `Crawl-delay` wins over
+        `Request-rate`; either one also caps the host at one request at a time.
+        """
+        state = self._state(host)
+        state.configured = True
+        if robots_parser is None:
+            return
+        interval = 0.0
+        try:
+            delay = robots_parser.crawl_delay(user_agent)
+            if delay:
+                interval = float(delay)
+            else:
+                rate = robots_parser.request_rate(user_agent)
+                if rate and rate.requests:
+                    interval = float(rate.seconds) / float(rate.requests)
+        except Exception as e:
+            logger.warning(f"Could not read crawl delay for {host}: {e}")
+            return
+        if interval > 0:
+            state.interval = interval
+            state.limit = float(self.min_concurrency)
+            logger.info(f"Pacing {host} to one request every {interval:.2f}s (robots.txt)")
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[HostSlot]:
+        """Waits until a request to `host` may start, then holds a slot for it."""
+        state = self._state(host)
+        async with state.condition:
+            while True:
+                now = time.monotonic()
+                wait = max(state.blocked_until, state.next_start) - now
+                if wait <= 0 and state.in_flight < max(1, int(state.limit)):
+                    break
+                timeout = wait if wait > 0 else None
+                try:
+                    await asyncio.wait_for(state.condition.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            state.in_flight += 1
+            state.next_start = time.monotonic() + state.interval
+
+        host_slot = HostSlot(self, host)
+        try:
+            yield host_slot
+        finally:
+            async with state.condition:
+                state.in_flight -= 1
+                state.condition.notify_all()
+
+    def _on_response(
+        self,
+        host: str,
+        status_code: Optional[int],
+        latency: float,
+        retry_after: Optional[str],
+    ) -> None:
+        state = self._state(host)
+        now = time.monotonic()
+
+        if status_code is not None and (
+            status_code in THROTTLE_STATUS_CODES or status_code >= 500
+        ):
+            state.consecutive_throttles += 1
+            self._decrease(host, state, now, factor=0.5, reason=f"HTTP {status_code}")
+            if status_code in THROTTLE_STATUS_CODES:
+                pause = parse_retry_after(retry_after)
+                if pause is None:
+                    pause = DEFAULT_BACKOFF_SECONDS * (2 ** (state.consecutive_throttles - 1))
+                pause = min(pause, MAX_BACKOFF_SECONDS)
+                state.blocked_until = max(state.blocked_until, now + pause)
+                logger.warning(f"{host} throttled (HTTP {status_code}), pausing {pause:.1f}s")
+            return
+
+        if status_code is None:
+            # Transport error (timeout, reset): treat as congestion without a pause
+            self._decrease(host, state, now, factor=0.75, reason="request error")
+            return
+
+        state.consecutive_throttles = 0
+        state.ewma_latency = (
+            latency
+            if state.ewma_latency is None
+            else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * state.ewma_latency
+        )
+        if state.best_latency is None or state.ewma_latency < state.best_latency:
+            state.best_latency = state.ewma_latency
+
+        if state.ewma_latency > LATENCY_CONGESTION_FACTOR * state.best_latency:
+            self._decrease(host, state, now, factor=0.75, reason="rising latency")
+        elif state.interval == 0:
+            # Additive increase: roughly +1 per window of `limit` healthy responses
+            state.limit = min(float(self.max_concurrency), state.limit + 1.0 / state.limit)
+
+    def _decrease(
+        self, host: str, state: _HostState, now: float, factor: float, reason: str
+    ) -> None:
+        # At most one decrease per observed round trip, so a burst of failures
+        # from requests already in flight does not collapse the limit to the floor
+        window = state.ewma_latency or 1.0
+        if now - state.last_decrease < window:
+            return
+        state.last_decrease = now
+        new_limit = max(float(self.min_concurrency), state.limit * factor)
+        if int(new_limit) != int(state.limit):
+            logger.info(f"Reducing concurrency for {host}: {state.limit:.1f} -> {new_limit:.1f} ({reason})")
+        state.limit = new_limit
+
+    def snapshot(self, host: str) -> Dict[str, Optional[float]]:
+        """Returns the current scheduling state of a host (for logging/tests)."""
+        state = self._state(host)
+        return {
+            "limit": state.limit,
+            "in_flight": state.in_flight,
+            "interval": state.interval,
+            "ewma_latency": state.ewma_latency,
+            "blocked_for": max(0.0, state.blocked_until - time.monotonic()),
+        }
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    async def _demo() -> None:
+        scheduler = HostScheduler(max_concurrency=8)
+        host = "docs.example.com"
+
+        rp = RobotFileParser()
+        # The stdlib parser only accepts integer Crawl-delay; use Request-rate here
+        rp.parse(["User-agent: *", "Request-rate: 10/1"])
+        scheduler.configure_host(host, rp, "MCPBot/1.0")
+        assert scheduler.snapshot(host)["interval"] == 0.1
+
+        start = time.monotonic()
+        for _ in range(3):
+            async with scheduler.slot(host) as slot:
+                slot.record(200)
+        elapsed = time.monotonic() - start
+        print(f"3 paced requests took {elapsed:.2f}s")
+        assert elapsed >= 0.2
+
+        other = "api.example.com"
+        before = scheduler.snapshot(other)["limit"]
+        for _ in range(20):
+            async with scheduler.slot(other) as slot:
+                slot.record(200)
+        grown = scheduler.snapshot(other)["limit"]
+        print(f"Healthy host limit grew {before:.2f} -> {grown:.2f}")
+        assert grown > before
+
+        async with scheduler.slot(other) as slot:
+            slot.record(429, retry_after="1")
+        snap = scheduler.snapshot(other)
+        print(f"After 429: {snap}")
+        assert snap["limit"] < grown and snap["blocked_for"] > 0
+
+    asyncio.run(_demo())
+    print("\n------------------------------------")
+    print("✓ Host scheduler examples passed successfully.")
+    print("------------------------------------")
@@ -0,0 +1,268 @@
+"""
+Module: segments.py
+
+Description:
+Segment storage for crawled pages. Instead of one file per URL, pages are
+appended to a few large files under `<base_dir>/segments/<download_id>/`
+(`00001.seg`, `00002.seg`, ...), so a crawl of tens of thousands of pages
+creates a handful of files, and a full scan reads them sequentially.
+
+Each entry is written WARC-style as a header line followed by the body:
+
+    MCPSEG/1 <length> <url>\\n<body bytes>\\n
+
+A page is addressed by a locator path that is used as the index record's
+`local_path`:
+
+    segments/<download_id>/00001.seg/<offset>-<length>.html
+
+`offset` and `length` give the body inside the segment and the suffix keeps
+the page's file type. Locators are read through `compression.open_page` /
+`read_page_bytes`, which slice a cached read-only mmap of the segment, so the
+searcher reads segment pages like any other stored page. Bodies may be
+gzip/zstd-compressed individually (see compression.py).
+
+Segments are append-only: a page that is fetched again gets a new entry and
+locator, and the old bytes stay in the segment. New segments are started by
+each `SegmentStore` (after a crash, a partial entry at the end of the last
+segment is never referenced) and when one reaches `max_segment_bytes`.
+
+Third-Party Documentation:
+- mmap: https://docs.python.org/3/library/mmap.html
+
+Sample Input/Output:
+  store = SegmentStore(Path("downloads"), "job1")
+  store.append("https://docs.example.com/a", b"<html>...</html>", ".html")
+  # -> Path('downloads/segments/job1/00001.seg/40-16.html')
+  read_segment_page(Path("downloads/segments/job1/00001.seg/40-16.html"))  # -> b'<html>...</html>'
+"""
+
+import logging
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_DIR_NAME = "segments"
+SEGMENT_SUFFIX = ".seg"
+DEFAULT_SEGMENT_BYTES = 256 * 1024 * 1024
+# Segments kept mapped by read_segment_page
+MAX_OPEN_SEGMENTS = 32
+# Chunk size used by SegmentStore.append_file
+COPY_CHUNK_BYTES = 1024 * 1024
+
+_ENTRY_MAGIC = b"MCPSEG/1"
+_LOCATOR = re.compile(r"(?P<offset>\d+)-(?P<length>\d+)(?P<suffix>\.[A-Za-z0-9]{1,10})?")
+
+
+def parse_segment_locator(path: Path) -> Optional[Tuple[Path, int, int]]:
+    """Returns (segment file, offset, length) for a segment locator, else None."""
+    path = Path(path)
+    if path.parent.suffix != SEGMENT_SUFFIX:
+        return None
+    match = _LOCATOR.fullmatch(path.name)
+    if match is None:
+        return None
+    return path.parent, int(match["offset"]), int(match["length"])
+
+
+class SegmentStore:
+    """
+    Appends the pages of one download to its segment files. Thread-safe;
+    appends are serialized by a lock, so entries never interleave.
+
+    Args:
+        base_dir: Download base directory (the one holding index/ and content/).
+        download_id: Download the segments belong to.
+        max_segment_bytes: Size after which a new segment is started.
+    """
+
+    def __init__(self, base_dir: Path, download_id: str, max_segment_bytes: int = DEFAULT_SEGMENT_BYTES):
+        self.directory = Path(base_dir) / SEGMENT_DIR_NAME / download_id
+        self.max_segment_bytes = max_segment_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._path: Optional[Path] = None
+        self._size = 0
+
+    def _start_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        numbers = [
+            int(p.stem) for p in self.directory.glob(f"*{SEGMENT_SUFFIX}") if p.stem.isdigit()
+        ]
+        self._path = self.directory / f"{max(numbers, default=0) + 1:05d}{SEGMENT_SUFFIX}"
+        self._file = open(self._path, "xb")
+        self._size = 0
+        logger.debug(f"Started segment {self._path}")
+
+    def append(self, url: str, data: bytes, suffix: str = "") -> Path:
+        """
+        Appends a page body and returns its locator path.
+
+        Raises:
+            OSError: If the segment cannot be written.
+        """
+        header = b"%s %d %s\n" % (_ENTRY_MAGIC, len(data), url.replace("\n", " ").encode("utf-8"))
+        with self._lock:
+            if self._file is None or (
+                self._size and self._size + len(header) + len(data) > self.max_segment_bytes
+            ):
+                self._start_segment()
+            offset = self._size + len(header)
+            self._file.write(b"".join((header, data, b"\n")))
+            self._file.flush()  # Readers (searcher, parse pool) map the file
+            self._size = offset + len(data) + 1
+            return self._path / f"{offset}-{len(data)}{suffix.lower()}"
+
+    def append_file(self, url: str, fileobj: BinaryIO, length: int, suffix: str = "") -> Path:
+        """
+        Appends a page body of `length` bytes read from `fileobj` (from its
+        current position) and returns its locator path. The body is copied
+        in chunks, so large pages are never held in memory.
+
+        Raises:
+            OSError: If the segment cannot be written.
+            ValueError: If `fileobj` ends before `length` bytes.
+        """
+        header = b"%s %d %s\n" % (_ENTRY_MAGIC, length, url.replace("\n", " ").encode("utf-8"))
+        with self._lock:
+            if self._file is None or (
+                self._size and self._size + len(header) + length > self.max_segment_bytes
+            ):
+                self._start_segment()
+            offset = self._size + len(header)
+            self._file.write(header)
+            remaining = length
+            while remaining:
+                chunk = fileobj.read(min(COPY_CHUNK_BYTES, remaining))
+                if not chunk:
+                    # Like a crash: the partial entry ends this segment
+                    self._file.close()
+                    self._file = None
+                    raise ValueError(f"Page body for {url} ended {remaining} bytes early")
+                self._file.write(chunk)
+                remaining -= len(chunk)
+            self._file.write(b"\n")
+            self._file.flush()  # Readers (searcher, parse pool) map the file
+            self._size = offset + length + 1
+            return self._path / f"{offset}-{length}{suffix.lower()}"
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def iter_segment(segment_path: Path) -> Iterator[Tuple[str, int, int]]:
+    """
+    Yields (url, offset, length) for each complete entry of a segment, in
+    file order. A truncated last entry (interrupted write) is ignored.
+    """
+    with open(segment_path, "rb") as f:
+        position = 0
+        while True:
+            header = f.readline()
+            if not header.startswith(_ENTRY_MAGIC):
+                return
+            try:
+                _, length, url = header.rstrip(b"\n").split(b" ", 2)
+                length = int(length)
+            except ValueError:
+                return
+            offset = position + len(header)
+            f.seek(length, os.SEEK_CUR)
+            if f.read(1) != b"\n":
+                return
+            yield url.decode("utf-8", "replace"), offset, length
+            position = offset + length + 1
+
+
+_MAPS: "OrderedDict[Path, mmap.mmap]" = OrderedDict()
+_MAPS_LOCK = threading.Lock()
+
+
+def _segment_map(segment_path: Path, needed: int) -> mmap.mmap:
+    """Cached mapping of a segment covering at least `needed` bytes."""
+    with _MAPS_LOCK:
+        mapped = _MAPS.get(segment_path)
+        if mapped is not None and len(mapped) >= needed:
+            _MAPS.move_to_end(segment_path)
+            return mapped
+        with open(segment_path, "rb") as f:
+            # Remapped when the segment has grown since it was mapped
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _MAPS[segment_path] = mapped
+        _MAPS.move_to_end(segment_path)
+        while len(_MAPS) > MAX_OPEN_SEGMENTS:
+            _MAPS.popitem(last=False)  # Closed once no reader holds it
+        return mapped
+
+
+def read_segment_page(path: Path) -> bytes:
+    """
+    The stored bytes of a segment locator.
+
+    Raises:
+        FileNotFoundError: If the path is not a locator, or the entry is
+            beyond the end of its segment.
+    """
+    located = parse_segment_locator(path)
+    if located is None:
+        raise FileNotFoundError(f"Not a segment locator: {path}")
+    segment_path, offset, length = located
+    mapped = _segment_map(segment_path, offset + length)
+    if offset + length > len(mapped):
+        raise FileNotFoundError(f"{path} is beyond the end of {segment_path}")
+    return mapped[offset : offset + length]
+
+
+def segment_page_exists(path: Path) -> bool:
+    located = parse_segment_locator(path)
+    if located is None:
+        return False
+    segment_path, offset, length = located
+    try:
+        return offset + length <= segment_path.stat().st_size
+    except OSError:
+        return False
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    page = b"<html><body>" + b"<p>Some documentation text.</p>" * 60 + b"</body></html>"
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        store = SegmentStore(base, "demo", max_segment_bytes=8 * 1024 * 1024)
+        start = time.monotonic()
+        locators = [store.append(f"https://docs.example.com/p{i}", page, ".html") for i in range(20000)]
+        store.close()
+        written = time.monotonic() - start
+
+        start = time.monotonic()
+        assert all(read_segment_page(locator) == page for locator in locators)
+        read = time.monotonic() - start
+        segments = sorted(store.directory.iterdir())
+        entries = sum(1 for segment in segments for _ in iter_segment(segment))
+        assert entries == len(locators)
+        print(
+            f"{len(locators)} pages in {len(segments)} segments: "
+            f"appended in {written:.2f}s, read back in {read:.2f}s"
+        )
+        print(f"First locator: {locators[0].relative_to(base)}")
+
+    print("\n------------------------------------")
+    print("✓ Segment storage examples passed successfully.")
+    print("------------------------------------")
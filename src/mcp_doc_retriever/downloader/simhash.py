@@ -0,0 +1,237 @@
+"""
+Module: simhash.py
+
+Description:
+Near-duplicate page detection for the web crawler. Doc sites often serve
+the same page under several URLs that `canonicalize_url` cannot collapse:
+versioned paths, print views, tracking or sort parameters. This module
+finds such copies by the text of the page rather than its URL.
+
+  - `SimHasher` computes a 64-bit SimHash (Charikar) of a page's text from
+    word 3-shingles. Text is fed incrementally by the fetchers' streaming
+    HTML parser. Page chrome (nav, header, footer, aside, script, style) is
+    skipped there. A template built from plain <div>s (e.g. a Sphinx sidebar
+    TOC) is hashed with the content and can make distinct short pages look
+    alike, so the crawler only flags matches (detection is opt-in) and keeps
+    their files unless told to delete them.
+  - `NearDuplicateIndex` answers "is there a page within `max_distance`
+    bits of this SimHash?". It uses the usual band trick (Manku et al.,
+    2007): with k allowed bit differences the 64 bits are cut into k + 1
+    bands, and two near-duplicates must agree exactly on at least one band.
+    Only pages that share a band value are compared.
+
+Pages with fewer than MIN_FEATURES shingles get no SimHash and are never
+reported as duplicates (too little text to tell).
+
+Third-Party Documentation:
+- hashlib.blake2b: https://docs.python.org/3/library/hashlib.html#blake2
+- Detecting near-duplicates for web crawling (Manku, Jain, Das Sarma, 2007):
+  https://research.google/pubs/detecting-near-duplicates-for-web-crawling/
+
+Sample Input/Output:
+  hasher = SimHasher()
+  hasher.update("Install the package with pip and import the client ...")
+  index = NearDuplicateIndex()
+  index.check(hasher.digest(), "https://docs.example.com/v2/install")        # -> None (first copy)
+  index.check(other_digest, "https://docs.example.com/v2/install?print=1")  # -> 'https://docs.example.com/v2/install'
+"""
+
+import hashlib
+import re
+import sys
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+SIMHASH_BITS = 64
+# Bits two pages may differ in and still count as duplicates
+DEFAULT_MAX_DISTANCE = 3
+# Shingles a page needs before it gets a SimHash
+MIN_FEATURES = 24
+SHINGLE_SIZE = 3
+
+_WORD = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+# Per-process cache of word hashes (cleared when full)
+_WORD_HASHES: Dict[str, int] = {}
+_WORD_HASH_CACHE_SIZE = 1 << 18
+
+
+def _word_hash(word: str) -> int:
+    value = _WORD_HASHES.get(word)
+    if value is None:
+        if len(_WORD_HASHES) >= _WORD_HASH_CACHE_SIZE:
+            _WORD_HASHES.clear()
+        value = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+        _WORD_HASHES[word] = value
+    return value
+
+
+def _repeat_unit(count: int) -> int:
+    """1 + 2**64 + 2**128 + ...: `count` 64-bit words each holding 1."""
+    return int.from_bytes((b"\x01" + bytes(7)) * count, "little")
+
+
+def _rotl(value: int, bits: int) -> int:
+    return ((value << bits) | (value >> (64 - bits))) & _MASK64
+
+
+class SimHasher:
+    """
+    Incremental 64-bit SimHash over word shingles of the text fed to `update`.
+
+    A shingle's feature hash is a rolling cyclic polynomial hash (buzhash)
+    of the cached hashes of its words, so each word costs one dictionary
+    lookup and a few integer operations.
+    """
+
+    def __init__(self, shingle_size: int = SHINGLE_SIZE):
+        self._window: deque = deque(maxlen=max(1, shingle_size))
+        self._rolling = 0
+        # All feature hashes; their bits are counted once, in digest()
+        self._features = array("Q")
+
+    @property
+    def features(self) -> int:
+        return len(self._features)
+
+    def update(self, text: str) -> None:
+        window = self._window
+        size = window.maxlen
+        append = self._features.append
+        rolling = self._rolling
+        for word in _WORD.findall(text.lower()):
+            word_hash = _WORD_HASHES.get(word)
+            if word_hash is None:
+                word_hash = _word_hash(word)
+            # hash(w1..wn) = rotl(h1, n-1) ^ ... ^ rotl(h(n-1), 1) ^ hn
+            rolling = (((rolling << 1) | (rolling >> 63)) & _MASK64) ^ word_hash
+            if len(window) == size:
+                rolling ^= _rotl(window[0], size % 64)
+            window.append(word_hash)
+            if len(window) == size:
+                append(rolling)
+        self._rolling = rolling
+
+    def digest(self) -> Optional[int]:
+        """The SimHash, or None if the text was too short to fingerprint."""
+        if self.features < MIN_FEATURES:
+            return None
+        count = self.features
+        # Bit-sliced counting: all features as one big integer, and per bit
+        # position a mask with that bit of every 64-bit word set, so each
+        # count is one shift, one AND and one popcount over the whole page
+        packed = int.from_bytes(self._features.tobytes(), sys.byteorder)
+        lowest_bits = _repeat_unit(count)
+        value = 0
+        for bit in range(SIMHASH_BITS):
+            if ((packed >> bit) & lowest_bits).bit_count() * 2 > count:
+                value |= 1 << bit
+        return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def format_simhash(value: Optional[int]) -> Optional[str]:
+    """Fixed-width hex form stored in index records."""
+    return None if value is None else f"{value:016x}"
+
+
+def parse_simhash(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value, 16) if value else None
+    except ValueError:
+        return None
+
+
+class NearDuplicateIndex:
+    """
+    SimHashes of the pages kept so far, searchable by Hamming distance.
+
+    Args:
+        max_distance: Largest number of differing bits for a duplicate.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.max_distance = max(0, min(max_distance, SIMHASH_BITS // 2 - 1))
+        bands = self.max_distance + 1
+        width = SIMHASH_BITS // bands
+        self._bands: List[Tuple[int, int]] = [
+            (i * width, (1 << (width if i < bands - 1 else SIMHASH_BITS - i * width)) - 1)
+            for i in range(bands)
+        ]
+        self._tables: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in self._bands]
+        self._by_url: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_url)
+
+    def find(self, simhash: int, exclude_url: Optional[str] = None) -> Optional[str]:
+        """URL of a stored page within max_distance of `simhash`, if any."""
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for other, url in table.get(simhash >> shift & mask, ()):
+                if url != exclude_url and hamming_distance(simhash, other) <= self.max_distance:
+                    return url
+        return None
+
+    def add(self, simhash: int, url: str) -> None:
+        self.remove(url)
+        self._by_url[url] = simhash
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault(simhash >> shift & mask, []).append((simhash, url))
+
+    def remove(self, url: str) -> None:
+        simhash = self._by_url.pop(url, None)
+        if simhash is None:
+            return
+        for (shift, mask), table in zip(self._bands, self._tables):
+            key = simhash >> shift & mask
+            bucket = [entry for entry in table.get(key, ()) if entry[1] != url]
+            if bucket:
+                table[key] = bucket
+            else:
+                table.pop(key, None)
+
+    def check(self, simhash: int, url: str) -> Optional[str]:
+        """
+        Returns the URL `url` duplicates, or None after recording it as an
+        original. A page is never reported as a duplicate of itself (e.g. its
+        copy from an earlier crawl); its stored SimHash is replaced instead.
+        """
+        original = self.find(simhash, exclude_url=url)
+        if original is None:
+            self.add(simhash, url)
+        return original
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import random
+    import time
+
+    random.seed(7)
+    vocabulary = [f"word{i}" for i in range(3000)]
+    pages = [" ".join(random.choices(vocabulary, k=800)) for _ in range(2000)]
+
+    def simhash_of(text: str) -> int:
+        hasher = SimHasher()
+        hasher.update(text)
+        return hasher.digest()
+
+    start = time.monotonic()
+    index = NearDuplicateIndex()
+    for i, text in enumerate(pages):
+        assert index.check(simhash_of(text), f"https://docs.example.com/p{i}") is None
+    elapsed = time.monotonic() - start
+
+    # The same page with a banner and one changed sentence
+    variant = "Version 2.1 of this page. " + pages[42].replace("word1 ", "word2 ", 3)
+    distance = hamming_distance(simhash_of(variant), simhash_of(pages[42]))
+    assert index.check(simhash_of(variant), "https://docs.example.com/v2.1/p42") == "https://docs.example.com/p42"
+    print(f"{len(pages)} pages hashed and indexed in {elapsed:.2f}s; variant differs by {distance} bits")
+
+    print("\n------------------------------------")
+    print("✓ SimHash examples passed successfully.")
+    print("------------------------------------")
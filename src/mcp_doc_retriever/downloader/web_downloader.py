@@ -19,7 +19,9 @@ Internal Module Dependencies:
   - .helpers (url_to_local_path)
   - .fetchers (fetch_single_url_requests, fetch_single_url_playwright)
   - .robots (_is_allowed_by_robots)
-  - mcp_doc_retriever.utils (canonicalize_url, is_url_private_or_internal, timeouts)
+  - .sitemaps (discover_sitemap_entries)
+  - .blob_store / .compression / .segments (optional page storage layouts)
+  - mcp_doc_retriever.utils (canonicalize_url, is_url_private_or_internal_async, DNSCache, timeouts)
   - mcp_doc_retriever.models (IndexRecord)
 
 Sample Input (Conceptual - assumes setup within a running asyncio loop):
@@ -57,7 +59,7 @@ import logging
 import json
 import traceback
 import shutil
-from typing import Optional, Set, Dict, Any, List
+from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse, urljoin
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
@@ -75,7 +77,8 @@ from mcp_doc_retriever.utils import (
     TIMEOUT_REQUESTS,
     TIMEOUT_PLAYWRIGHT,
     canonicalize_url,
-    is_url_private_or_internal,
+    DNSCache,
+    is_url_private_or_internal_async,
 )
 from mcp_doc_retriever.downloader.helpers import url_to_local_path
 from pydantic import BaseModel, Field
@@ -86,17 +89,82 @@ from mcp_doc_retriever.searcher.helpers import ContentBlock # Import from new lo
 try:
     # Assume robots.py and fetchers.py are in the same directory
     from .robots import _is_allowed_by_robots
-    from .fetchers import fetch_single_url_requests, fetch_single_url_playwright
+    from .fetchers import (
+        fetch_single_url_requests,
+        fetch_single_url_playwright,
+        scan_local_copy,
+    )
+    from .scheduler import HostScheduler, THROTTLE_STATUS_CODES
+    from .browser_pool import BrowserPool, DEFAULT_MAX_PAGES, RenderProfile
+    from .index_writer import IndexWriter
+    from .crawl_state import CrawlState, crawl_state_path, DEFAULT_CHECKPOINT_INTERVAL
+    from .visited import DEFAULT_VISITED_BACKEND, VisitedSet, make_visited_set
+    from .parse_pool import ParsePool
+    from .sitemaps import discover_sitemap_entries, recrawl_rank
+    from .frontier import Scorer, make_frontier
+    from .simhash import NearDuplicateIndex, format_simhash, parse_simhash
+    from .blob_store import BlobStore
+    from .compression import page_exists, resolve_compression
+    from .segments import SegmentStore, parse_segment_locator
+    from .http_client import ConnectionStats, make_crawl_client
 except ImportError:
     # Fallback for potential direct execution or different structure
     from mcp_doc_retriever.downloader.robots import _is_allowed_by_robots
     from mcp_doc_retriever.downloader.fetchers import (
         fetch_single_url_requests,
         fetch_single_url_playwright,
+        scan_local_copy,
+    )
+    from mcp_doc_retriever.downloader.scheduler import (
+        HostScheduler,
+        THROTTLE_STATUS_CODES,
+    )
+    from mcp_doc_retriever.downloader.browser_pool import (
+        BrowserPool,
+        DEFAULT_MAX_PAGES,
+        RenderProfile,
+    )
+    from mcp_doc_retriever.downloader.index_writer import IndexWriter
+    from mcp_doc_retriever.downloader.crawl_state import (
+        CrawlState,
+        crawl_state_path,
+        DEFAULT_CHECKPOINT_INTERVAL,
+    )
+    from mcp_doc_retriever.downloader.visited import (
+        DEFAULT_VISITED_BACKEND,
+        VisitedSet,
+        make_visited_set,
+    )
+    from mcp_doc_retriever.downloader.parse_pool import ParsePool
+    from mcp_doc_retriever.downloader.sitemaps import (
+        discover_sitemap_entries,
+        recrawl_rank,
+    )
+    from mcp_doc_retriever.downloader.frontier import Scorer, make_frontier
+    from mcp_doc_retriever.downloader.simhash import (
+        NearDuplicateIndex,
+        format_simhash,
+        parse_simhash,
+    )
+    from mcp_doc_retriever.downloader.blob_store import BlobStore
+    from mcp_doc_retriever.downloader.compression import (
+        page_exists,
+        resolve_compression,
+    )
+    from mcp_doc_retriever.downloader.segments import (
+        SegmentStore,
+        parse_segment_locator,
+    )
+    from mcp_doc_retriever.downloader.http_client import (
+        ConnectionStats,
+        make_crawl_client,
     )
 
 logger = logging.getLogger(__name__)
 
+# How often a URL answered with 429/503 is retried after the host backoff
+MAX_THROTTLE_RETRIES = 3
+
 
 from .models import IndexRecord # Import from new downloader models file
 
@@ -131,6 +199,147 @@ async def _write_index_record(index_path: Path, record: IndexRecord) -> None:
         )
 
 
+def _load_previous_validators(index_path: Path) -> Dict[str, Dict[str, str]]:
+    """
+    Reads HTTP cache validators (ETag / Last-Modified) recorded by earlier
+    crawls of this download, keyed by canonical URL. Later records win.
+
+    Args:
+        index_path: The JSONL index file of the download.
+
+    Returns:
+        Mapping of canonical_url -> {'etag': ..., 'last_modified': ...}.
+    """
+    validators: Dict[str, Dict[str, str]] = {}
+    if not index_path.is_file():
+        return validators
+    try:
+        with index_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if data.get("fetch_status") not in ("success", "not_modified"):
+                    continue
+                entry = {
+                    key: data[key]
+                    for key in ("etag", "last_modified")
+                    if data.get(key)
+                }
+                if entry and data.get("canonical_url"):
+                    validators[data["canonical_url"]] = entry
+    except OSError as e:
+        logger.warning(f"Could not read previous index {index_path} for revalidation: {e}")
+    logger.info(f"Loaded cache validators for {len(validators)} URLs from {index_path}")
+    return validators
+
+
+def _load_reusable_records(index_path: Path, base_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Reads the successful records of an interrupted crawl whose files are
+    still on disk, keyed by canonical URL, so a resumed crawl can skip them.
+    Pages recorded as near-duplicates are reused too (their file, if kept,
+    must still be on disk).
+
+    Args:
+        index_path: The JSONL index file of the download.
+        base_dir: Base directory that record local paths are relative to.
+
+    Returns:
+        Mapping of canonical_url -> raw index record.
+    """
+    records: Dict[str, Dict[str, Any]] = {}
+    if not index_path.is_file():
+        return records
+    try:
+        with index_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                url = data.get("canonical_url")
+                if not url:
+                    continue
+                if data.get("fetch_status") == "duplicate" or (
+                    data.get("fetch_status") in ("success", "not_modified") and data.get("local_path")
+                ):
+                    records[url] = data
+                else:
+                    records.pop(url, None)  # A later failure supersedes the earlier record
+    except OSError as e:
+        logger.warning(f"Could not read index {index_path} to resume the crawl: {e}")
+        return {}
+    return {
+        url: data
+        for url, data in records.items()
+        if not data.get("local_path") or page_exists(base_dir / data["local_path"])
+    }
+
+
+def _load_segment_copies(index_path: Path, base_dir: Path) -> Dict[str, str]:
+    """
+    Reads where earlier crawls of this download stored pages in segments,
+    keyed by canonical URL (later records win), so that with segment storage
+    they are skipped or revalidated like existing files.
+    """
+    copies: Dict[str, str] = {}
+    if not index_path.is_file():
+        return copies
+    try:
+        with index_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                url = data.get("canonical_url")
+                local_path = data.get("local_path")
+                if not url:
+                    continue
+                if data.get("fetch_status") == "duplicate" and not local_path:
+                    copies.pop(url, None)  # Deleted near-duplicate
+                elif (
+                    data.get("fetch_status") in ("success", "not_modified", "duplicate")
+                    and local_path
+                    and parse_segment_locator(Path(local_path)) is not None
+                ):
+                    copies[url] = str(base_dir / local_path)
+    except OSError as e:
+        logger.warning(f"Could not read previous index {index_path} for segment pages: {e}")
+    return copies
+
+
+def _load_previous_simhashes(index_path: Path) -> Dict[str, int]:
+    """
+    Reads the text SimHashes of pages kept by earlier crawls of this
+    download, keyed by canonical URL (later records win), so copies of them
+    found by this crawl are recognised as near-duplicates.
+    """
+    simhashes: Dict[str, int] = {}
+    if not index_path.is_file():
+        return simhashes
+    try:
+        with index_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                url = data.get("canonical_url")
+                simhash = parse_simhash(data.get("simhash"))
+                if not url:
+                    continue
+                if data.get("fetch_status") in ("success", "not_modified") and simhash is not None:
+                    simhashes[url] = simhash
+                else:
+                    simhashes.pop(url, None)
+    except OSError as e:
+        logger.warning(f"Could not read previous index {index_path} for near-duplicates: {e}")
+    return simhashes
+
+
 # --- Main Recursive Download Function ---
 
 
@@ -149,11 +358,109 @@ async def start_recursive_download(
     executor: Optional[
         ThreadPoolExecutor
     ] = None,  # Accept executor for potential sync tasks
+    revalidate: bool = False,
+    render_profile: Optional[RenderProfile] = None,
+    resume: bool = True,
+    visited_backend: str = DEFAULT_VISITED_BACKEND,
+    parse_processes: int = 0,
+    use_sitemaps: bool = False,
+    frontier_order: str = "priority",
+    frontier_scorer: Optional[Scorer] = None,
+    max_pages: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    detect_duplicates: bool = False,
+    delete_duplicates: bool = False,
+    content_addressed: bool = False,
+    storage_compression: str = "none",
+    segment_storage: bool = False,
+    http2: bool = True,
+    connection_stats: Optional[ConnectionStats] = None,
 ) -> None:
     """
     Starts the asynchronous recursive download process with concurrency limiting
     and progress bar updates. Uses Path objects internally where appropriate.
+
+    `max_concurrent_requests` caps the total number of in-flight fetches. Each
+    host is additionally paced by a `HostScheduler` (robots.txt Crawl-delay,
+    adaptive concurrency and backoff on 429/5xx); throttled URLs are retried
+    up to MAX_THROTTLE_RETRIES times.
+
+    `render_profile` configures Playwright crawls (wait condition, blocked
+    resource types / third-party requests); defaults to RenderProfile().
+
+    With `revalidate=True`, pages already downloaded by a previous crawl are
+    revalidated with conditional requests using their stored ETag/Last-Modified
+    (httpx fetcher only); unchanged pages are recorded as 'not_modified'.
+
+    The visited set and frontier are checkpointed to
+    `index/<download_id>.crawl.sqlite`. If a crawl with the same download ID,
+    start URL and depth was interrupted, it is resumed from there (unless
+    `resume=False`), and pages it already saved are reused instead of
+    refetched (unless `force=True`).
+
+    `visited_backend` selects how seen URLs are remembered: "fingerprint"
+    (64-bit hashes, ~10-20 bytes/URL), "bloom" (Bloom filter with an exact
+    on-disk fallback) or "exact" (plain set of URL strings).
+
+    With `parse_processes > 0` (httpx fetcher only), hashing and link
+    extraction of downloaded pages run in a pool of that many processes
+    instead of the event loop; workers wait for a free parse slot before
+    taking the next URL.
+
+    With `use_sitemaps=True`, the pages listed by the site's sitemaps
+    (robots.txt `Sitemap:` entries and /sitemap.xml, including sitemap
+    indexes) are queued as additional depth-0 start URLs, most recently
+    modified first. When revalidating, pages whose sitemap `lastmod` is newer
+    than the stored Last-Modified are queued ahead of the rest. Resumed crawls
+    are not re-seeded (their frontier already holds the seeds).
+
+    URLs are taken from a priority frontier: `frontier_order="priority"`
+    scores them with `frontier.DefaultScorer` (depth, /docs/ and /api/
+    sooner, tag/search pages, other versions and likely duplicates later,
+    recent sitemap lastmod sooner); "fifo" keeps discovery order, and
+    `frontier_scorer` plugs in any other scoring. With `max_pages` (pages
+    fetched) or `time_budget` (seconds) set, the crawl stops fetching once
+    the budget is spent, so the best-scored pages are the ones downloaded;
+    the rest of the frontier stays checkpointed for the next run.
+
+    With `detect_duplicates=True`, the text of every HTML page is SimHashed
+    while it is parsed. A page within a few bits of one already kept (in
+    this crawl or an earlier one of the same download) is recorded as
+    'duplicate' with `duplicate_of` set. The searcher skips it, but its file
+    is kept and its links are followed: pages that share a large template
+    not marked as nav/header/footer/aside can be flagged wrongly, so this is
+    off by default. Only with `delete_duplicates=True` is the file deleted
+    and are its links not followed.
+
+    With `content_addressed=True`, saved pages are moved into the shared
+    `blob_store.BlobStore` under `<base_dir>/blobs` and their index records
+    point at the blob, so byte-identical pages (across URLs and download IDs)
+    are stored and searched once. The per-URL path stays as a hard link.
+
+    `storage_compression` ("none", "gzip" or "zstd") compresses saved pages
+    on disk under their usual names; the searcher and all re-reads of saved
+    pages decompress them transparently (see compression.py).
+
+    With `segment_storage=True` (httpx fetcher only), pages are appended to
+    a few large files under `<base_dir>/segments/<download_id>/` instead of
+    one file per URL, and index records hold segment locators (see
+    segments.py). Bodies are spooled to a temporary file, kept in memory up
+    to fetchers.SEGMENT_SPOOL_BYTES and rolled over to disk beyond that, then
+    copied into the segment in chunks. This takes precedence over
+    `content_addressed`.
+
+    All requests share one httpx client whose pool allows one connection per
+    in-flight request and keeps idle connections alive for reuse (see
+    http_client.py). With `http2=True` and the `h2` package installed,
+    requests to HTTP/2 hosts are multiplexed over a few connections. Connection
+    reuse is counted per host in `connection_stats` (a fresh `ConnectionStats`
+    unless one is passed) and summarised in the log when the crawl ends.
     """
+    try:
+        storage_compression = resolve_compression(storage_compression)
+    except ValueError as e:
+        logger.warning(f"{e}; storing pages uncompressed.")
+        storage_compression = "none"
     logger.info(
         f"Starting recursive download for ID: {download_id}, URL: {start_url}, Depth: {depth}"
     )
@@ -198,19 +505,49 @@ async def start_recursive_download(
         return
 
     # Initialize queue, visited set, and semaphore
-    queue: asyncio.Queue = asyncio.Queue()
-    visited: Set[str] = set()
+    queue: asyncio.Queue = make_frontier(frontier_order, start_url, frontier_scorer)
+    visited: VisitedSet = make_visited_set(visited_backend, spill_dir=index_dir)
     # Use calculated effective_concurrency here
     effective_concurrency = max(1, max_concurrent_requests)
     semaphore = asyncio.Semaphore(effective_concurrency)
+    host_scheduler = HostScheduler(max_concurrency=effective_concurrency)
+    # One resolution per host for the whole crawl (SSRF checks run per URL)
+    dns_cache = DNSCache(timeout=TIMEOUT_REQUESTS)
     logger.info(f"Web download concurrency limit set to {effective_concurrency}")
 
+    # Checkpointed frontier/visited set, so an interrupted crawl can resume
+    crawl_state: Optional[CrawlState] = CrawlState(crawl_state_path(base_dir, download_id))
+    resumed = False
+    try:
+        resumed = crawl_state.open(start_canonical_url, depth, resume=resume)
+    except Exception as state_e:
+        logger.warning(f"Crawl state unavailable, crawl will not be resumable: {state_e}")
+        crawl_state.close()
+        crawl_state = None
+    # Successful records of the interrupted crawl, reused instead of refetched
+    reusable_records: Dict[str, Dict[str, Any]] = {}
+
     # Initialize starting state (use already calculated canonical URL and domain)
     try:
         # start_canonical already calculated above
         # start_domain already calculated above
-        await queue.put((start_canonical_url, 0))
-        visited.add(start_canonical_url)
+        if resumed:
+            frontier = crawl_state.load_frontier()
+            for url in crawl_state.iter_visited():
+                visited.add(url)
+            for item in frontier:
+                queue.put_nowait(item)
+            if not force:
+                reusable_records = _load_reusable_records(index_path, base_dir)
+            logger.info(
+                f"Resuming interrupted crawl: {len(frontier)} pending URLs, "
+                f"{len(visited)} visited, {len(reusable_records)} reusable pages"
+            )
+        else:
+            await queue.put((start_canonical_url, 0))
+            visited.add(start_canonical_url)
+            if crawl_state is not None:
+                crawl_state.discovered(start_canonical_url, 0)
         logger.info(
             f"Start URL canonicalized: {start_canonical_url}, Domain: {start_domain}"
         )
@@ -227,8 +564,38 @@ async def start_recursive_download(
             local_path="",
         )
         await _write_index_record(index_path, fail_record)
+        if crawl_state is not None:
+            crawl_state.close()
+        visited.close()
         return
 
+    # Validators from previous crawls, used for conditional requests
+    previous_validators: Dict[str, Dict[str, str]] = {}
+    if revalidate and not use_playwright:
+        previous_validators = _load_previous_validators(index_path)
+
+    # Text SimHashes of the pages kept so far, to spot near-duplicate copies
+    near_duplicates: Optional[NearDuplicateIndex] = None
+    if detect_duplicates:
+        near_duplicates = NearDuplicateIndex()
+        for url, simhash in _load_previous_simhashes(index_path).items():
+            near_duplicates.add(simhash, url)
+
+    # Pages packed into segment files instead of one file per URL
+    segment_store: Optional[SegmentStore] = None
+    segment_copies: Dict[str, str] = {}
+    if segment_storage and use_playwright:
+        logger.info("Segment storage applies to the httpx fetcher; Playwright pages are saved as files.")
+    elif segment_storage:
+        segment_store = SegmentStore(base_dir, download_id)
+        segment_copies = _load_segment_copies(index_path, base_dir)
+        if content_addressed:
+            logger.warning("Segment storage is enabled; ignoring content_addressed.")
+            content_addressed = False
+
+    # Shared store for byte-identical page bodies
+    blob_store: Optional[BlobStore] = BlobStore(base_dir) if content_addressed else None
+
     # Cache for robots.txt results (using RobotFileParser objects or None)
     robots_cache: Dict[str, Optional[RobotFileParser]] = {}
 
@@ -239,16 +606,31 @@ async def start_recursive_download(
     )
     headers = {"User-Agent": user_agent_string}
 
+    # Page/time budget: once spent, queued URLs are left for the next run
+    pages_fetched = 0
+    budget_hit = False
+    deadline = (
+        asyncio.get_running_loop().time() + time_budget if time_budget else None
+    )
+
+    def _budget_exhausted() -> bool:
+        if max_pages is not None and pages_fetched >= max_pages:
+            return True
+        return deadline is not None and asyncio.get_running_loop().time() >= deadline
+
     # --- Worker Task Definition ---
     async def worker(worker_id: int, shared_client: httpx.AsyncClient):
         """Processes URLs from the queue using the shared httpx client."""
+        nonlocal pages_fetched, budget_hit
         logger.debug(f"Web worker {worker_id} started.")
         while True:
             queue_item = None
             record_to_write: Optional[IndexRecord] = None
+            reused_record: Optional[Dict[str, Any]] = None
             links_to_add_later: List[str] = []
             final_fetch_status_for_recursion = "failed_generic"
             current_canonical_url = "N/A"  # For logging
+            page_reserved = False
 
             try:
                 queue_item = await queue.get()
@@ -264,6 +646,23 @@ async def start_recursive_download(
                     queue.task_done()  # Must call task_done even for invalid items
                     continue
 
+                if _budget_exhausted():
+                    if not budget_hit:
+                        budget_hit = True
+                        logger.info(
+                            f"Crawl budget spent after {pages_fetched} pages; "
+                            f"leaving the remaining frontier for the next run"
+                        )
+                    # crawl_state.done() is never called for it, so the URL
+                    # stays in the checkpoint (task_done() still runs below)
+                    continue
+
+                # Reserve this page of the budget before fetching, so workers
+                # running concurrently cannot overshoot max_pages. Released
+                # below if the URL ends up skipped or reused, not fetched.
+                pages_fetched += 1
+                page_reserved = True
+
                 logger.debug(
                     f"Worker {worker_id}: Processing {current_canonical_url} at depth {current_depth}"
                 )
@@ -287,7 +686,9 @@ async def start_recursive_download(
                             raise ValueError("URL has no network location (domain).")
 
                         # Check 1: Private/Internal Network
-                        if is_url_private_or_internal(current_canonical_url):
+                        if await is_url_private_or_internal_async(
+                            current_canonical_url, dns_cache
+                        ):
                             should_skip, skip_reason, skip_status = (
                                 True,
                                 "Blocked by SSRF protection (private/internal URL)",
@@ -314,6 +715,15 @@ async def start_recursive_download(
                             )
                         # Check 4: Path Generation (only if not skipping)
                         else:
+                            if not host_scheduler.is_configured(current_netloc):
+                                # robots.txt is cached by the check above
+                                host_scheduler.configure_host(
+                                    current_netloc,
+                                    robots_cache.get(
+                                        f"{current_parsed_url.scheme}://{current_netloc.lower()}"
+                                    ),
+                                    user_agent_string,
+                                )
                             try:
                                 local_path_obj = url_to_local_path(
                                     content_base_dir, current_canonical_url
@@ -404,8 +814,33 @@ async def start_recursive_download(
                             )
                         final_fetch_status_for_recursion = "failed_internal"
 
+                    # --- Reuse a page the interrupted crawl already saved ---
+                    elif current_canonical_url in reusable_records:
+                        reused_record = reusable_records.pop(current_canonical_url)
+                        final_fetch_status_for_recursion = reused_record["fetch_status"]
+                        logger.info(
+                            f"Worker {worker_id}: Reusing record of interrupted crawl for {current_canonical_url}"
+                        )
+                        try:
+                            reused_path = base_dir / reused_record["local_path"]
+                            if not reused_record.get("local_path"):
+                                pass  # Deleted near-duplicate: its links are not followed
+                            elif parse_pool is not None:
+                                _, links_to_add_later, _ = await parse_pool.scan(
+                                    current_canonical_url, reused_path
+                                )
+                            else:
+                                _, links_to_add_later, _ = await asyncio.to_thread(
+                                    scan_local_copy, current_canonical_url, reused_path
+                                )
+                        except OSError as reuse_e:
+                            logger.warning(
+                                f"Worker {worker_id}: Could not re-read {reused_record['local_path']} for links: {reuse_e}"
+                            )
+
                     # --- Perform Download (Only if not skipped and path is valid) ---
                     else:  # not should_skip and local_path_obj is not None
+                        page_reserved = False  # Spent on this fetch
                         result: Optional[Dict[str, Any]] = None
                         fetch_status = (
                             "failed_request"  # Default status for fetch block
@@ -413,6 +848,10 @@ async def start_recursive_download(
                         error_message = "Download did not complete successfully."
                         content_md5 = None
                         http_status = None
+                        etag = None
+                        last_modified = None
+                        simhash = None
+                        duplicate_of = None
                         detected_links = []
                         # Assume final path is the calculated one unless fetcher indicates failure/skip
                         final_local_path_str = local_path_str
@@ -420,7 +859,8 @@ async def start_recursive_download(
                         try:
                             # Ensure target directory exists just before fetch
                             try:
-                                local_path_obj.parent.mkdir(parents=True, exist_ok=True)
+                                if segment_store is None:
+                                    local_path_obj.parent.mkdir(parents=True, exist_ok=True)
                                 logger.debug(
                                     f"Target directory ensured ready: {local_path_obj.parent}"
                                 )
@@ -442,21 +882,60 @@ async def start_recursive_download(
                                 "allowed_base_dir": str(
                                     content_base_dir
                                 ),  # Pass string path
+                                "compression": storage_compression,
                             }
 
-                            if use_playwright:
-                                result = await fetch_single_url_playwright(
-                                    **fetcher_kwargs, timeout=timeout_playwright
-                                )
-                            else:
-                                logger.debug(
-                                    f"Calling fetcher with kwargs: {fetcher_kwargs}"
-                                )
-                                result = await fetch_single_url_requests(
-                                    **fetcher_kwargs,
-                                    timeout=timeout_requests,
-                                    client=shared_client,
-                                    max_size=max_file_size,
+                            url_validators = previous_validators.get(
+                                current_canonical_url
+                            )
+                            # Existing files are skipped by the fetchers without a
+                            # request, so they need no host slot
+                            stored_copy = segment_copies.get(current_canonical_url)
+                            needs_request = (
+                                force
+                                or not (local_path_obj.exists() or stored_copy)
+                                or (url_validators is not None and not use_playwright)
+                            )
+
+                            for attempt in range(MAX_THROTTLE_RETRIES + 1):
+                                if use_playwright:
+                                    fetch_coro = fetch_single_url_playwright(
+                                        **fetcher_kwargs,
+                                        timeout=timeout_playwright,
+                                        browser_pool=browser_pool,
+                                    )
+                                else:
+                                    logger.debug(
+                                        f"Calling fetcher with kwargs: {fetcher_kwargs}"
+                                    )
+                                    fetch_coro = fetch_single_url_requests(
+                                        **fetcher_kwargs,
+                                        timeout=timeout_requests,
+                                        client=shared_client,
+                                        max_size=max_file_size,
+                                        validators=url_validators,
+                                        parse_pool=parse_pool,
+                                        segment_store=segment_store,
+                                        stored_copy=stored_copy,
+                                    )
+                                if not needs_request:
+                                    result = await fetch_coro
+                                    break
+                                async with host_scheduler.slot(current_netloc) as host_slot:
+                                    result = await fetch_coro
+                                    host_slot.record(
+                                        (result or {}).get("http_status"),
+                                        (result or {}).get("retry_after"),
+                                    )
+                                if (
+                                    not result
+                                    or result.get("http_status") not in THROTTLE_STATUS_CODES
+                                    or attempt == MAX_THROTTLE_RETRIES
+                                ):
+                                    break
+                                logger.info(
+                                    f"Worker {worker_id}: {current_canonical_url} throttled "
+                                    f"(HTTP {result.get('http_status')}), retry {attempt + 1}/{MAX_THROTTLE_RETRIES}"
                                 )
 
                             logger.info(
@@ -483,6 +962,9 @@ async def start_recursive_download(
                                 content_md5 = result.get("content_md5")
                                 http_status = result.get("http_status")
                                 detected_links = result.get("detected_links", [])
+                                etag = result.get("etag")
+                                last_modified = result.get("last_modified")
+                                simhash = result.get("simhash")
                                 target_path_from_result = result.get(
                                     "target_path"
                                 )  # String path expected
@@ -495,7 +977,11 @@ async def start_recursive_download(
                                         and target_path_from_result
                                         != final_local_path_str
                                     ):
-                                        logger.warning(
+                                        # Expected with segment storage (locator)
+                                        log_path_change = (
+                                            logger.debug if segment_store is not None else logger.warning
+                                        )
+                                        log_path_change(
                                             f"Fetcher returned path '{target_path_from_result}' different from calculated '{final_local_path_str}'. Using fetcher's."
                                         )
                                         final_local_path_str = target_path_from_result
@@ -518,6 +1004,14 @@ async def start_recursive_download(
                                         error_message = None
                                         links_to_add_later = detected_links
 
+                                elif status_from_result == "not_modified":
+                                    # 304: local copy is current, keep crawling its links
+                                    fetch_status = "not_modified"
+                                    error_message = None
+                                    links_to_add_later = detected_links
+                                    if target_path_from_result:
+                                        final_local_path_str = target_path_from_result
+
                                 elif status_from_result == "skipped":
                                     fetch_status = "skipped"
                                     error_message = (
@@ -562,6 +1056,53 @@ async def start_recursive_download(
                                 if error_message:
                                     error_message = str(error_message)[:2000]
 
+                                # --- Near-duplicate check (pages kept so far) ---
+                                if (
+                                    near_duplicates is not None
+                                    and simhash is not None
+                                    and fetch_status in ("success", "not_modified")
+                                ):
+                                    duplicate_of = near_duplicates.check(
+                                        simhash, current_canonical_url
+                                    )
+                                if duplicate_of is not None:
+                                    fetch_status = "duplicate"  # Skipped by the searcher
+                                    if not delete_duplicates:
+                                        logger.info(
+                                            f"Worker {worker_id}: {current_canonical_url} is a near-duplicate of {duplicate_of}; kept, not searched"
+                                        )
+                                    else:
+                                        logger.info(
+                                            f"Worker {worker_id}: {current_canonical_url} is a near-duplicate of {duplicate_of}; deleting it"
+                                        )
+                                        links_to_add_later = []
+                                        try:
+                                            # Segment entries stay (segments are append-only)
+                                            if parse_segment_locator(Path(final_local_path_str)) is None:
+                                                Path(final_local_path_str).unlink(missing_ok=True)
+                                        except OSError as unlink_e:
+                                            logger.warning(
+                                                f"Could not remove duplicate file {final_local_path_str}: {unlink_e}"
+                                            )
+                                        final_local_path_str = ""  # No file recorded
+
+                                # --- Content-addressed storage (identical bodies stored once) ---
+                                if (
+                                    blob_store is not None
+                                    and content_md5
+                                    and final_local_path_str
+                                    and fetch_status in ("success", "not_modified")
+                                ):
+                                    try:
+                                        blob_path, _ = await asyncio.to_thread(
+                                            blob_store.adopt, Path(final_local_path_str), content_md5
+                                        )
+                                        final_local_path_str = str(blob_path)
+                                    except OSError as blob_e:
+                                        logger.warning(
+                                            f"Could not move {final_local_path_str} into the blob store: {blob_e}"
+                                        )
+
                         except Exception as fetch_exception:
                             # Catch exceptions during the fetch call itself or directory creation right before it
                             tb = traceback.format_exc()
@@ -607,9 +1148,13 @@ async def start_recursive_download(
                                 canonical_url=current_canonical_url,
                                 local_path=relative_path_str,  # STORE RELATIVE PATH
                                 content_md5=content_md5,
+                                etag=etag,
+                                last_modified=last_modified,
                                 fetch_status=fetch_status,
                                 http_status=http_status,
                                 error_message=error_message,
+                                simhash=format_simhash(simhash),
+                                duplicate_of=duplicate_of,
                             )
                         except Exception as e:
                             logger.error(
@@ -634,11 +1179,13 @@ async def start_recursive_download(
                         logger.info(
                             f"WORKER {worker_id}: PRE-WRITE Check for {record_to_write.canonical_url} - Status: {record_to_write.fetch_status}"
                         )
-                        await _write_index_record(index_path, record_to_write)
-                        # _write_index_record handles its own errors now
+                        await index_writer.write(record_to_write)
+                        # Only queues the record; the writer task does the file I/O
                         logger.info(
                             f"WORKER {worker_id}: POST-WRITE Check for {record_to_write.canonical_url}"
                         )
+                    elif reused_record is not None:
+                        pass  # Already in the index from the interrupted crawl
                     else:
                         # This should only happen if pre-checks failed AND creating the skip/fail record also failed
                         logger.error(
@@ -653,7 +1200,7 @@ async def start_recursive_download(
                         f"WORKER {worker_id}: Checking recursion for {current_canonical_url} (Final Status: {final_fetch_status_for_recursion}, Depth: {current_depth}/{depth})"
                     )
                     if (
-                        final_fetch_status_for_recursion == "success"
+                        final_fetch_status_for_recursion in ("success", "not_modified", "duplicate")
                         and current_depth < depth
                     ):
                         logger.debug(
@@ -672,9 +1219,10 @@ async def start_recursive_download(
                                 if parsed_abs_link.netloc != start_domain:
                                     continue
                                 canon_link = canonicalize_url(abs_link)
-                                if canon_link not in visited:
-                                    visited.add(canon_link)
+                                if visited.add(canon_link):
                                     await queue.put((canon_link, current_depth + 1))
+                                    if crawl_state is not None:
+                                        crawl_state.discovered(canon_link, current_depth + 1)
                                     links_added_count += 1
                             except Exception as link_e:
                                 logger.warning(
@@ -685,7 +1233,7 @@ async def start_recursive_download(
                             f"Worker {worker_id}: Added {links_added_count} new links to queue from {current_canonical_url}."
                         )
                     elif (
-                        final_fetch_status_for_recursion == "success"
+                        final_fetch_status_for_recursion in ("success", "not_modified", "duplicate")
                         and current_depth >= depth
                     ):
                         logger.debug(
@@ -693,6 +1241,11 @@ async def start_recursive_download(
                         )
                     # else: No recursion needed if status wasn't success
 
+                    # After its links were queued, so both land in the same or
+                    # successive checkpoints
+                    if crawl_state is not None:
+                        crawl_state.done(current_canonical_url)
+
                     logger.debug(
                         f"Worker {worker_id}: Released semaphore for {current_canonical_url}"
                     )
@@ -712,6 +1265,8 @@ async def start_recursive_download(
                     except ValueError:
                         pass  # Ignore if already done
             finally:
+                if page_reserved:
+                    pages_fetched -= 1  # Not fetched; give the page back to the budget
                 # Final safety net for task_done
                 if queue_item is not None:
                     try:
@@ -729,11 +1284,84 @@ async def start_recursive_download(
 
     # --- Start Workers and Manage Download (Using Shared Client) ---
     worker_tasks = []
+    # Single task appending all index records of this crawl (batched, buffered)
+    index_writer = IndexWriter(index_path)
+    crawl_completed = False
+    # CPU-bound hashing/link extraction off the event loop (started lazily)
+    parse_pool: Optional[ParsePool] = (
+        ParsePool(processes=parse_processes)
+        if parse_processes > 0 and not use_playwright
+        else None
+    )
+
+    async def checkpoint_loop() -> None:
+        while True:
+            await asyncio.sleep(DEFAULT_CHECKPOINT_INTERVAL)
+            await crawl_state.checkpoint(index_writer)
+
+    checkpoint_task = (
+        asyncio.create_task(checkpoint_loop()) if crawl_state is not None else None
+    )
+
+    async def _seed_from_sitemaps(shared_client: httpx.AsyncClient) -> None:
+        try:
+            entries = await discover_sitemap_entries(
+                start_canonical_url,
+                shared_client,
+                robots_cache,
+                user_agent_string,
+                dns_cache=dns_cache,
+            )
+        except Exception as sitemap_e:
+            logger.warning(f"Sitemap discovery failed, crawling from links only: {sitemap_e}")
+            return
+        seeds = []
+        for entry in entries:
+            try:
+                canon = canonicalize_url(entry.url)
+            except Exception:
+                continue
+            if urlparse(canon).netloc == start_domain:
+                rank = recrawl_rank(
+                    entry.lastmod,
+                    previous_validators.get(canon, {}).get("last_modified"),
+                )
+                seeds.append((canon, entry.lastmod, rank))
+        if previous_validators:
+            # Stable sort: newest-first order is kept within each rank
+            seeds.sort(key=lambda seed: seed[2])
+        added = 0
+        for canon, lastmod, rank in seeds:
+            if visited.add(canon):
+                if rank != 2:  # No recency bonus for pages unchanged since our copy
+                    queue.set_lastmod(canon, lastmod)
+                queue.put_nowait((canon, 0))
+                if crawl_state is not None:
+                    crawl_state.discovered(canon, 0)
+                added += 1
+        logger.info(f"Seeded {added} URLs from sitemaps of {start_domain}")
+    # One long-lived browser for all Playwright fetches of this crawl (started lazily)
+    browser_pool: Optional[BrowserPool] = (
+        BrowserPool(
+            max_pages=min(effective_concurrency, DEFAULT_MAX_PAGES),
+            profile=render_profile,
+        )
+        if use_playwright
+        else None
+    )
     try:
         # Create client context manager OUTSIDE the worker loop
-        async with httpx.AsyncClient(
-            follow_redirects=True, timeout=client_timeout, headers=headers
-        ) as client:
+        shared_client, connection_stats = make_crawl_client(
+            max_connections=effective_concurrency,
+            per_host_connections=host_scheduler.max_concurrency,
+            http2=http2,
+            stats=connection_stats,
+            timeout=client_timeout,
+            headers=headers,
+        )
+        async with shared_client as client:
+            if use_sitemaps and not resumed:
+                await _seed_from_sitemaps(client)
             logger.info(f"Started {effective_concurrency} web download workers.")
             for i in range(effective_concurrency):
                 task = asyncio.create_task(
@@ -764,6 +1392,8 @@ async def start_recursive_download(
                     logger.error(
                         f"Web worker {i} raised an exception: {res}", exc_info=res
                     )
+            # A budget-limited crawl keeps its state so the next run continues it
+            crawl_completed = not budget_hit
 
     except asyncio.TimeoutError:
         logger.error(
@@ -784,6 +1414,38 @@ async def start_recursive_download(
         if worker_tasks:
             await asyncio.sleep(0.1)  # Allow cancellation to propagate
         # Shared client is closed automatically by the 'async with' block
+        if checkpoint_task is not None:
+            checkpoint_task.cancel()
+            try:
+                await checkpoint_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if crawl_state is not None:
+            if crawl_completed:
+                crawl_state.finish()
+            else:
+                # Interrupted: persist progress so the next run can resume
+                try:
+                    await crawl_state.checkpoint(index_writer)
+                except Exception as state_e:
+                    logger.warning(f"Final crawl state checkpoint failed: {state_e}")
+                crawl_state.close()
+        # Writes whatever is still queued and fsyncs before callers read the index
+        await index_writer.close()
+        visited.close()
+        if segment_store is not None:
+            segment_store.close()
+        if connection_stats is not None:
+            logger.info(f"Connection reuse: {connection_stats.summary()}")
+            for host, counts in connection_stats.snapshot().items():
+                logger.debug(f"Connections to {host}: {counts}")
+        if parse_pool is not None:
+            await parse_pool.close()
+        if browser_pool is not None:
+            try:
+                await browser_pool.close()
+            except Exception as pool_e:
+                logger.warning(f"Error closing browser pool: {pool_e}")
 
     logger.info(f"Recursive download process completed for ID: {download_id}")
 
@@ -12,6 +12,13 @@ Description:
   4. For 'website'/'playwright': Calls `web_downloader.start_recursive_download`
      to initiate the web crawl, passing along parameters like depth, timeouts,
      and progress bar instance.
+  5. Builds the search manifest (`index/<download_id>.manifest.sqlite`), the
+     pre-validated list of searchable pages `perform_search` loads instead of
+     re-reading the JSONL index.
+  6. Builds or incrementally refreshes the persistent inverted index
+     (`index/<download_id>.terms.sqlite`) used by the searcher to answer keyword
+     scans without re-parsing files. On recrawls only pages whose content_md5
+     changed are re-tokenized.
   It utilizes a shared `ThreadPoolExecutor` provided by the caller (e.g., CLI)
   for running synchronous tasks like Git commands or disk I/O scans asynchronously.
 
@@ -21,6 +28,8 @@ Third-Party Documentation:
 Internal Module Dependencies:
   - .git_downloader (run_git_clone, scan_local_files_async)
   - .web_downloader (start_recursive_download)
+  - mcp_doc_retriever.searcher.inverted_index (update_inverted_index)
+  - mcp_doc_retriever.searcher.manifest (build_manifest)
   - mcp_doc_retriever.utils (TIMEOUT_REQUESTS, TIMEOUT_PLAYWRIGHT)
 
 Sample Input (Conceptual - as called from CLI or API):
@@ -68,6 +77,9 @@ from tqdm.asyncio import tqdm
 # Internal module imports
 from .git_downloader import run_git_clone, scan_local_files_async
 from .web_downloader import start_recursive_download
+from .browser_pool import RenderProfile
+from mcp_doc_retriever.searcher.inverted_index import update_inverted_index
+from mcp_doc_retriever.searcher.manifest import build_manifest
 from mcp_doc_retriever.utils import (
     TIMEOUT_REQUESTS,
     TIMEOUT_PLAYWRIGHT,
@@ -89,10 +101,24 @@ async def fetch_documentation_workflow(
     base_dir: Path = Path("./downloads"),
     depth: int = 3,
     force: bool = False,
+    revalidate: bool = False,
     max_file_size: Optional[int] = 10 * 1024 * 1024,
     timeout_requests: Optional[int] = None,
     timeout_playwright: Optional[int] = None,
     max_concurrent_requests: int = 50,
+    render_profile: Optional[RenderProfile] = None,
+    visited_backend: str = "fingerprint",
+    parse_processes: int = 0,
+    use_sitemaps: bool = False,
+    frontier_order: str = "priority",
+    max_pages: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    detect_duplicates: bool = False,
+    delete_duplicates: bool = False,
+    content_addressed: bool = False,
+    storage_compression: str = "none",
+    segment_storage: bool = False,
+    http2: bool = True,
     executor: ThreadPoolExecutor = None,
     logger_override=None,
 ) -> None:
@@ -107,6 +133,9 @@ async def fetch_documentation_workflow(
         url: URL to download from (required for 'website' and 'playwright' source_types)
         depth: Maximum depth to crawl for website/playwright downloads (default: 3)
         force: Whether to force re-download existing content (default: False)
+        revalidate: Revalidate previously downloaded pages with conditional
+            requests (ETag/Last-Modified) instead of skipping or re-downloading
+            them (website source only, default: False)
         max_file_size: Maximum file size to download in bytes (default: 10MB)
         timeout_requests: Timeout in seconds for HTTP requests (default: None)
         timeout_playwright: Timeout in seconds for Playwright operations (default: None)
@@ -114,6 +143,20 @@ async def fetch_documentation_workflow(
     Internal Implementation Args:
         base_dir: Base directory for downloads (default: ./downloads)
         max_concurrent_requests: Maximum concurrent requests for web downloads
+        render_profile: Playwright wait condition / request blocking (playwright source only)
+        visited_backend: Visited-URL set for web crawls ('fingerprint', 'bloom' or 'exact')
+        parse_processes: Processes for hashing/link extraction (0 = in the event loop)
+        use_sitemaps: Also queue the pages listed in the site's sitemaps (web crawls)
+        frontier_order: Crawl order, 'priority' (scored) or 'fifo'
+        max_pages: Stop a web crawl after fetching this many pages (None = no limit)
+        time_budget: Stop a web crawl after this many seconds (None = no limit)
+        detect_duplicates: Record pages whose text is a near-duplicate of a saved page
+            as 'duplicate' (kept on disk, skipped by searches)
+        delete_duplicates: Also delete near-duplicate pages and do not follow their links
+        content_addressed: Store page bodies once by hash under <base_dir>/blobs (web crawls)
+        storage_compression: Compress saved web pages on disk ('none', 'gzip' or 'zstd')
+        segment_storage: Pack web pages into segment files under <base_dir>/segments
+        http2: Use HTTP/2 for web crawls when the 'h2' package is installed
         executor: ThreadPoolExecutor for running synchronous tasks
         logger_override: Optional logger instance to use instead of module logger
     """
@@ -267,6 +310,7 @@ async def fetch_documentation_workflow(
                 start_url=url,
                 depth=depth,
                 force=force,
+                revalidate=revalidate,
                 download_id=download_id,  # Pass sanitized ID
                 base_dir=base_dir,  # Pass base_dir (contains index/content)
                 use_playwright=use_playwright,
@@ -275,6 +319,19 @@ async def fetch_documentation_workflow(
                 max_file_size=max_file_size,
                 progress_bar=pbar_web,  # Pass the tqdm instance
                 max_concurrent_requests=max_concurrent_requests,
+                render_profile=render_profile,
+                visited_backend=visited_backend,
+                parse_processes=parse_processes,
+                use_sitemaps=use_sitemaps,
+                frontier_order=frontier_order,
+                max_pages=max_pages,
+                time_budget=time_budget,
+                detect_duplicates=detect_duplicates,
+                delete_duplicates=delete_duplicates,
+                content_addressed=content_addressed,
+                storage_compression=storage_compression,
+                segment_storage=segment_storage,
+                http2=http2,
                 executor=executor,  # Pass executor for potential sync tasks within web download
             )
         except Exception as e:
@@ -295,6 +352,23 @@ async def fetch_documentation_workflow(
         _logger.error(f"Invalid source_type '{source_type}' encountered in workflow.")
         raise ValueError(f"Invalid source_type '{source_type}'")
 
+    # --- Build Search Manifest and Refresh Search Index (run in executor) ---
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(executor, build_manifest, base_dir, download_id)
+    except Exception as e:
+        # Search falls back to reading the JSONL index, so this is not fatal
+        _logger.error(f"Failed to build manifest for {download_id}: {e}", exc_info=True)
+    try:
+        await loop.run_in_executor(
+            executor, update_inverted_index, base_dir, download_id
+        )
+    except Exception as e:
+        # Search falls back to scanning files, so this is not fatal
+        _logger.error(
+            f"Failed to update inverted index for {download_id}: {e}", exc_info=True
+        )
+
     _logger.info(f"Fetch workflow completed for ID: {download_id}")
 
 
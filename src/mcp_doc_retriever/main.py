@@ -32,6 +32,8 @@ from mcp_doc_retriever.core import (
     db_connection, # Needed for usage_example override check
 )
 from mcp_doc_retriever.models import TaskStatus # Needed for usage_example
+from mcp_doc_retriever.searcher.doc_cache import configure_document_cache
+from mcp_doc_retriever.searcher.scanner import shutdown_scan_pool
 
 # Import the API router
 from mcp_doc_retriever.api import router as api_router
@@ -69,18 +71,20 @@ app = FastAPI(
 # --- Startup and Shutdown Events ---
 @app.on_event("startup")
 async def app_startup():
-    """Initialize database connection on startup."""
+    """Initialize database connection and the search document cache on startup."""
     await init_db() # Use function from core.py
+    configure_document_cache(getattr(config, "SEARCH_DOC_CACHE_MB", 256) * 1024 * 1024)
 
 
 @app.on_event("shutdown")
 async def app_shutdown():
-    """Gracefully shutdown the shared thread pool executor and DB connection."""
+    """Gracefully shutdown the shared thread pool executor, scan pool and DB connection."""
     logger.info("Application shutting down...")
     await close_db() # Use function from core.py
     logger.info("Closing thread pool executor.")
     shared_executor.shutdown(wait=True) # Use executor from core.py
     logger.info("Executor shutdown complete.")
+    shutdown_scan_pool()  # Worker processes of parallel keyword scans, if started
 
 
 # --- Include API Routes ---
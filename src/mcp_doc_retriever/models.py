@@ -272,6 +272,14 @@ class DocDownloadRequest(BaseModel):
         None, ge=0, description="Crawling depth for website/playwright"
     )
     force: Optional[bool] = Field(None, description="Overwrite existing download data")
+    revalidate: Optional[bool] = Field(
+        None,
+        description="Revalidate previously downloaded pages via ETag/Last-Modified (website only)",
+    )
+    use_sitemaps: Optional[bool] = Field(
+        None,
+        description="Also crawl the pages listed in the site's sitemaps (website/playwright)",
+    )
 
     @model_validator(mode="after")
     def check_conditional_fields(self):
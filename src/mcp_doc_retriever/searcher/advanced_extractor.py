@@ -17,8 +17,8 @@ from typing import List, Optional, Dict, Any, Union # Added Union
 # Use relative imports for models, helpers, and utils
 from mcp_doc_retriever.searcher.searcher import SearchResultItem
 from mcp_doc_retriever.searcher.helpers import ContentBlock
+from mcp_doc_retriever.searcher.doc_cache import get_document_cache
 from mcp_doc_retriever.searcher.helpers import (
-    read_file_with_fallback,
     extract_content_blocks_from_html, # Keep for HTML
     json_structure_search,
     code_block_relevance_score,
@@ -63,10 +63,12 @@ def extract_advanced_snippets_with_options(
     if isinstance(file_path, str):
         file_path = Path(file_path) # Convert str to Path
 
-    content = read_file_with_fallback(file_path)
-    if content is None:
+    # Shared with the keyword scan and basic extraction (parsed at most once)
+    document = get_document_cache().get(file_path)
+    if document is None:
         logger.warning(f"Cannot read file for advanced extraction: {file_path}")
         return []
+    content = document.content
     # --- DEBUG: Log raw content before block extraction ---
     logger.debug(f"Raw content read for {file_path} (length: {len(content) if content else 0}):\n'''\n{content[:500] + '...' if content and len(content) > 500 else content}\n'''")
 
@@ -89,11 +91,15 @@ def extract_advanced_snippets_with_options(
         elif file_suffix in ['.html', '.htm']:
             extractor_type = "HTML"
             logger.debug(f"Using HTML extractor for {file_path}")
-            content_blocks = extract_content_blocks_from_html(content, source_url=file_uri)
+            content_blocks = extract_content_blocks_from_html(
+                content, source_url=file_uri, soup=document.soup()
+            )
         else:
             extractor_type = "HTML (fallback)"
             logger.warning(f"Unsupported file type '{file_suffix}' for advanced extraction, attempting HTML: {file_path}")
-            content_blocks = extract_content_blocks_from_html(content, source_url=file_uri) # Default to HTML for now
+            content_blocks = extract_content_blocks_from_html(
+                content, source_url=file_uri, soup=document.soup()
+            ) # Default to HTML for now
 
     except Exception as e:
         logger.error(
@@ -19,6 +19,7 @@ import sys
 try:
     # No longer need extract_text_from_html_content directly here if selector is always used
     from mcp_doc_retriever.searcher.helpers import read_file_with_fallback
+    from mcp_doc_retriever.searcher.doc_cache import get_document_cache
     from mcp_doc_retriever.utils import contains_all_keywords
 
     IMPORTS_OK = True
@@ -40,7 +41,7 @@ except ImportError as e:
 
 # Use try-except for bs4 import
 try:
-    from bs4 import BeautifulSoup, CSS
+    from bs4 import CSS
 
     BS4_AVAILABLE = True
 except ImportError:
@@ -82,24 +83,17 @@ def extract_text_with_selector(
         logger.warning(f"Extraction skipped: Empty selector provided for {file_path}.")
         return []
 
-    content = read_file_with_fallback(file_path)
-    if content is None:
+    # Read and parse the page through the document cache, which usually
+    # already holds it from the keyword scan
+    document = get_document_cache().get(file_path)
+    if document is None:
         logger.debug(f"Extraction skipped: Cannot read file: {file_path}")
         return []
 
     extracted_snippets: List[str] = []
 
     try:
-        # Use lxml if available for performance, fallback to html.parser
-        parser_to_use = "html.parser"
-        try:
-            import lxml
-
-            parser_to_use = "lxml"
-        except ImportError:
-            pass
-
-        soup = BeautifulSoup(content, parser_to_use)
+        soup = document.soup()  # Shared parse tree: only read from it
 
         # --- MODIFIED LOGIC: Use soup.select() for CSS selection ---
         try:
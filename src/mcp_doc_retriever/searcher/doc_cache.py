@@ -0,0 +1,247 @@
+"""
+Module: doc_cache.py
+
+Description:
+A bounded LRU cache of the pages searches read, so a page is read, decoded
+and parsed once and then shared by the search phases and by later queries.
+
+A candidate page used to be parsed once by the keyword scan (plain text), again
+by the CSS-selector extraction, and a third time by the advanced block
+extraction. `DocumentCache.get(path)` returns a `CachedDocument` holding the
+decoded content; its parse tree (`soup()`) and plain text (`text()`) are
+built on first use and kept with it. The soup is shared, so callers must only
+read it (`select`, `find_all`, `get_text`, ...). The keyword scan drops the
+soups of pages it does not match: a parse tree is ~20x the page's size and
+later scans only need the text, so the memory goes to the trees of matching
+pages, which the extraction phase reads next.
+
+Entries are keyed by path and are valid for the (mtime_ns, size) the page had
+when it was read (`page_stat`; segment pages never change in place). A
+rewritten page is read again. Eviction is by memory, least recently used
+first: each entry counts the size of its content and text strings plus an
+estimate of its soup (SOUP_BYTES_PER_CHAR per character of content, measured
+for lxml trees), and entries are evicted while the total exceeds `max_bytes`.
+
+The cache is per process: scan worker processes (see scanner.py) each keep
+their own, sized to an equal share of the API process's budget.
+`get_document_cache()` returns this process's cache;
+`configure_document_cache` resizes it (0 disables caching).
+
+Sample Input/Output:
+  document = get_document_cache().get(Path("./downloads/content/job/example.com/index.html"))
+  document.text()                     # -> 'Example Domain This domain is for use in ...'
+  document.soup().select("p")         # -> [<p>This domain is for use in ...</p>, ...]
+  get_document_cache().stats()
+  # -> {'entries': 1, 'bytes': 34120, 'max_bytes': 268435456, 'hits': 0, 'misses': 1, 'evictions': 0}
+"""
+
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from mcp_doc_retriever.downloader.compression import page_stat
+from mcp_doc_retriever.searcher.helpers import (
+    BeautifulSoup,
+    extract_text_from_soup,
+    parse_html,
+    read_file_with_fallback,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Approximate memory of an lxml-built soup per character of page content
+SOUP_BYTES_PER_CHAR = 20
+
+_NOT_EXTRACTED = object()
+
+
+class CachedDocument:
+    """A page's decoded content, with its soup and plain text built on first use."""
+
+    __slots__ = ("key", "signature", "content", "nbytes", "_soup", "_text", "_cache")
+
+    def __init__(
+        self,
+        key: str,
+        signature: Optional[Tuple[int, int]],
+        content: str,
+        cache: "DocumentCache",
+    ):
+        self.key = key
+        self.signature = signature
+        self.content = content
+        self.nbytes = sys.getsizeof(content)
+        self._soup: Optional[BeautifulSoup] = None
+        self._text: Any = _NOT_EXTRACTED
+        self._cache = cache
+
+    def soup(self) -> BeautifulSoup:
+        """The parsed page (shared: read it, do not modify it)."""
+        soup = self._soup  # May be dropped concurrently; keep our reference
+        if soup is None:
+            soup = parse_html(self.content)
+            self._cache._attach(self, "_soup", soup, SOUP_BYTES_PER_CHAR * len(self.content))
+        return soup
+
+    def drop_soup(self) -> None:
+        """Frees the soup (e.g. of a page the scan did not match); text stays cached."""
+        self._cache._detach_soup(self)
+
+    def text(self) -> Optional[str]:
+        """Plain text of the page, as `extract_text_from_html_content` returns it."""
+        if self._text is _NOT_EXTRACTED:
+            text = extract_text_from_soup(self.soup()) if self.content else None
+            self._cache._attach(self, "_text", text, sys.getsizeof(text) if text else 0)
+        return self._text
+
+
+class DocumentCache:
+    """Thread-safe LRU of `CachedDocument`s, bounded by their estimated memory."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max(0, max_bytes)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedDocument]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, path: Path) -> Optional[CachedDocument]:
+        """
+        The cached document for `path`, reading the page if it is not cached
+        or changed since. Returns None if the page cannot be read (logged by
+        read_file_with_fallback).
+        """
+        key = str(path)
+        try:
+            signature: Optional[Tuple[int, int]] = page_stat(path)
+        except OSError:
+            signature = None  # Not readable either; read_file_with_fallback logs why
+        with self._lock:
+            document = self._entries.get(key)
+            if document is not None and signature is not None and document.signature == signature:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return document
+            self._misses += 1
+
+        content = read_file_with_fallback(path)
+        if content is None:
+            return None
+        document = CachedDocument(key, signature, content, self)
+        if signature is None or self.max_bytes == 0:
+            return document  # Served uncached
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = document
+            self._bytes += document.nbytes
+            self._evict()
+        return document
+
+    def _attach(self, document: CachedDocument, attribute: str, value: Any, nbytes: int) -> None:
+        """Stores a value derived from `document` and charges its memory."""
+        with self._lock:
+            # Two threads may derive it at once; the first one is kept
+            if attribute == "_soup" and document._soup is not None:
+                return
+            if attribute == "_text" and document._text is not _NOT_EXTRACTED:
+                return
+            setattr(document, attribute, value)
+            document.nbytes += nbytes
+            if self._entries.get(document.key) is document:
+                self._bytes += nbytes
+                self._evict()
+
+    def _detach_soup(self, document: CachedDocument) -> None:
+        with self._lock:
+            if document._soup is None:
+                return
+            document._soup = None
+            nbytes = SOUP_BYTES_PER_CHAR * len(document.content)
+            document.nbytes -= nbytes
+            if self._entries.get(document.key) is document:
+                self._bytes -= nbytes
+
+    def _evict(self) -> None:
+        # Caller holds the lock
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self._evictions += 1
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max(0, max_bytes)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count, memory estimate and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+_document_cache = DocumentCache()
+
+
+def get_document_cache() -> DocumentCache:
+    """This process's document cache, shared by all searches."""
+    return _document_cache
+
+
+def configure_document_cache(max_bytes: int) -> None:
+    """Sets the memory budget of the document cache (0 disables it)."""
+    _document_cache.resize(max_bytes)
+    logger.info(f"Search document cache limited to {max_bytes / (1024 * 1024):.0f} MB")
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        page = Path(tmpdir) / "page.html"
+        page.write_text(
+            "<html><head><title>Demo</title></head><body><p>Cached apple text</p></body></html>",
+            encoding="utf-8",
+        )
+        cache = DocumentCache(max_bytes=1024 * 1024)
+        document = cache.get(page)
+        print(document.text())
+        assert document.text() == "Demo Cached apple text"
+        assert cache.get(page) is document  # Hit: same content, soup and text
+        assert [p.get_text() for p in document.soup().select("p")] == ["Cached apple text"]
+
+        page.write_text("<html><body><p>Rewritten</p></body></html>", encoding="utf-8")
+        os.utime(page, ns=(0, 0))  # Make sure mtime changes on coarse clocks
+        assert cache.get(page).text() == "Rewritten"
+        print(cache.stats())
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+        cache.resize(0)
+        assert cache.stats()["entries"] == 0
+
+    print("\n------------------------------------")
+    print("✓ Document cache examples passed successfully.")
+    print("------------------------------------")
@@ -12,13 +12,13 @@ import json
 import re
 import sys  # <-- CHANGE: Added import sys
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Set, Tuple
+from typing import Iterator, List, Optional, Dict, Any, Set, Tuple
 from pydantic import BaseModel
 from typing import Literal, Optional, Dict, Any, Set, Tuple # List already imported
 
 # Use try-except for bs4 import to make it optional at runtime if needed
 try:
-    from bs4 import BeautifulSoup, Comment
+    from bs4 import BeautifulSoup, Comment, NavigableString, PageElement, Tag
 
     BS4_AVAILABLE = True
 except ImportError:
@@ -31,8 +31,26 @@ except ImportError:
     class Comment:
         pass
 
+    class NavigableString:
+        pass
+
+    class PageElement:
+        pass
+
+    class Tag:
+        pass
+
+# Use lxml if available (faster), fallback to Python's built-in html.parser
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 
 # Import necessary models and utils from parent/sibling packages
+from mcp_doc_retriever.downloader.compression import page_exists, page_stat, read_page_bytes
 # ContentBlock is now defined locally in this file
 
 # --- CHANGE: REMOVED local contains_all_keywords definition and mock ---
@@ -70,6 +88,19 @@ class ContentBlock(BaseModel):
 
 logger = logging.getLogger(__name__)
 
+# --- Constants ---
+# File types considered by the search phases (scan, index, extraction)
+SEARCHABLE_EXTENSIONS = {".html", ".htm", ".md", ".rst", ".txt", ".json", ".xml"}
+# Index record statuses whose local_path holds current content
+# ('not_modified' = revalidated with a 304, the stored copy is still valid;
+# 'duplicate' pages are near-copies of another page and are never searched)
+SEARCHABLE_FETCH_STATUSES = {"success", "not_modified"}
+# Tags whose contents are never part of a page's readable text
+NON_CONTENT_TAGS = ["script", "style", "noscript", "meta", "link"]
+_NON_CONTENT_TAG_SET = frozenset(NON_CONTENT_TAGS)
+# Containers of a page's main text, in order of preference
+MAIN_CONTENT_TAGS = ("main", "article", "body")
+
 # --- File System Helpers ---
 
 
@@ -111,13 +142,12 @@ def is_allowed_path(file_path: Path, allowed_base_dirs: List[Path]) -> bool:
 def is_file_size_ok(file_path: Path, max_size_bytes: int = 10 * 1024 * 1024) -> bool:
     """Checks file existence, type, and size limit."""
     try:
-        # Ensure it exists and is a file (not a directory or symlink to one)
-        if not file_path.is_file():
+        # Ensure it exists and is a file or segment page (not a directory)
+        if not page_exists(file_path):
             logger.debug(f"File size check failed: Not a file: {file_path}")
             return False
         # Get file stats
-        stats = file_path.stat()
-        size = stats.st_size
+        _, size = page_stat(file_path)
         # Check if size is within the allowed range (0 bytes is okay)
         is_ok = 0 <= size <= max_size_bytes
         if not is_ok:
@@ -138,38 +168,40 @@ def is_file_size_ok(file_path: Path, max_size_bytes: int = 10 * 1024 * 1024) ->
 
 
 def read_file_with_fallback(file_path: Path) -> Optional[str]:
-    """Attempts to read a text file with multiple encodings."""
-    if not file_path.is_file():
+    """
+    Attempts to read a text file with multiple encodings. Pages stored
+    gzip/zstd-compressed or packed into segments by the downloader are read
+    transparently.
+    """
+    if not page_exists(file_path):
         logger.warning(f"File read skipped: Not a file or does not exist: {file_path}")
         return None
+    try:
+        raw = read_page_bytes(file_path)
+    except (FileNotFoundError, IsADirectoryError):
+        # Handle race condition where file status changes between check and read
+        logger.warning(f"File status changed unexpectedly before reading: {file_path}")
+        return None  # Cannot proceed if file is gone or became a directory
+    except PermissionError as e:
+        # Handle OS-level permission issues
+        logger.warning(f"Permission denied reading {file_path}: {e}")
+        return None  # Cannot read if no permission
+    except Exception as e:
+        # Catch other potential file reading errors (e.g., I/O errors, corrupt archives)
+        logger.warning(f"Error reading {file_path}: {e}")
+        return None
     # Common text encodings, starting with the most standard
     encodings_to_try = ["utf-8", "latin-1", "windows-1252"]
     for encoding in encodings_to_try:
         try:
-            # Attempt to read the file with the current encoding
-            content = file_path.read_text(encoding=encoding)
+            # Universal newlines, as read_text() would give
+            content = raw.decode(encoding).replace("\r\n", "\n").replace("\r", "\n")
             logger.debug(f"Read {file_path} successfully with {encoding}")
             return content
         except UnicodeDecodeError:
             # If this encoding fails, log it and try the next one
             logger.debug(f"Failed to decode {file_path} with {encoding}, trying next.")
             continue
-        except (FileNotFoundError, IsADirectoryError):
-            # Handle race condition where file status changes between check and read
-            logger.warning(
-                f"File status changed unexpectedly before reading: {file_path}"
-            )
-            return None  # Cannot proceed if file is gone or became a directory
-        except PermissionError as e:
-            # Handle OS-level permission issues
-            logger.warning(f"Permission denied reading {file_path}: {e}")
-            return None  # Cannot read if no permission
-        except Exception as e:
-            # Catch other potential file reading errors (e.g., I/O errors)
-            logger.warning(f"Error reading {file_path} with {encoding}: {e}")
-            # Depending on policy, you might want to return None or continue to next encoding
-            # Returning None here as a general error occurred with this attempt.
-            return None
     # If all encodings failed
     logger.warning(
         f"Could not read or decode {file_path} with tried encodings: {encodings_to_try}"
@@ -180,6 +212,76 @@ def read_file_with_fallback(file_path: Path) -> Optional[str]:
 # --- Content Extraction and Analysis Utilities ---
 
 
+def parse_html(html_content: str) -> BeautifulSoup:
+    """Parses HTML with lxml if available (faster), else Python's built-in html.parser."""
+    return BeautifulSoup(html_content, HTML_PARSER)
+
+
+def _outside_non_content(element) -> bool:
+    """True unless the element sits inside a tag that holds no readable text."""
+    return element.find_parent(NON_CONTENT_TAGS) is None
+
+
+def _iter_content_nodes(root) -> Iterator[PageElement]:
+    """
+    Yields the descendants of `root` in document order, skipping the
+    subtrees of non-content tags. Uses an explicit stack, so each node is
+    visited once, and does not modify the tree.
+    """
+    stack = list(reversed(root.contents))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Tag):
+            if node.name in _NON_CONTENT_TAG_SET:
+                continue
+            stack.extend(reversed(node.contents))
+        yield node
+
+
+def extract_text_from_soup(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Extracts plain text (title, then main content) from a parsed page,
+    ignoring scripts, styles, comments and other noise. The soup is only
+    read, so it can be shared with the other search phases (see doc_cache).
+    """
+    # Title text, unless it is hidden in a non-content tag
+    title_text = ""
+    title = soup.title
+    if title is not None and title.string and _outside_non_content(title):
+        title_text = title.string.strip()
+
+    # Main content container: the first main, else article, else body
+    candidates: Dict[str, Tag] = {}
+    for node in _iter_content_nodes(soup):
+        if isinstance(node, Tag) and node.name in MAIN_CONTENT_TAGS:
+            candidates.setdefault(node.name, node)
+            if node.name == MAIN_CONTENT_TAGS[0]:
+                break
+    container = next((candidates[name] for name in MAIN_CONTENT_TAGS if name in candidates), soup)
+
+    # Same strings as get_text(separator=" ", strip=True) (comments and
+    # script/style contents have their own string types and are skipped),
+    # minus those inside non-content tags
+    body_text = " ".join(
+        stripped
+        for node in _iter_content_nodes(container)
+        if type(node) is NavigableString and (stripped := node.strip())
+    )
+
+    # Combine title and body text
+    combined_parts = []
+    if title_text:
+        combined_parts.append(title_text)
+    if body_text:
+        combined_parts.append(body_text)
+    text = " ".join(combined_parts)
+
+    # Normalize whitespace: replace multiple spaces/newlines/tabs with a single space
+    text = re.sub(r"\s+", " ", text).strip()
+    # Return the cleaned text, or None if it ended up being empty
+    return text if text else None
+
+
 def extract_text_from_html_content(html_content: str) -> Optional[str]:
     """Extracts plain text from HTML string, removing noise."""
     if not html_content:
@@ -188,52 +290,7 @@ def extract_text_from_html_content(html_content: str) -> Optional[str]:
         logger.error("BeautifulSoup4 not available, cannot extract text from HTML.")
         return None  # Cannot proceed without BS4
     try:
-        # Use lxml if available (faster), fallback to Python's built-in html.parser
-        try:
-            soup = BeautifulSoup(html_content, "lxml")
-        except ImportError:
-            logger.debug("lxml not found, using html.parser for HTML parsing.")
-            soup = BeautifulSoup(html_content, "html.parser")  # Default fallback
-
-        # Decompose unwanted tags (like scripts, styles, etc.) that don't contribute to readable text
-        # *** CHANGE: Removed 'head' from this list to keep title text ***
-        tags_to_remove = ["script", "style", "noscript", "meta", "link"]
-        for element in soup.find_all(tags_to_remove):
-            element.decompose()  # Remove the tag and its contents
-
-        # Remove comments, as they are typically not part of the main content
-        # Using a lambda function to find all comment objects
-        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-            comment.extract()  # Remove the comment node
-
-        # --- CHANGE: Explicitly extract title and main content separately ---
-        # 1. Extract Title Text
-        title_text = ""
-        if soup.title and soup.title.string:
-            title_text = soup.title.string.strip()
-
-        # 2. Extract Main Content Text (from body, main, or article)
-        main_content_container = soup.find("main") or soup.find("article") or soup.body
-        body_text = ""
-        if main_content_container:
-            body_text = main_content_container.get_text(separator=" ", strip=True)
-        elif soup: # Fallback to whole soup if no body/main/article found (unlikely for valid HTML)
-             body_text = soup.get_text(separator=" ", strip=True)
-
-        # 3. Combine Title and Body Text
-        # Ensure a space between title and body if both exist
-        combined_parts = []
-        if title_text:
-            combined_parts.append(title_text)
-        if body_text:
-            combined_parts.append(body_text)
-        text = " ".join(combined_parts)
-        # --- END CHANGE ---
-
-        # Normalize whitespace: replace multiple spaces/newlines/tabs with a single space
-        text = re.sub(r"\s+", " ", text).strip()
-        # Return the cleaned text, or None if it ended up being empty
-        return text if text else None
+        return extract_text_from_soup(parse_html(html_content))
     except Exception as e:
         # Catch potential errors during parsing or text extraction
         logger.warning(f"Error extracting text from HTML: {e}", exc_info=True)
@@ -307,9 +364,15 @@ def _find_block_lines(
 
 
 def extract_content_blocks_from_html(
-    html_content: str, source_url: Optional[str] = None
+    html_content: str,
+    source_url: Optional[str] = None,
+    soup: Optional[BeautifulSoup] = None,
 ) -> List[ContentBlock]:
-    """Extracts structured content blocks (code, json, text) from HTML."""
+    """
+    Extracts structured content blocks (code, json, text) from HTML.
+    `soup` is the already parsed `html_content`, if available (it is not
+    modified).
+    """
     content_blocks: List[ContentBlock] = []
     if not html_content:
         return content_blocks
@@ -318,10 +381,10 @@ def extract_content_blocks_from_html(
         return content_blocks
 
     try:
-        try:
-            soup = BeautifulSoup(html_content, "lxml")
-        except ImportError:
-            soup = BeautifulSoup(html_content, "html.parser")
+        if soup is None:
+            soup = parse_html(html_content)
+        # Tags already extracted (by id), so their text is not extracted again
+        processed: Set[int] = set()
         # Get source lines for line number calculation
         source_lines = html_content.splitlines()
         # Keep track of line spans used by extracted blocks to avoid overlap
@@ -400,14 +463,14 @@ def extract_content_blocks_from_html(
                 )
             )
             # Mark the tag as processed to avoid extracting its text content later
-            pre.attrs["_mcp_processed"] = "true"
+            processed.add(id(pre))
             if code_tag:
-                code_tag.attrs["_mcp_processed"] = "true"
+                processed.add(id(code_tag))
 
         # Priority 2: Standalone <code> blocks (not inside <pre>)
         for code_tag in soup.find_all("code"):
             # Skip if already processed (part of a <pre>) or inside a <pre> parent
-            if code_tag.has_attr("_mcp_processed") or code_tag.find_parent("pre"):
+            if id(code_tag) in processed or code_tag.find_parent("pre"):
                 continue
 
             block_text = code_tag.get_text(
@@ -459,7 +522,7 @@ def extract_content_blocks_from_html(
                 )
             )
             # Mark as processed
-            code_tag.attrs["_mcp_processed"] = "true"
+            processed.add(id(code_tag))
 
         # Priority 3: Meaningful text blocks (paragraphs, list items, headings, etc.)
         # Define tags generally containing textual content
@@ -502,8 +565,8 @@ def extract_content_blocks_from_html(
         for tag in soup.find_all(text_tags):
             # Skip if tag itself or any ancestor was already processed or is in skip list
             if (
-                tag.has_attr("_mcp_processed")
-                or tag.find_parent(lambda p: p.has_attr("_mcp_processed"))
+                id(tag) in processed
+                or any(id(parent) in processed for parent in tag.parents)
                 or tag.find_parent(skip_parent_tags)
             ):
                 continue
@@ -519,7 +582,7 @@ def extract_content_blocks_from_html(
                 cb.type in ["code", "json"] and cb.content.strip() == block_text
                 for cb in content_blocks
             ):
-                tag.attrs["_mcp_processed"] = "true"  # Mark it processed anyway
+                processed.add(id(tag))  # Mark it processed anyway
                 continue
 
             # Find line numbers
@@ -540,7 +603,7 @@ def extract_content_blocks_from_html(
                 )
             )
             # Mark as processed
-            tag.attrs["_mcp_processed"] = "true"
+            processed.add(id(tag))
 
     except Exception as e:
         logger.error(
@@ -0,0 +1,500 @@
+"""
+Module: inverted_index.py
+
+Description:
+Builds and queries a persistent, per-download inverted index so that the
+keyword scan phase of `perform_search` can be answered from posting lists
+instead of re-reading and re-parsing every downloaded file on each query.
+
+The index lives next to the JSONL index as `index/<download_id>.terms.sqlite`
+and contains:
+  - `documents`: one row per searchable file (relative `local_path`, mtime,
+    size and `content_md5` from the index record).
+  - `terms`: the vocabulary (lowercased `\\w+` tokens of the extracted text).
+  - `postings`: (term, document, first character offset) triples.
+
+Keyword semantics match `utils.contains_all_keywords` (case-insensitive
+substring match on the extracted text). A single-token keyword such as
+"valid" is answered exactly by matching it against the vocabulary, so it also
+finds documents containing "validator". Keywords spanning several tokens
+("field validator", "foo-bar") can only be narrowed by the index; the caller
+must confirm those candidates with the regular scanner.
+
+After a recrawl, `update_inverted_index` refreshes the index incrementally:
+only documents whose `content_md5` changed are re-tokenized, and postings of
+changed or vanished documents are removed.
+
+The index records the size and mtime of the JSONL it was built from. If the
+JSONL changes afterwards (e.g. a recrawl appended records), the index is
+considered stale and `find_candidate_paths` returns None so the caller falls
+back to a full scan.
+
+Third-Party Documentation:
+- sqlite3: https://docs.python.org/3/library/sqlite3.html
+
+Sample Input/Output:
+  build_inverted_index(Path("./downloads"), "python_docs")
+  # -> Path("./downloads/index/python_docs.terms.sqlite")
+  find_candidate_paths(Path("./downloads"), "python_docs", ["asyncio", "gather"])
+  # -> ({"content/python_docs/docs.python.org/https_docs...-1a2b3c4d.html"}, True)
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from mcp_doc_retriever.downloader.compression import page_stat
+from mcp_doc_retriever.searcher.helpers import (
+    extract_text_from_html_content,
+    is_file_size_ok,
+    read_file_with_fallback,
+)
+from mcp_doc_retriever.searcher.manifest import collect_searchable_records
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+INDEX_DB_SUFFIX = ".terms.sqlite"
+SCHEMA_VERSION = "1"
+TOKEN_PATTERN = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    local_path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER,
+    content_md5 TEXT
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+"""
+
+
+def inverted_index_path(base_dir: Path, download_id: str) -> Path:
+    """Returns the location of the inverted index database for a download."""
+    return base_dir / "index" / f"{download_id}{INDEX_DB_SUFFIX}"
+
+
+def tokenize_text(text: str) -> Dict[str, int]:
+    """
+    Splits extracted text into lowercased `\\w+` terms.
+
+    Returns:
+        Mapping of term -> character offset of its first occurrence.
+    """
+    terms: Dict[str, int] = {}
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        terms.setdefault(match.group(0), match.start())
+    return terms
+
+
+def _source_signature(index_file_path: Path) -> Tuple[int, int]:
+    """Returns (size, mtime_ns) of the JSONL index used to detect staleness."""
+    stat = index_file_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _iter_indexable_records(
+    abs_base_dir: Path, index_file_path: Path
+) -> Iterator[Tuple[str, Path, Optional[str]]]:
+    """
+    Yields (local_path, absolute_path, content_md5) for the records that
+    `perform_search` would scan: the current copy of each URL as chosen by
+    `collect_searchable_records`, skipping files over the size limit. A file
+    shared by several URLs is yielded once.
+    """
+    records, _, _ = collect_searchable_records(abs_base_dir, index_file_path)
+    seen_paths: Set[str] = set()
+    for abs_path, record in records:
+        if record.local_path in seen_paths:
+            continue
+        seen_paths.add(record.local_path)
+        if not is_file_size_ok(abs_path):
+            continue
+        yield record.local_path, abs_path, record.content_md5
+
+
+def _index_document(
+    conn: sqlite3.Connection,
+    term_ids: Dict[str, int],
+    local_path: str,
+    abs_path: Path,
+    content_md5: Optional[str],
+) -> bool:
+    """Extracts, tokenizes and stores a single document. Returns True if indexed."""
+    content = read_file_with_fallback(abs_path)
+    if content is None:
+        return False
+    text = extract_text_from_html_content(content)
+    if text is None:
+        # The scanner skips files whose text cannot be extracted as well.
+        return False
+
+    mtime_ns, size = page_stat(abs_path)
+    cursor = conn.execute(
+        "INSERT INTO documents (local_path, mtime_ns, size, content_md5) VALUES (?, ?, ?, ?)",
+        (local_path, mtime_ns, size, content_md5),
+    )
+    doc_id = cursor.lastrowid
+
+    postings = []
+    for term, offset in tokenize_text(text).items():
+        term_id = term_ids.get(term)
+        if term_id is None:
+            # The term may already exist in an index being updated in place
+            conn.execute("INSERT OR IGNORE INTO terms (term) VALUES (?)", (term,))
+            term_id = conn.execute(
+                "SELECT term_id FROM terms WHERE term = ?", (term,)
+            ).fetchone()[0]
+            term_ids[term] = term_id
+        postings.append((term_id, doc_id, offset))
+    conn.executemany(
+        "INSERT INTO postings (term_id, doc_id, offset) VALUES (?, ?, ?)", postings
+    )
+    return True
+
+
+def _remove_document(conn: sqlite3.Connection, doc_id: int) -> None:
+    """Deletes a document and all of its postings."""
+    conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+    conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+
+def _is_unchanged(
+    previous: Tuple[int, Optional[int], Optional[int], Optional[str]],
+    abs_path: Path,
+    content_md5: Optional[str],
+) -> bool:
+    """
+    Decides whether an indexed document can be kept as is. The content_md5
+    recorded by the downloader is authoritative; when either side lacks it
+    (e.g. older records), fall back to comparing file mtime and size.
+    """
+    _doc_id, mtime_ns, size, previous_md5 = previous
+    if content_md5 and previous_md5:
+        return content_md5 == previous_md5
+    try:
+        return page_stat(abs_path) == (mtime_ns, size)
+    except OSError:
+        return False
+
+
+def _write_meta(conn: sqlite3.Connection, index_file_path: Path) -> None:
+    """Stores schema version and the JSONL signature the index corresponds to."""
+    source_size, source_mtime_ns = _source_signature(index_file_path)
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        [
+            ("schema_version", SCHEMA_VERSION),
+            ("source_size", str(source_size)),
+            ("source_mtime_ns", str(source_mtime_ns)),
+        ],
+    )
+
+
+def build_inverted_index(base_dir: Path, download_id: str) -> Optional[Path]:
+    """
+    Builds (or rebuilds) the inverted index for a download from its JSONL index.
+    The database is written to a temporary file and atomically moved into place,
+    so concurrent searches never observe a half-built index.
+
+    Args:
+        base_dir: Root directory containing 'index/' and 'content/'.
+        download_id: The download whose index should be built.
+
+    Returns:
+        Path to the index database, or None if the JSONL index does not exist.
+    """
+    abs_base_dir = base_dir.resolve()
+    index_file_path = abs_base_dir / "index" / f"{download_id}.jsonl"
+    if not index_file_path.is_file():
+        logger.warning(f"Cannot build inverted index, JSONL index missing: {index_file_path}")
+        return None
+
+    db_path = inverted_index_path(abs_base_dir, download_id)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    indexed = 0
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        term_ids: Dict[str, int] = {}
+        with conn:
+            for local_path, abs_path, content_md5 in _iter_indexable_records(
+                abs_base_dir, index_file_path
+            ):
+                try:
+                    if _index_document(conn, term_ids, local_path, abs_path, content_md5):
+                        indexed += 1
+                except Exception as e:
+                    logger.warning(f"Failed to index {abs_path}: {e}")
+            _write_meta(conn, index_file_path)
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    logger.info(
+        f"Built inverted index for '{download_id}': {indexed} documents, "
+        f"{len(term_ids)} terms -> {db_path}"
+    )
+    return db_path
+
+
+def update_inverted_index(base_dir: Path, download_id: str) -> Optional[Path]:
+    """
+    Brings an existing inverted index up to date after a recrawl.
+
+    Only documents whose `content_md5` changed are re-read and re-tokenized;
+    their old postings are dropped first. Documents no longer present in the
+    JSONL index are removed, new ones are added and byte-identical pages are
+    left untouched. The update is applied to a copy of the database which is
+    then atomically moved into place. Falls back to a full build when no
+    compatible index exists.
+
+    Args:
+        base_dir: Root directory containing 'index/' and 'content/'.
+        download_id: The download whose index should be refreshed.
+
+    Returns:
+        Path to the index database, or None if the JSONL index does not exist.
+    """
+    abs_base_dir = base_dir.resolve()
+    index_file_path = abs_base_dir / "index" / f"{download_id}.jsonl"
+    db_path = inverted_index_path(abs_base_dir, download_id)
+    if not index_file_path.is_file():
+        logger.warning(f"Cannot update inverted index, JSONL index missing: {index_file_path}")
+        return None
+    if not db_path.is_file():
+        return build_inverted_index(abs_base_dir, download_id)
+
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    shutil.copyfile(db_path, tmp_path)
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    conn = sqlite3.connect(tmp_path)
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        if meta.get("schema_version") != SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(
+                f"schema version {meta.get('schema_version')!r} != {SCHEMA_VERSION!r}"
+            )
+        existing = {
+            row[0]: tuple(row[1:])
+            for row in conn.execute(
+                "SELECT local_path, doc_id, mtime_ns, size, content_md5 FROM documents"
+            )
+        }
+        term_ids: Dict[str, int] = {}
+        seen: Set[str] = set()
+        with conn:
+            for local_path, abs_path, content_md5 in _iter_indexable_records(
+                abs_base_dir, index_file_path
+            ):
+                seen.add(local_path)
+                previous = existing.get(local_path)
+                if previous is not None:
+                    if _is_unchanged(previous, abs_path, content_md5):
+                        stats["unchanged"] += 1
+                        continue
+                    _remove_document(conn, previous[0])
+                try:
+                    if _index_document(conn, term_ids, local_path, abs_path, content_md5):
+                        stats["updated" if previous is not None else "added"] += 1
+                    elif previous is not None:
+                        stats["removed"] += 1
+                except Exception as e:
+                    logger.warning(f"Failed to re-index {abs_path}: {e}")
+
+            for local_path, previous in existing.items():
+                if local_path not in seen:
+                    _remove_document(conn, previous[0])
+                    stats["removed"] += 1
+
+            if stats["updated"] or stats["removed"]:
+                # Drop vocabulary entries that no longer have any postings
+                conn.execute(
+                    "DELETE FROM terms WHERE term_id NOT IN (SELECT DISTINCT term_id FROM postings)"
+                )
+            _write_meta(conn, index_file_path)
+    except sqlite3.DatabaseError as e:
+        conn.close()
+        tmp_path.unlink(missing_ok=True)
+        logger.warning(f"Existing inverted index for '{download_id}' unusable ({e}), rebuilding.")
+        return build_inverted_index(abs_base_dir, download_id)
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    logger.info(f"Updated inverted index for '{download_id}': {stats}")
+    return db_path
+
+
+def _open_fresh_index(abs_base_dir: Path, download_id: str) -> Optional[sqlite3.Connection]:
+    """Opens the index read-only if it exists and matches the current JSONL."""
+    db_path = inverted_index_path(abs_base_dir, download_id)
+    index_file_path = abs_base_dir / "index" / f"{download_id}.jsonl"
+    if not db_path.is_file() or not index_file_path.is_file():
+        return None
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        source_size, source_mtime_ns = _source_signature(index_file_path)
+        if (
+            meta.get("schema_version") != SCHEMA_VERSION
+            or meta.get("source_size") != str(source_size)
+            or meta.get("source_mtime_ns") != str(source_mtime_ns)
+        ):
+            logger.info(f"Inverted index for '{download_id}' is stale, ignoring it.")
+            conn.close()
+            return None
+    except sqlite3.Error as e:
+        logger.warning(f"Could not read inverted index {db_path}: {e}")
+        conn.close()
+        return None
+    return conn
+
+
+def _docs_containing(conn: sqlite3.Connection, token: str) -> Set[int]:
+    """Returns ids of documents with at least one term containing `token`."""
+    rows = conn.execute(
+        """
+        SELECT DISTINCT p.doc_id
+        FROM terms t JOIN postings p ON p.term_id = t.term_id
+        WHERE instr(t.term, ?) > 0
+        """,
+        (token,),
+    )
+    return {row[0] for row in rows}
+
+
+def find_candidate_paths(
+    base_dir: Path, download_id: str, keywords: List[str]
+) -> Optional[Tuple[Set[str], bool]]:
+    """
+    Answers the keyword scan from the inverted index.
+
+    Args:
+        base_dir: Root directory containing 'index/' and 'content/'.
+        download_id: The download to search.
+        keywords: Keywords that must all be present (case-insensitive).
+
+    Returns:
+        None if no fresh index is available (caller should scan files), else a
+        tuple (local_paths, exact). `local_paths` are the relative paths stored
+        in the JSONL index. When `exact` is False, the set is a superset that
+        must be confirmed by scanning the files.
+    """
+    lowered_keywords = [kw.lower() for kw in keywords if kw and kw.strip()]
+    if not lowered_keywords:
+        return set(), True
+
+    abs_base_dir = base_dir.resolve()
+    try:
+        conn = _open_fresh_index(abs_base_dir, download_id)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not open inverted index for '{download_id}': {e}")
+        return None
+    if conn is None:
+        return None
+
+    exact = True
+    try:
+        doc_ids: Optional[Set[int]] = None
+        for keyword in lowered_keywords:
+            tokens = TOKEN_PATTERN.findall(keyword)
+            if not tokens:
+                # Pure punctuation cannot be answered from a \w+ vocabulary.
+                return None
+            if len(tokens) > 1 or tokens[0] != keyword:
+                exact = False
+            for token in tokens:
+                matches = _docs_containing(conn, token)
+                doc_ids = matches if doc_ids is None else doc_ids & matches
+                if not doc_ids:
+                    return set(), True
+
+        local_paths: Set[str] = set()
+        id_list = list(doc_ids or ())
+        # Chunk to stay below SQLite's bound-parameter limit.
+        for start in range(0, len(id_list), 500):
+            chunk = id_list[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT local_path FROM documents WHERE doc_id IN ({placeholders})",
+                chunk,
+            )
+            local_paths.update(row[0] for row in rows)
+        logger.debug(
+            f"Inverted index returned {len(local_paths)} candidates for {lowered_keywords} (exact={exact})"
+        )
+        return local_paths, exact
+    except sqlite3.Error as e:
+        logger.warning(f"Inverted index query failed for '{download_id}': {e}")
+        return None
+    finally:
+        conn.close()
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import tempfile
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base_dir = Path(tmpdir).resolve()
+        content_dir = base_dir / "content" / "demo" / "example.com"
+        content_dir.mkdir(parents=True)
+        (base_dir / "index").mkdir()
+
+        pages = {
+            "a.html": "<html><body><p>Use the field validator decorator.</p></body></html>",
+            "b.html": "<html><body><p>Async gather example.</p></body></html>",
+        }
+        with (base_dir / "index" / "demo.jsonl").open("w", encoding="utf-8") as f:
+            for name, html in pages.items():
+                (content_dir / name).write_text(html, encoding="utf-8")
+                f.write(
+                    json.dumps(
+                        {
+                            "original_url": f"http://example.com/{name}",
+                            "canonical_url": f"http://example.com/{name}",
+                            "local_path": f"content/demo/example.com/{name}",
+                            "fetch_status": "success",
+                        }
+                    )
+                    + "\n"
+                )
+
+        build_inverted_index(base_dir, "demo")
+        result = find_candidate_paths(base_dir, "demo", ["valid"])
+        print(f"'valid' -> {result}")
+        assert result == ({"content/demo/example.com/a.html"}, True)
+        result = find_candidate_paths(base_dir, "demo", ["field validator"])
+        print(f"'field validator' -> {result}")
+        assert result == ({"content/demo/example.com/a.html"}, False)
+        assert find_candidate_paths(base_dir, "demo", ["missing"]) == (set(), True)
+
+    print("\n------------------------------------")
+    print("✓ Inverted index examples passed successfully.")
+    print("------------------------------------")
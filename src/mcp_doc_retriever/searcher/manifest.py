@@ -0,0 +1,335 @@
+"""
+Module: manifest.py
+
+Description:
+A compiled, pre-validated list of the searchable pages of a download, so that
+`perform_search` does not have to re-parse and re-check the whole JSONL index
+on every query.
+
+Reading the JSONL for a search means parsing every line into an `IndexRecord`,
+keeping the latest searchable record per URL, and checking each path (inside
+the base directory, page exists, searchable suffix). `collect_searchable_records`
+does exactly that; `build_manifest` runs it once, when a download completes,
+and stores the result as `index/<download_id>.manifest.sqlite` with one row
+per page: (local_path, path, original_url, canonical_url, size, mtime_ns,
+content_md5, fetch_status). `path` is the validated, resolved location
+relative to the base directory.
+
+Like the inverted index, the manifest records the size and mtime of the JSONL
+it was built from (and the base directory it was validated against).
+`load_manifest` returns None when they no longer match (e.g. a recrawl
+appended records), and the caller falls back to the JSONL. Page files are not
+re-checked on load; a page deleted by hand afterwards is skipped by the
+scanner when it cannot be read.
+
+Third-Party Documentation:
+- sqlite3: https://docs.python.org/3/library/sqlite3.html
+
+Sample Input/Output:
+  build_manifest(Path("./downloads"), "python_docs")
+  # -> Path("./downloads/index/python_docs.manifest.sqlite")
+  load_manifest(Path("./downloads"), "python_docs")[0]
+  # -> ManifestEntry(local_path='content/python_docs/docs.python.org/...-1a2b3c4d.html', ...)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import uuid
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from mcp_doc_retriever.downloader.compression import page_exists, page_stat
+from mcp_doc_retriever.downloader.models import IndexRecord
+from mcp_doc_retriever.searcher.helpers import (
+    SEARCHABLE_EXTENSIONS,
+    SEARCHABLE_FETCH_STATUSES,
+    is_allowed_path,
+)
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+MANIFEST_DB_SUFFIX = ".manifest.sqlite"
+SCHEMA_VERSION = "1"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    local_path TEXT NOT NULL,
+    path TEXT NOT NULL,
+    original_url TEXT NOT NULL,
+    canonical_url TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    content_md5 TEXT,
+    fetch_status TEXT NOT NULL
+);
+"""
+
+
+class ManifestEntry(NamedTuple):
+    """One searchable page of a download."""
+
+    local_path: str  # As stored in the index record (relative to the base dir)
+    path: str  # Validated, resolved location relative to the base dir
+    original_url: str
+    canonical_url: str
+    size: Optional[int]
+    mtime_ns: Optional[int]
+    content_md5: Optional[str]
+    fetch_status: str
+
+    @classmethod
+    def from_record(
+        cls,
+        abs_base_dir: Path,
+        abs_path: Path,
+        record: IndexRecord,
+        size: Optional[int] = None,
+        mtime_ns: Optional[int] = None,
+    ) -> "ManifestEntry":
+        """Entry for a validated record whose page is at `abs_path`."""
+        return cls(
+            record.local_path,
+            str(abs_path.relative_to(abs_base_dir)),
+            record.original_url,
+            record.canonical_url,
+            size,
+            mtime_ns,
+            record.content_md5,
+            record.fetch_status,
+        )
+
+
+def manifest_path(base_dir: Path, download_id: str) -> Path:
+    """Returns the location of the manifest database for a download."""
+    return base_dir / "index" / f"{download_id}{MANIFEST_DB_SUFFIX}"
+
+
+def collect_searchable_records(
+    abs_base_dir: Path, index_file_path: Path
+) -> Tuple[List[Tuple[Path, IndexRecord]], int, int]:
+    """
+    Reads a JSONL index and returns the current searchable copy of each URL
+    as (absolute path, record) pairs, in index order, with the number of
+    valid and skipped records. A later record for a URL supersedes earlier
+    ones (a re-crawl may store a page at a new path, e.g. content-addressed
+    blobs); a 'duplicate' record removes it.
+
+    Raises:
+        FileNotFoundError: If the index cannot be opened.
+        ValueError: If the index cannot be processed.
+    """
+    allowed_base_dirs = [abs_base_dir]
+    latest_by_url: Dict[str, Tuple[Path, IndexRecord]] = {}
+    processed_lines = 0
+    skipped_records = 0
+
+    try:
+        with index_file_path.open("r", encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                line_num = i + 1
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    record_data = json.loads(line)
+                    record = IndexRecord(**record_data)
+                    processed_lines += 1
+
+                    if record.fetch_status == "duplicate":
+                        latest_by_url.pop(record.canonical_url, None)
+                        skipped_records += 1
+                    elif record.fetch_status in SEARCHABLE_FETCH_STATUSES and record.local_path:
+                        # --- Reconstruct absolute path from relative path ---
+                        try:
+                            # record.local_path is expected to be relative to abs_base_dir
+                            abs_local_file_path = abs_base_dir.joinpath(record.local_path).resolve(strict=False)
+                            logger.debug(f"Index line {line_num}: Reconstructed absolute path: {abs_local_file_path} from relative: {record.local_path}")
+                        except Exception as path_recon_err:
+                            logger.warning(
+                                f"Index line {line_num}: Failed to reconstruct absolute path from relative '{record.local_path}' and base '{abs_base_dir}': {path_recon_err}. Skipping."
+                            )
+                            skipped_records += 1
+                            continue
+
+                        # --- Validate the reconstructed absolute path ---
+                        # Check 1: Is it within the allowed base directory?
+                        if not is_allowed_path(abs_local_file_path, allowed_base_dirs):
+                            logger.warning(
+                                f"Index line {line_num}: Path '{abs_local_file_path}' is outside allowed base '{abs_base_dir}'. Skipping."
+                            )
+                            skipped_records += 1
+                            continue
+                        # Check 2: Does the file actually exist?
+                        if not page_exists(abs_local_file_path):
+                            logger.warning(
+                                f"Index line {line_num}: Reconstructed file path not found: {abs_local_file_path}. Skipping."
+                            )
+                            skipped_records += 1
+                            continue
+                        # Check 3: Is it a searchable extension?
+                        if abs_local_file_path.suffix.lower() not in SEARCHABLE_EXTENSIONS:
+                            logger.debug(
+                                f"Index line {line_num}: Skipping non-searchable file type: {abs_local_file_path}"
+                            )
+                            skipped_records += 1
+                            continue
+
+                        # If all checks pass, remember it as the URL's current copy
+                        latest_by_url[record.canonical_url] = (abs_local_file_path, record)
+                    else:
+                        skipped_records += 1
+
+                except json.JSONDecodeError:
+                    logger.warning(
+                        f"Skipping invalid JSON line {line_num} in index: {line[:100]}..."
+                    )
+                    skipped_records += 1
+                except Exception as e:
+                    logger.warning(
+                        f"Skipping invalid record on line {line_num}: {e} - Data: {line[:100]}...",
+                        exc_info=False,
+                    )
+                    skipped_records += 1
+
+    except FileNotFoundError as e:  # Catch specifically if open() fails
+        logger.error(f"Index file disappeared or cannot be opened: {index_file_path}: {e}", exc_info=True)
+        raise
+    except Exception as e:  # Catch other processing errors
+        logger.error(
+            f"Failed to open or process index file {index_file_path}: {e}",
+            exc_info=True,
+        )
+        raise ValueError(f"Error processing index file {index_file_path}") from e
+
+    return list(latest_by_url.values()), processed_lines, skipped_records
+
+
+def _source_meta(abs_base_dir: Path, index_file_path: Path) -> Dict[str, str]:
+    """The JSONL signature and base directory a manifest is valid for."""
+    stat = index_file_path.stat()
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "base_dir": str(abs_base_dir),
+        "source_size": str(stat.st_size),
+        "source_mtime_ns": str(stat.st_mtime_ns),
+    }
+
+
+def build_manifest(base_dir: Path, download_id: str) -> Optional[Path]:
+    """
+    Builds (or rebuilds) the manifest for a download from its JSONL index.
+    The database is written to a temporary file and atomically moved into
+    place, so concurrent searches never observe a half-built manifest.
+
+    Args:
+        base_dir: Root directory containing 'index/' and 'content/'.
+        download_id: The download whose manifest should be built.
+
+    Returns:
+        Path to the manifest database, or None if the JSONL index does not exist.
+    """
+    abs_base_dir = base_dir.resolve()
+    index_file_path = abs_base_dir / "index" / f"{download_id}.jsonl"
+    if not index_file_path.is_file():
+        logger.warning(f"Cannot build manifest, JSONL index missing: {index_file_path}")
+        return None
+
+    # Signature taken first: records appended while building make it stale
+    meta = _source_meta(abs_base_dir, index_file_path)
+    records, _, _ = collect_searchable_records(abs_base_dir, index_file_path)
+    rows = []
+    for abs_path, record in records:
+        try:
+            mtime_ns, size = page_stat(abs_path)
+        except OSError:
+            mtime_ns, size = None, None
+        rows.append(ManifestEntry.from_record(abs_base_dir, abs_path, record, size, mtime_ns))
+
+    db_path = manifest_path(abs_base_dir, download_id)
+    tmp_path = db_path.with_name(f"{db_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        with conn:
+            conn.executemany("INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", meta.items())
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    logger.info(f"Built manifest for '{download_id}': {len(rows)} searchable pages -> {db_path}")
+    return db_path
+
+
+def load_manifest(base_dir: Path, download_id: str) -> Optional[List[ManifestEntry]]:
+    """
+    Returns the searchable pages of a download from its manifest, or None if
+    there is no manifest or it does not match the current JSONL index.
+    """
+    abs_base_dir = base_dir.resolve()
+    db_path = manifest_path(abs_base_dir, download_id)
+    index_file_path = abs_base_dir / "index" / f"{download_id}.jsonl"
+    if not db_path.is_file() or not index_file_path.is_file():
+        return None
+
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not open manifest {db_path}: {e}")
+        return None
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        if meta != _source_meta(abs_base_dir, index_file_path):
+            logger.info(f"Manifest for '{download_id}' is stale, ignoring it.")
+            return None
+        return [ManifestEntry(*row) for row in conn.execute("SELECT * FROM pages ORDER BY rowid")]
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Could not read manifest {db_path}: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+# --- Standalone Execution / Example ---
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        (base / "index").mkdir()
+        content = base / "content" / "demo" / "docs.example.com"
+        content.mkdir(parents=True)
+        with (base / "index" / "demo.jsonl").open("w") as f:
+            for i in range(5000):
+                local_path = f"content/demo/docs.example.com/page{i}.html"
+                (base / local_path).write_text(f"<p>Page {i}</p>")
+                url = f"https://docs.example.com/page{i}"
+                f.write(json.dumps({"original_url": url, "canonical_url": url, "local_path": local_path, "fetch_status": "success"}) + "\n")
+
+        start = time.monotonic()
+        records, _, _ = collect_searchable_records(base.resolve(), base / "index" / "demo.jsonl")
+        from_jsonl = time.monotonic() - start
+        build_manifest(base, "demo")
+        start = time.monotonic()
+        entries = load_manifest(base, "demo")
+        from_manifest = time.monotonic() - start
+        assert [e.local_path for e in entries] == [r.local_path for _, r in records]
+        print(f"{len(entries)} pages: JSONL {from_jsonl * 1000:.0f} ms, manifest {from_manifest * 1000:.0f} ms")
+
+        with (base / "index" / "demo.jsonl").open("a") as f:
+            f.write("\n")
+        assert load_manifest(base, "demo") is None  # JSONL changed -> stale
+
+    print("\n------------------------------------")
+    print("✓ Manifest examples passed successfully.")
+    print("------------------------------------")
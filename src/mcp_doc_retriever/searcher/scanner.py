@@ -5,27 +5,210 @@ Description:
 Handles the first phase of the search: iterating through file paths provided
 (typically from the index), reading file content safely, extracting plain text,
 and checking if the text contains all specified keywords.
+
+Pages are read and parsed through the document cache (doc_cache.py), so a
+page the scan matched is not parsed again to extract snippets from it.
+
+Text extraction parses every file and is CPU-bound. With `processes > 1`,
+`iter_scan_files_for_keywords` shards the file list across a process pool
+(started once and reused by later searches, see `shutdown_scan_pool`) and
+yields matches as shards complete, still in file-list order. A caller that
+stops iterating (e.g. once it has enough results) cancels the shards not yet
+started.
 """
 
 import logging
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List
+from typing import Deque, Iterator, List, Optional
 
 # Use relative imports for helpers and utils within the package
-from mcp_doc_retriever.searcher.helpers import is_allowed_path, is_file_size_ok, read_file_with_fallback
-
-from mcp_doc_retriever.searcher.helpers import (
-    # contains_all_keywords moved to utils
-    extract_text_from_html_content,
-)
+from mcp_doc_retriever.searcher.helpers import is_allowed_path, is_file_size_ok
+from mcp_doc_retriever.searcher.doc_cache import configure_document_cache, get_document_cache
 from mcp_doc_retriever.utils import contains_all_keywords
 logger = logging.getLogger(__name__)
 
+# Files per job sent to a scan process, and jobs queued per process
+SCAN_SHARD_SIZE = 32
+SHARDS_IN_FLIGHT_PER_PROCESS = 2
+
+_scan_pool: Optional[ProcessPoolExecutor] = None
+_scan_pool_processes = 0
+_scan_pool_lock = threading.Lock()
+
+
+def _scan_file(
+    file_path: Path, lowered_keywords: List[str], allowed_base_dirs: List[Path]
+) -> Optional[Path]:
+    """Returns the resolved path if the file's text contains all keywords, else None."""
+    # Security Check 1: Path traversal / allowed directory
+    # Resolve path before checking against allowed bases
+    # Use strict=False as file might be checked before creation in some edge cases,
+    # but existence is checked later by is_file_size_ok -> is_file()
+    resolved_path = file_path.resolve(strict=False)
+    if not is_allowed_path(resolved_path, allowed_base_dirs):
+        logger.warning(
+            f"Skipping file outside allowed directories: {resolved_path}"
+        )
+        return None
+
+    # Security Check 2: File size and existence/type using resolved path
+    if not is_file_size_ok(resolved_path):
+        # is_file_size_ok logs details if failed (incl. not found)
+        return None
+
+    # Read File Content using resolved path; the parsed page is cached and
+    # reused by the extraction phase and later searches
+    document = get_document_cache().get(resolved_path)
+    if document is None:
+        # read_file_with_fallback logs details if failed
+        return None
+
+    # Extract Text (plain text of title and main content, see helpers)
+    try:
+        text = document.text()
+    except Exception as e:
+        logger.error(
+            f"Error during text extraction for {resolved_path}: {e}", exc_info=True
+        )
+        text = None  # Treat extraction error as no text found
+
+    if text is None:
+        logger.warning(
+            f"Skipping file due to text extraction errors: {resolved_path}"
+        )
+        document.drop_soup()
+        return None
+
+    # Keyword Check (case-insensitive check via contains_all_keywords in utils)
+    # Requires utils.contains_all_keywords(text: Optional[str], keywords: List[str]) -> bool
+    try:
+        if contains_all_keywords(text, lowered_keywords):
+            logger.debug(f"Keywords found in: {resolved_path}")
+            return resolved_path
+    except Exception as e:
+        logger.error(
+            f"Error during keyword check for {resolved_path}: {e}", exc_info=True
+        )
+    # Not a candidate: only its (cached) text is needed by later scans
+    document.drop_soup()
+    return None
+
+
+def _scan_shard(
+    file_paths: List[Path], lowered_keywords: List[str], allowed_base_dirs: List[Path]
+) -> List[Path]:
+    """Worker-process job: the matching files of one shard, in order."""
+    return [
+        match
+        for match in (_scan_file(p, lowered_keywords, allowed_base_dirs) for p in file_paths)
+        if match is not None
+    ]
+
+
+def _get_scan_pool(processes: int) -> ProcessPoolExecutor:
+    global _scan_pool, _scan_pool_processes
+    with _scan_pool_lock:
+        if _scan_pool is not None and _scan_pool_processes != processes:
+            _scan_pool.shutdown(wait=False, cancel_futures=True)
+            _scan_pool = None
+        if _scan_pool is None:
+            # spawn: the API process runs an event loop and thread pools.
+            # Workers keep their own document caches and share this one's
+            # budget, so the pool as a whole stays within SEARCH_DOC_CACHE_MB.
+            _scan_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=configure_document_cache,
+                initargs=(get_document_cache().max_bytes // processes,),
+            )
+            _scan_pool_processes = processes
+            logger.info(f"Keyword scan pool started with {processes} processes")
+        return _scan_pool
+
+
+def _discard_scan_pool(pool: ProcessPoolExecutor) -> None:
+    global _scan_pool
+    with _scan_pool_lock:
+        if _scan_pool is pool:
+            _scan_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_scan_pool() -> None:
+    """Stops the worker processes of the parallel scan (e.g. at API shutdown)."""
+    global _scan_pool
+    with _scan_pool_lock:
+        pool, _scan_pool = _scan_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+        logger.info("Keyword scan pool closed.")
+
+
+def iter_scan_files_for_keywords(
+    file_paths: List[Path],
+    scan_keywords: List[str],
+    allowed_base_dirs: List[Path],
+    processes: int = 0,
+) -> Iterator[Path]:
+    """
+    Yields the (resolved) paths of files whose text contains all keywords, in
+    the order of `file_paths`. With `processes > 1` the files are scanned in
+    shards of SCAN_SHARD_SIZE by a process pool, a bounded number of shards
+    ahead of the consumer. Closing the iterator cancels the shards not yet
+    started. If a worker process dies, the remaining files are scanned here.
+    """
+    lowered_keywords = [kw.lower() for kw in scan_keywords if kw and kw.strip()]
+    if not lowered_keywords:
+        logger.warning("Keyword scan skipped: No valid non-empty keywords.")
+        return
+    file_paths = list(file_paths)
+    if processes <= 1 or len(file_paths) <= SCAN_SHARD_SIZE:
+        for file_path in file_paths:
+            match = _scan_file(file_path, lowered_keywords, allowed_base_dirs)
+            if match is not None:
+                yield match
+        return
+
+    pool = _get_scan_pool(processes)
+    shards = [
+        file_paths[i : i + SCAN_SHARD_SIZE] for i in range(0, len(file_paths), SCAN_SHARD_SIZE)
+    ]
+    pending: Deque[Future] = deque()
+    next_shard = 0
+    try:
+        while next_shard < len(shards) or pending:
+            while next_shard < len(shards) and len(pending) < processes * SHARDS_IN_FLIGHT_PER_PROCESS:
+                pending.append(
+                    pool.submit(_scan_shard, shards[next_shard], lowered_keywords, allowed_base_dirs)
+                )
+                next_shard += 1
+            try:
+                matches = pending[0].result()
+            except BrokenProcessPool:
+                logger.warning("Keyword scan worker died; scanning the remaining files in this thread")
+                _discard_scan_pool(pool)
+                done = next_shard - len(pending)
+                for shard in shards[done:]:
+                    yield from _scan_shard(shard, lowered_keywords, allowed_base_dirs)
+                pending.clear()
+                return
+            pending.popleft()
+            yield from matches
+    finally:
+        for future in pending:
+            future.cancel()
+
 
 def scan_files_for_keywords(
     file_paths: List[Path],  # Expect list of Path objects
     scan_keywords: List[str],
     allowed_base_dirs: List[Path],  # Expect list of Path objects
+    processes: int = 0,
 ) -> List[Path]:
     """
     Scans a list of files, checking if their text content contains all specified keywords.
@@ -36,76 +219,21 @@ def scan_files_for_keywords(
         file_paths: List of Path objects representing files to scan.
         scan_keywords: List of keywords that must all be present (case-insensitive).
         allowed_base_dirs: List of allowed base directory Paths for security.
+        processes: Scan in a pool of this many processes (0/1 = in this thread).
 
     Returns:
         List of Path objects for files containing all keywords (using resolved paths).
     """
-    candidate_paths: List[Path] = []
     if not scan_keywords:
         logger.warning("Keyword scan skipped: No scan_keywords provided.")
-        return candidate_paths
-    # Prepare keywords once (lowercase, filter empty)
-    lowered_keywords = [kw.lower() for kw in scan_keywords if kw and kw.strip()]
-    if not lowered_keywords:
-        logger.warning("Keyword scan skipped: No valid non-empty keywords.")
-        return candidate_paths
-
-    logger.info(f"Scanning {len(file_paths)} files for keywords: {lowered_keywords}")
-    files_scanned = 0
-    for file_path in file_paths:
-        # Security Check 1: Path traversal / allowed directory
-        # Resolve path before checking against allowed bases
-        # Use strict=False as file might be checked before creation in some edge cases,
-        # but existence is checked later by is_file_size_ok -> is_file()
-        resolved_path = file_path.resolve(strict=False)
-        if not is_allowed_path(resolved_path, allowed_base_dirs):
-            logger.warning(
-                f"Skipping file outside allowed directories: {resolved_path}"
-            )
-            continue
-
-        # Security Check 2: File size and existence/type using resolved path
-        if not is_file_size_ok(resolved_path):
-            # is_file_size_ok logs details if failed (incl. not found)
-            continue
-
-        # Read File Content using resolved path
-        content = read_file_with_fallback(resolved_path)
-        if content is None:
-            # read_file_with_fallback logs details if failed
-            continue
-
-        # Extract Text (assuming a basic text extraction utility from utils)
-        # Requires utils.extract_text_from_html_content(content: str) -> Optional[str]
-        try:
-            text = extract_text_from_html_content(content)
-        except Exception as e:
-            logger.error(
-                f"Error during text extraction for {resolved_path}: {e}", exc_info=True
-            )
-            text = None  # Treat extraction error as no text found
-
-        if text is None:
-            logger.warning(
-                f"Skipping file due to text extraction errors: {resolved_path}"
-            )
-            continue
-
-        # Keyword Check (case-insensitive check via contains_all_keywords in utils)
-        # Requires utils.contains_all_keywords(text: Optional[str], keywords: List[str]) -> bool
-        try:
-            if contains_all_keywords(text, lowered_keywords):
-                logger.debug(f"Keywords found in: {resolved_path}")
-                candidate_paths.append(resolved_path)  # Add the resolved path
-        except Exception as e:
-            logger.error(
-                f"Error during keyword check for {resolved_path}: {e}", exc_info=True
-            )
-
-        files_scanned += 1
+        return []
 
+    logger.info(f"Scanning {len(file_paths)} files for keywords: {scan_keywords}")
+    candidate_paths = list(
+        iter_scan_files_for_keywords(file_paths, scan_keywords, allowed_base_dirs, processes)
+    )
     logger.info(
-        f"Keyword scan complete. Scanned {files_scanned} valid/accessible files. "
+        f"Keyword scan complete. Scanned {len(file_paths)} files. "
         f"Found {len(candidate_paths)} candidate files."
     )
     return candidate_paths
@@ -11,18 +11,22 @@ for keywords, and extracting text snippets based on CSS selectors.
 
 # --- Module Header ---
 # Description:
-#   This module provides the main entry point for the basic search functionality,
-#   `perform_search`. It acts as an orchestrator, utilizing other modules within
+#   This module provides the main entry points for the basic search functionality,
+#   `perform_search` and its streaming form `iter_search`. It acts as an orchestrator, utilizing other modules within
 #   the `searcher` package (`scanner`, `basic_extractor`) to execute a
 #   two-phase search based on a SearchRequest object:
-#   1. **Indexing & Filtering:** Reads the `.jsonl` index file corresponding to the
-#      provided `download_id` within the `base_download_dir`. It identifies
-#      candidate file paths (which use the flat, hashed structure for web content)
-#      that were successfully downloaded and match searchable extensions. It performs
+#   1. **Indexing & Filtering:** Loads the pre-validated manifest of the download
+#      (`manifest.load_manifest`) when it matches the current `.jsonl` index, and
+#      otherwise reads the `.jsonl` index file corresponding to the provided
+#      `download_id` within the `base_download_dir`. It identifies candidate file
+#      paths (which use the flat, hashed structure for web content) that were
+#      successfully downloaded and match searchable extensions. It performs
 #      checks to ensure indexed files exist and are within the allowed base directory.
-#   2. **Keyword Scanning:** Delegates to `scanner.scan_files_for_keywords` to quickly
-#      check the text content of candidate files for the presence of all keywords
-#      specified in `query.scan_keywords`.
+#   2. **Keyword Scanning:** Answers the keyword check from the persistent inverted
+#      index (`inverted_index.find_candidate_paths`) when a fresh one exists, and
+#      otherwise delegates to `scanner.iter_scan_files_for_keywords` (optionally
+#      sharded across a process pool) to check the text content of candidate
+#      files for all keywords in `query.scan_keywords`.
 #   3. **Snippet Extraction:** For files that pass the keyword scan, it delegates to
 #      `basic_extractor.extract_text_with_selector` to pull specific text content
 #      using the CSS selector specified in `query.extract_selector`.
@@ -31,7 +35,9 @@ for keywords, and extracting text snippets based on CSS selectors.
 #      extraction keywords (using `utils.contains_all_keywords`).
 #   5. **Formatting & Limiting:** Returns a list of `SearchResultItem` objects containing the
 #      found content snippets and associated metadata (URL, local path, etc.),
-#      limited by `query.limit`.
+#      limited by `query.limit`. `iter_search` yields the same items one by one
+#      as they are found (used to stream API responses); scanning and
+#      extraction stop once `query.limit` results are produced.
 #
 # Third-Party Documentation:
 #   - Pydantic (Used for models): https://docs.pydantic.dev/
@@ -39,9 +45,10 @@ for keywords, and extracting text snippets based on CSS selectors.
 #
 # Internal Module Dependencies:
 #   - mcp_doc_retriever.models (IndexRecord, SearchResultItem, SearchRequest)
-#   - .scanner (scan_files_for_keywords)
+#   - .scanner (iter_scan_files_for_keywords)
+#   - .inverted_index (find_candidate_paths)
+#   - .manifest (load_manifest, collect_searchable_records)
 #   - .basic_extractor (extract_text_with_selector)
-#   - .helpers (is_allowed_path)
 #   - mcp_doc_retriever.utils (contains_all_keywords - potentially)
 #
 # Sample Input (Conceptual):
@@ -73,12 +80,10 @@ for keywords, and extracting text snippets based on CSS selectors.
 # --- End Module Header ---
 
 import logging
-import json
 import sys
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Dict, Iterator, List, Optional, Tuple
 from pydantic import BaseModel, Field, field_validator
-from typing import Any, Dict # List, Optional already imported
 from mcp_doc_retriever.searcher.helpers import ContentBlock
 from datetime import datetime, timezone  # Ensure timezone is imported if used
 
@@ -127,8 +132,13 @@ class SearchResultItem(BaseModel):
 
 # Use relative imports for models, helpers, and sub-modules
 from mcp_doc_retriever.downloader.models import IndexRecord
-from mcp_doc_retriever.searcher.helpers import is_allowed_path
-from mcp_doc_retriever.searcher.scanner import scan_files_for_keywords
+from mcp_doc_retriever.searcher.manifest import (
+    ManifestEntry,
+    collect_searchable_records,
+    load_manifest,
+)
+from mcp_doc_retriever.searcher.scanner import iter_scan_files_for_keywords
+from mcp_doc_retriever.searcher.inverted_index import find_candidate_paths
 from mcp_doc_retriever.searcher.basic_extractor import extract_text_with_selector
 
 # Import contains_all_keywords directly if needed for extract_keywords filtering
@@ -146,25 +156,32 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-# --- Constants ---
-SEARCHABLE_EXTENSIONS = {".html", ".htm", ".md", ".rst", ".txt", ".json", ".xml"}
-
-
-# --- Main Search Function (Corrected Signature and Variable Name) ---
-def perform_search(
-    query: SearchRequest,  # Accept the SearchRequest object
-    base_download_dir: Path,  # Base directory containing index/ and content/
-) -> List[SearchResultItem]:
+# --- Main Search Functions ---
+def iter_search(
+    query: SearchRequest,
+    base_download_dir: Path,
+    scan_processes: int = 0,
+) -> Iterator[SearchResultItem]:
     """
-    Orchestrates the search process based on the query object.
-    Uses the flat path structure generated by downloader.helpers.
+    Streaming search: loads the download's pages and sets up the keyword scan
+    right away (so a missing download or index raises here), then returns an
+    iterator that scans and extracts lazily and yields each result as soon as
+    it is found, in index order, stopping after `query.limit` results.
+    Closing the iterator early stops the scan. Uses the flat path structure
+    generated by downloader.helpers.
 
     Args:
         query: The SearchRequest object containing all search parameters.
         base_download_dir: The root directory containing 'index/' and 'content/'.
+        scan_processes: Processes for the keyword scan when the inverted index
+            cannot answer it (0/1 = scan in the calling thread).
 
     Returns:
-        A list of SearchResultItem objects matching the query.
+        An iterator of SearchResultItem objects matching the query.
+
+    Raises:
+        FileNotFoundError: If the base directory or the download's index is missing.
+        ValueError: If the base directory or the index cannot be processed.
     """
     # --- Input Validation (base_download_dir) ---
     if not isinstance(base_download_dir, Path):
@@ -195,10 +212,6 @@ def perform_search(
         f"Params: scan_kw={scan_keywords}, selector='{selector}', extract_kw={extract_keywords}, limit={limit}"
     )
 
-    # **** CORRECTED VARIABLE NAME INITIALIZATION ****
-    search_results: List[SearchResultItem] = []
-    # **** END CORRECTION ****
-
     index_file_path = abs_search_base_dir / "index" / f"{download_id}.jsonl"
     logger.info(f"Using index file: {index_file_path}")
 
@@ -208,200 +221,178 @@ def perform_search(
         # Raise FileNotFoundError instead of returning empty list
         raise FileNotFoundError(f"Index file not found: {index_file_path}")
 
-    url_map: Dict[Path, str] = {}
-    successful_records: List[IndexRecord] = []
-    processed_lines = 0
-    skipped_records = 0
-
-    try:
-        with index_file_path.open("r", encoding="utf-8") as f:
-            for i, line in enumerate(f):
-                line_num = i + 1
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    record_data = json.loads(line)
-                    record = IndexRecord(**record_data)
-                    processed_lines += 1
-
-                    if record.fetch_status == "success" and record.local_path:
-                        # --- Reconstruct absolute path from relative path ---
-                        try:
-                            # record.local_path is now expected to be relative to abs_search_base_dir
-                            relative_path_from_index = record.local_path
-                            # Join the absolute base dir with the relative path from the index
-                            abs_local_file_path = abs_search_base_dir.joinpath(relative_path_from_index).resolve(strict=False)
-                            logger.debug(f"Index line {line_num}: Reconstructed absolute path: {abs_local_file_path} from relative: {relative_path_from_index}")
-                        except Exception as path_recon_err:
-                             logger.warning(
-                                f"Index line {line_num}: Failed to reconstruct absolute path from relative '{record.local_path}' and base '{abs_search_base_dir}': {path_recon_err}. Skipping."
-                            )
-                             skipped_records += 1
-                             continue
-
-                        # --- Validate the reconstructed absolute path ---
-                        # Check 1: Is it within the allowed base directory?
-                        if not is_allowed_path(abs_local_file_path, allowed_base_dirs):
-                            logger.warning(
-                                f"Index line {line_num}: Path '{abs_local_file_path}' is outside allowed base '{abs_search_base_dir}'. Skipping."
-                            )
-                            skipped_records += 1
-                            continue
-                        # Check 2: Does the file actually exist?
-                        if not abs_local_file_path.is_file():
-                            logger.warning(
-                                f"Index line {line_num}: Reconstructed file path not found: {abs_local_file_path}. Skipping."
-                            )
-                            skipped_records += 1
-                            continue
-                        # Check 3: Is it a searchable extension?
-                        if abs_local_file_path.suffix.lower() not in SEARCHABLE_EXTENSIONS:
-                            logger.debug(
-                                f"Index line {line_num}: Skipping non-searchable file type: {abs_local_file_path}"
-                            )
-                            skipped_records += 1
-                            continue
-
-                        # If all checks pass, add the ABSOLUTE path to the map and the record to the list
-                        url_map[abs_local_file_path] = record.original_url
-                        # Store the original record (which contains the relative path)
-                        successful_records.append(record)
-                    else:
-                        skipped_records += 1
-
-                except json.JSONDecodeError:
-                    logger.warning(
-                        f"Skipping invalid JSON line {line_num} in index: {line[:100]}..."
-                    )
-                    skipped_records += 1
-                except Exception as e:
-                    logger.warning(
-                        f"Skipping invalid record on line {line_num}: {e} - Data: {line[:100]}...",
-                        exc_info=False,
-                    )
-                    skipped_records += 1
-
-    except FileNotFoundError as e: # Catch specifically if open() fails after check
-        logger.error(f"Index file disappeared or cannot be opened: {index_file_path}: {e}", exc_info=True)
-        raise # Re-raise FileNotFoundError to be caught by main.py as 404
-    except Exception as e: # Catch other processing errors
-        logger.error(
-            f"Failed to open or process index file {index_file_path}: {e}",
-            exc_info=True,
+    # The pre-validated manifest spares re-parsing and re-checking the JSONL;
+    # it is built when a download completes and ignored once the JSONL changes
+    entries = load_manifest(abs_search_base_dir, download_id)
+    if entries is not None:
+        processed_lines, skipped_records = len(entries), 0
+        logger.info(f"Loaded {len(entries)} searchable pages from the manifest.")
+    else:
+        # Raises FileNotFoundError (-> 404) or ValueError (-> 500) for main.py
+        searchable, processed_lines, skipped_records = collect_searchable_records(
+            abs_search_base_dir, index_file_path
         )
-        # Raise ValueError for internal processing errors, leading to 500 in main.py
-        raise ValueError(f"Error processing index file {index_file_path}") from e
-
-    # Get the list of ABSOLUTE paths to scan from the url_map keys
-    successful_paths = list(url_map.keys())
+        entries = [
+            ManifestEntry.from_record(abs_search_base_dir, abs_path, record)
+            for abs_path, record in searchable
+        ]
+
+    # The one lookup structure of the search: local_path (as stored in the
+    # index and the inverted index) -> (index position, page). Absolute paths
+    # are only built for the pages that are actually read.
+    pages: Dict[str, Tuple[int, ManifestEntry]] = {
+        entry.local_path: (i, entry) for i, entry in enumerate(entries)
+    }
     logger.info(
-        f"Index processed. Found {len(successful_paths)} successful file paths from {processed_lines} valid records ({skipped_records} skipped)."
+        f"Index processed. Found {len(pages)} successful file paths from {processed_lines} valid records ({skipped_records} skipped)."
     )
-    if not successful_paths:
-        return []
+    if not pages:
+        return iter(())
 
     # --- Phase 1: Scan Files for Keywords ---
     logger.info(f"Starting Phase 1: Keyword scan for {scan_keywords}...")
     try:
-        candidate_paths = scan_files_for_keywords(
-            successful_paths, scan_keywords, allowed_base_dirs=allowed_base_dirs
+        # Prefer the persistent inverted index; it narrows (or fully answers)
+        # the scan without reading every file. Falls back to a full scan.
+        local_paths_to_scan = list(pages)
+        scan: Optional[Iterator[Path]] = None
+        index_lookup = find_candidate_paths(
+            abs_search_base_dir, download_id, scan_keywords
         )
-        logger.info(f"Keyword scan identified {len(candidate_paths)} candidate files.")
+        if index_lookup is not None:
+            indexed_local_paths, exact = index_lookup
+            # Index order, so candidates (and results) come out in that order
+            local_paths_to_scan = sorted(
+                (p for p in indexed_local_paths if p in pages), key=lambda p: pages[p][0]
+            )
+            logger.info(
+                f"Inverted index returned {len(local_paths_to_scan)} candidate files (exact={exact})."
+            )
+        if index_lookup is not None and index_lookup[1]:
+            candidates: Iterator[str] = iter(local_paths_to_scan)
+        else:
+            # Scanned lazily: extraction pulls candidates as the scan finds
+            # them and stops the scan once `limit` results are found
+            local_path_by_abs_path = {
+                abs_search_base_dir / pages[p][1].path: p for p in local_paths_to_scan
+            }
+            logger.info(
+                f"Scanning {len(local_path_by_abs_path)} files"
+                + (f" with {scan_processes} processes" if scan_processes > 1 else "")
+            )
+            scan = iter_scan_files_for_keywords(
+                list(local_path_by_abs_path),
+                scan_keywords,
+                allowed_base_dirs=allowed_base_dirs,
+                processes=scan_processes,
+            )
+            candidates = (
+                local_path_by_abs_path[abs_path]
+                for abs_path in scan
+                if abs_path in local_path_by_abs_path
+            )
     except Exception as e:
         logger.error(f"Error during keyword scanning phase: {e}", exc_info=True)
-        return []
-
-    if not candidate_paths:
-        return []
-
-    # --- Phase 2: Extract Snippets ---
-    logger.info(
-        f"Starting Phase 2: Extracting basic snippets using selector '{selector}'..."
-    )
-    extraction_count = 0
-    candidate_path_set = set(candidate_paths)
-
-    # Iterate through the url_map which contains the absolute paths and original URLs
-    # candidate_path_set now contains absolute paths that passed the keyword scan
-    for abs_local_path, original_url in url_map.items():
-        if abs_local_path not in candidate_path_set:
-            continue
+        return iter(())
 
-        logger.debug(f"Processing matched file: {abs_local_path}")
+    # --- Phase 2: Extract Snippets (lazily, as the caller consumes results) ---
+    def extract_results() -> Iterator[SearchResultItem]:
+        logger.info(
+            f"Starting Phase 2: Extracting basic snippets using selector '{selector}'..."
+        )
+        extraction_count = 0
+        candidate_count = 0
+        # Candidates arrive in index order, the order results are produced in,
+        # so extraction (and a lazy scan) stops once `limit` results are found
+        # or the caller stops consuming
         try:
-            snippets = extract_text_with_selector(abs_local_path, selector)
-            if not snippets:
-                logger.debug(
-                    f"Selector '{selector}' found no content in {abs_local_path}"
-                )
-                continue
-
-            combined_snippet = " ... ".join(snippets)
-            passes_extract_filter = True
-            if extract_keywords:
-                passes_extract_filter = contains_all_keywords(
-                    combined_snippet, extract_keywords
-                )
-
-            if passes_extract_filter:
-                content_preview = combined_snippet[:500] + (
-                    "..." if len(combined_snippet) > 500 else ""
-                )
-
-                # --- Prepare data for SearchResultItem ---
-                # Find the original record to get the relative path stored in the index
-                original_record = next((r for r in successful_records if url_map.get(abs_search_base_dir.joinpath(r.local_path).resolve(strict=False)) == original_url), None)
-
-                if original_record and original_record.local_path:
-                    # Use the relative path stored in the found record
-                    relative_path_for_result = original_record.local_path
-                else:
-                    # Fallback: Try to calculate relative path from absolute path if record/path missing
-                    try:
-                        relative_path_for_result = str(abs_local_path.relative_to(abs_search_base_dir))
-                        logger.warning(f"Could not find original record or its relative path for {original_url}. Using calculated relative path: {relative_path_for_result}")
-                    except ValueError:
-                         # Ultimate fallback: Use the absolute path string if relative calculation fails
-                         relative_path_for_result = str(abs_local_path)
-                         logger.error(f"Could not find original record AND failed to calculate relative path for {original_url}. Using absolute path: {relative_path_for_result}")
-
-                # --- Append the result ---
-                search_results.append(
-                    SearchResultItem(
+            for local_path in candidates:
+                candidate_count += 1
+                entry = pages[local_path][1]
+                abs_local_path = abs_search_base_dir / entry.path
+                original_url = entry.original_url
+
+                logger.debug(f"Processing matched file: {abs_local_path}")
+                try:
+                    snippets = extract_text_with_selector(abs_local_path, selector)
+                    if not snippets:
+                        logger.debug(
+                            f"Selector '{selector}' found no content in {abs_local_path}"
+                        )
+                        continue
+
+                    combined_snippet = " ... ".join(snippets)
+                    passes_extract_filter = True
+                    if extract_keywords:
+                        passes_extract_filter = contains_all_keywords(
+                            combined_snippet, extract_keywords
+                        )
+
+                    if not passes_extract_filter:
+                        logger.debug(
+                            f"Snippets from {abs_local_path} did not contain all extract_keywords: {extract_keywords}"
+                        )
+                        continue
+                    content_preview = combined_snippet[:500] + (
+                        "..." if len(combined_snippet) > 500 else ""
+                    )
+                    result = SearchResultItem(
                         original_url=original_url,
-                        local_path=relative_path_for_result, # Use the determined relative path
+                        local_path=entry.local_path,  # Relative path as stored in the index
                         content_preview=content_preview,
                         match_details=combined_snippet,
                         selector_matched=selector,
                     )
-                )
-                # **** END CORRECTION ****
+                except FileNotFoundError:
+                    logger.error(f"File disappeared during extraction phase: {abs_local_path}")
+                    continue
+                except Exception as e:
+                    logger.error(
+                        f"Error extracting content from {abs_local_path} with selector '{selector}': {e}",
+                        exc_info=True,
+                    )
+                    continue
+
                 extraction_count += 1
-                logger.debug(f"Added result for {record.original_url}")
-            else:
-                logger.debug(
-                    f"Snippets from {abs_local_path} did not contain all extract_keywords: {extract_keywords}"
-                )
-
-        except FileNotFoundError:
-            logger.error(f"File disappeared during extraction phase: {abs_local_path}")
+                logger.debug(f"Added result for {original_url}")
+                yield result
+                if extraction_count >= limit:
+                    break
         except Exception as e:
-            logger.error(
-                f"Error extracting content from {abs_local_path} with selector '{selector}': {e}",
-                exc_info=True,
+            # Raised by the lazy keyword scan; extraction errors are handled above
+            logger.error(f"Error during keyword scanning phase: {e}", exc_info=True)
+        finally:
+            if scan is not None:
+                scan.close()  # Cancels scan shards not started yet
+            logger.info(
+                f"Basic snippet extraction complete. Examined {candidate_count} candidate files, "
+                f"produced {extraction_count} results (limit {limit})."
             )
 
-    logger.info(
-        f"Basic snippet extraction complete. Found {extraction_count} snippets matching the criteria."
-    )
+    return extract_results()
 
-    # **** CORRECTED VARIABLE NAME ****
-    logger.info(f"Total search results before limit: {len(search_results)}")
-    # Apply limit and return
-    return search_results[:limit]
-    # **** END CORRECTION ****
+
+def perform_search(
+    query: SearchRequest,  # Accept the SearchRequest object
+    base_download_dir: Path,  # Base directory containing index/ and content/
+    scan_processes: int = 0,
+) -> List[SearchResultItem]:
+    """
+    Orchestrates the search process based on the query object and returns
+    all results at once (see `iter_search`).
+
+    Args:
+        query: The SearchRequest object containing all search parameters.
+        base_download_dir: The root directory containing 'index/' and 'content/'.
+        scan_processes: Processes for the keyword scan when the inverted index
+            cannot answer it (0/1 = scan in the calling thread).
+
+    Returns:
+        A list of SearchResultItem objects matching the query (at most `query.limit`).
+    """
+    search_results = list(iter_search(query, base_download_dir, scan_processes))
+    logger.info(f"Total search results: {len(search_results)}")
+    return search_results
 
 
 # --- Standalone Execution / Example ---
@@ -27,16 +27,23 @@ Input: "http://192.168.1.1/admin"
 Output: True
 Input: "https://google.com"
 Output: False
+
+Function: is_url_private_or_internal_async() (inside a crawl, with a shared DNSCache)
+Input: "https://docs.python.org/3/library/", dns_cache
+Output: False (later URLs on docs.python.org reuse the cached resolution)
 """
 
+import asyncio
 import hashlib
 import ipaddress
 import logging
 import re
+from concurrent.futures import Executor
 from datetime import datetime, timezone
 import socket
+import time
 from pathlib import Path  # Keep if still needed by any remaining utils
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urlparse, urlunparse, unquote
 
 # Assuming config is importable for SSRF override flag
@@ -189,135 +196,290 @@ def generate_download_id(url: str) -> str:
 # --- Security Utilities ---
 
 
+# Hostnames/suffixes that never point at public documentation sites
+INTERNAL_HOST_SUFFIXES = (".localhost", ".local", ".internal", ".test", ".example", ".invalid")
+# Allowed when config.ALLOW_TEST_INTERNAL_URLS is True
+TEST_INTERNAL_HOSTS = {"host.docker.internal", "localhost", "127.0.0.1"}
+TEST_INTERNAL_IPS = {"172.17.0.1"}  # Example Docker bridge IP
+# How long DNSCache keeps successful / failed resolutions (seconds)
+DNS_CACHE_TTL = 300.0
+DNS_NEGATIVE_CACHE_TTL = 30.0
+
+
+def _ssrf_precheck(url: str) -> Tuple[Optional[bool], Optional[str], bool]:
+    """
+    Runs the SSRF checks that need no DNS lookup.
+
+    Returns:
+        (verdict, hostname, allow_test). A verdict of None means the hostname
+        has to be resolved and passed to `_ssrf_check_resolved_ips`.
+    """
+    if not isinstance(url, str):
+        logger.warning("SSRF check: Received non-string URL input.")
+        return True, None, False  # Treat non-strings as unsafe
+
+    parsed = urlparse(url)
+    hostname = (
+        parsed.hostname
+    )  # Extracts host part (e.g., 'example.com' from 'http://example.com:80')
+
+    if not hostname:
+        logger.debug(f"SSRF check: Blocked URL with no hostname: {url}")
+        return True, None, False  # URLs without a host are typically invalid or local file paths
+
+    host_lower = hostname.lower()
+    # --- Test URL Override Check ---
+    # Check if the configuration allows bypassing checks for specific test URLs
+    allow_test = bool(getattr(config, "ALLOW_TEST_INTERNAL_URLS", False))
+    if allow_test and host_lower in TEST_INTERNAL_HOSTS:
+        logger.debug(f"SSRF: Allowed test host (config override): {hostname}")
+        return False, hostname, allow_test
+
+    # Internal host patterns are blocked without resolving, unless a test
+    # override could still allow them through a test IP
+    if not allow_test and _is_internal_host_pattern(host_lower):
+        logger.debug(f"SSRF: Blocked internal host pattern: {hostname}")
+        return True, hostname, allow_test
+
+    return None, hostname, allow_test
+
+
+def _is_internal_host_pattern(host_lower: str) -> bool:
+    return host_lower == "localhost" or host_lower.endswith(INTERNAL_HOST_SUFFIXES)
+
+
+def _ip_literal(hostname: str) -> Optional[str]:
+    """Returns the hostname if it already is an IP address (no DNS needed)."""
+    try:
+        return str(ipaddress.ip_address(hostname))
+    except ValueError:
+        return None
+
+
+def _ssrf_check_resolved_ips(hostname: str, ips: List[str], allow_test: bool) -> bool:
+    """Decides whether a host is internal from the addresses it resolved to."""
+    if allow_test and any(ip in TEST_INTERNAL_IPS for ip in ips):
+        logger.debug(f"SSRF: Allowed test IP (config override): {ips}")
+        return False  # Allow if any resolved IP matches test list
+
+    if _is_internal_host_pattern(hostname.lower()):
+        logger.debug(f"SSRF: Blocked internal host pattern: {hostname}")
+        return True
+
+    if not ips:
+        # Should not happen if getaddrinfo succeeds, but as a safeguard
+        logger.debug(f"SSRF: Blocked due to no IP addresses resolved for {hostname}")
+        return True
+
+    # Check each resolved IP address
+    for ip_str in ips:
+        try:
+            ip = ipaddress.ip_address(ip_str)
+            # Check against various private/internal/reserved ranges
+            if (
+                ip.is_private  # e.g., 10.0.0.0/8, 172.16.0.0/12, 192.168.0.0/16
+                or ip.is_loopback  # e.g., 127.0.0.1, ::1
+                or ip.is_link_local  # e.g., 169.254.0.0/16, fe80::/10
+                or ip.is_reserved  # Other IANA reserved ranges
+                or ip.is_multicast  # Multicast addresses
+                or ip.is_unspecified  # e.g., 0.0.0.0, ::
+            ):
+                logger.debug(
+                    f"SSRF: Blocked private/reserved IP {ip_str} resolved for {hostname}"
+                )
+                return True  # Found an internal/private IP, block the URL
+        except ValueError:
+            # Handle cases where the resolved string is not a valid IP address
+            logger.warning(
+                f"SSRF: Invalid IP address format '{ip_str}' resolved for {hostname}. Blocking."
+            )
+            return True  # Treat invalid IP formats as unsafe
+
+    # If all resolved IPs are public and valid
+    logger.debug(f"SSRF: Allowed public host/IPs: {hostname} resolved to {ips}")
+    return False  # URL is considered safe
+
+
+def _unique_ips(addr_info) -> List[str]:
+    # Keeps resolver order while dropping duplicates (one entry per socket type)
+    return list(dict.fromkeys(info[4][0] for info in addr_info))
+
+
 def is_url_private_or_internal(url: str) -> bool:
     """
     Checks if a URL resolves to an internal, private, loopback, or reserved IP address,
     or if its hostname matches common internal patterns. Designed to mitigate SSRF risks.
     Allows specific test hostnames/IPs if `config.ALLOW_TEST_INTERNAL_URLS` is True.
 
+    This variant resolves with blocking `socket.getaddrinfo`; code running on an
+    event loop should use `is_url_private_or_internal_async` instead.
+
     Args:
         url: The URL string to check.
     Returns:
         True if the URL is considered internal/private/unsafe, False otherwise.
     """
     try:
-        if not isinstance(url, str):
-            logger.warning("SSRF check: Received non-string URL input.")
-            return True  # Treat non-strings as unsafe
+        verdict, hostname, allow_test = _ssrf_precheck(url)
+        if verdict is not None:
+            return verdict
 
-        parsed = urlparse(url)
-        hostname = (
-            parsed.hostname
-        )  # Extracts host part (e.g., 'example.com' from 'http://example.com:80')
-
-        if not hostname:
-            logger.debug(f"SSRF check: Blocked URL with no hostname: {url}")
-            return True  # URLs without a host are typically invalid or local file paths
-
-        # --- Test URL Override Check ---
-        # Check if the configuration allows bypassing checks for specific test URLs
-        allow_test = getattr(config, "ALLOW_TEST_INTERNAL_URLS", False)
-        if allow_test:
-            # Define hosts/IPs commonly used in testing environments
-            test_hosts = {"host.docker.internal", "localhost", "127.0.0.1"}
-            test_ips = {"172.17.0.1"}  # Example Docker bridge IP
-
-            host_lower = hostname.lower().split(":")[0]  # Get host part without port
-            if host_lower in test_hosts:
-                logger.debug(f"SSRF: Allowed test host (config override): {hostname}")
-                return False  # Allow if hostname matches test list
-
-            # Try resolving the hostname to see if it matches a test IP
+        # Resolve hostname to IP addresses
+        literal = _ip_literal(hostname)
+        if literal is not None:
+            ips = [literal]
+        else:
             try:
-                # Use getaddrinfo for potentially better IPv6 support than gethostbyname
-                addr_info = socket.getaddrinfo(hostname, None, family=socket.AF_UNSPEC)
-                resolved_ips = {info[4][0] for info in addr_info}  # Get unique IPs
-                if any(ip in test_ips for ip in resolved_ips):
-                    logger.debug(
-                        f"SSRF: Allowed test IP (config override): {resolved_ips}"
-                    )
-                    return False  # Allow if any resolved IP matches test list
-            except (socket.gaierror, ValueError):
-                # Ignore errors during test IP check (e.g., DNS resolution failure)
-                pass
+                # Use getaddrinfo for better IPv4/IPv6 handling
+                # Use SOCK_STREAM hint for TCP-based services usually targeted by SSRF
+                addr_info = socket.getaddrinfo(
+                    hostname, 0, family=socket.AF_UNSPEC, type=socket.SOCK_STREAM
+                )
+                ips = _unique_ips(addr_info)
+            except socket.gaierror:
+                # DNS resolution failed
+                logger.debug(f"SSRF: Blocked due to DNS resolution failure for {hostname}")
+                return True  # Treat resolution failures as potentially unsafe
             except Exception as e:
-                # Log unexpected errors during the test resolve check
-                logger.warning(f"SSRF test resolve check error for {hostname}: {e}")
-
-        # --- Standard Internal/Private Checks ---
-        host_lower = hostname.lower()
-        # Check for common internal/test TLDs and hostnames
-        if host_lower == "localhost" or host_lower.endswith(
-            (".localhost", ".local", ".internal", ".test", ".example", ".invalid")
-        ):
-            logger.debug(f"SSRF: Blocked internal host pattern: {hostname}")
-            return True
+                # Catch other potential errors during DNS lookup
+                logger.warning(f"SSRF DNS resolution error for {hostname}: {e}")
+                return True  # Treat other DNS errors as unsafe
 
-        # Resolve hostname to IP addresses
-        ips = []
+        return _ssrf_check_resolved_ips(hostname, ips, allow_test)
+
+    except Exception as e:
+        # Catch-all for any unexpected errors during the check process
+        logger.error(
+            f"Unexpected error during SSRF check for '{url}': {e}", exc_info=True
+        )
+        return True  # Default to blocking in case of unexpected errors
+
+
+class DNSCache:
+    """
+    Per-crawl hostname -> IP address cache with non-blocking resolution.
+
+    Lookups go through `loop.getaddrinfo` (run in the loop's executor), so
+    the event loop never waits on DNS. Concurrent lookups for the same host
+    share one in-flight resolution, successful results are kept for `ttl`
+    seconds and failures for `negative_ttl` seconds.
+
+    Args:
+        ttl: Seconds a successful resolution is reused.
+        negative_ttl: Seconds a failed resolution is remembered.
+        timeout: Optional upper bound for a single lookup, in seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DNS_CACHE_TTL,
+        negative_ttl: float = DNS_NEGATIVE_CACHE_TTL,
+        timeout: Optional[float] = None,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        # hostname -> (expires_at, ips or the resolution error)
+        self._entries: Dict[str, Tuple[float, Union[List[str], OSError]]] = {}
+        self._pending: Dict[str, "asyncio.Task[List[str]]"] = {}
+        self.lookups = 0  # Number of actual getaddrinfo calls (for logging/tests)
+
+    async def resolve(self, hostname: str) -> List[str]:
+        """
+        Returns the unique IP addresses of `hostname`.
+
+        Raises:
+            OSError: (usually socket.gaierror) if the host cannot be resolved.
+        """
+        key = hostname.lower()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if time.monotonic() < expires_at:
+                if isinstance(result, OSError):
+                    raise result
+                return result
+            del self._entries[key]
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup(key))
+            self._pending[key] = task
+            task.add_done_callback(lambda done, key=key: self._lookup_done(key, done))
+        # shield: a cancelled caller must not cancel the lookup others wait on
+        return await asyncio.shield(task)
+
+    async def _lookup(self, key: str) -> List[str]:
+        self.lookups += 1
+        loop = asyncio.get_running_loop()
         try:
-            # Use getaddrinfo for better IPv4/IPv6 handling
-            # Use SOCK_STREAM hint for TCP-based services usually targeted by SSRF
-            addr_info = socket.getaddrinfo(
-                hostname,
-                parsed.port or 0,
-                family=socket.AF_UNSPEC,
-                type=socket.SOCK_STREAM,
+            addr_info = await asyncio.wait_for(
+                loop.getaddrinfo(key, 0, family=socket.AF_UNSPEC, type=socket.SOCK_STREAM),
+                timeout=self.timeout,
             )
-            # Get unique IP addresses from the results
-            ips = list(set(info[4][0] for info in addr_info))
-            if not ips:
-                # Should not happen if getaddrinfo succeeds, but as a safeguard
-                logger.debug(
-                    f"SSRF: Blocked due to no IP addresses resolved for {hostname}"
-                )
-                return True
-        except socket.gaierror:
-            # DNS resolution failed
-            logger.debug(f"SSRF: Blocked due to DNS resolution failure for {hostname}")
-            return True  # Treat resolution failures as potentially unsafe
-        except Exception as e:
-            # Catch other potential errors during DNS lookup
-            logger.warning(f"SSRF DNS resolution error for {hostname}: {e}")
-            return True  # Treat other DNS errors as unsafe
-
-        # Check each resolved IP address
-        for ip_str in ips:
+        except asyncio.TimeoutError:
+            error = socket.gaierror(f"DNS lookup for {key} timed out")
+            self._entries[key] = (time.monotonic() + self.negative_ttl, error)
+            raise error
+        except OSError as e:
+            self._entries[key] = (time.monotonic() + self.negative_ttl, e)
+            raise
+        ips = _unique_ips(addr_info)
+        self._entries[key] = (time.monotonic() + self.ttl, ips)
+        return ips
+
+    def _lookup_done(self, key: str, task: "asyncio.Task[List[str]]") -> None:
+        self._pending.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Marks the error retrieved if every waiter went away
+
+
+async def is_url_private_or_internal_async(
+    url: str, dns_cache: Optional[DNSCache] = None
+) -> bool:
+    """
+    Async counterpart of `is_url_private_or_internal` for use on the event loop.
+
+    Same checks and result as the sync version, but hostnames are resolved
+    through `dns_cache` (a throwaway DNSCache when None), so all URLs on a
+    host share one lookup and the loop is never blocked on DNS.
+
+    Args:
+        url: The URL string to check.
+        dns_cache: Cache shared by all checks of one crawl.
+    Returns:
+        True if the URL is considered internal/private/unsafe, False otherwise.
+    """
+    try:
+        verdict, hostname, allow_test = _ssrf_precheck(url)
+        if verdict is not None:
+            return verdict
+
+        literal = _ip_literal(hostname)
+        if literal is not None:
+            ips = [literal]
+        else:
+            cache = dns_cache if dns_cache is not None else DNSCache()
             try:
-                ip = ipaddress.ip_address(ip_str)
-                # Check against various private/internal/reserved ranges
-                if (
-                    ip.is_private  # e.g., 10.0.0.0/8, 172.16.0.0/12, 192.168.0.0/16
-                    or ip.is_loopback  # e.g., 127.0.0.1, ::1
-                    or ip.is_link_local  # e.g., 169.254.0.0/16, fe80::/10
-                    or ip.is_reserved  # Other IANA reserved ranges
-                    or ip.is_multicast  # Multicast addresses
-                    or ip.is_unspecified  # e.g., 0.0.0.0, ::
-                ):
-                    logger.debug(
-                        f"SSRF: Blocked private/reserved IP {ip_str} resolved for {hostname}"
-                    )
-                    return True  # Found an internal/private IP, block the URL
-            except ValueError:
-                # Handle cases where the resolved string is not a valid IP address
-                logger.warning(
-                    f"SSRF: Invalid IP address format '{ip_str}' resolved for {hostname}. Blocking."
-                )
-                return True  # Treat invalid IP formats as unsafe
+                ips = await cache.resolve(hostname)
+            except socket.gaierror:
+                logger.debug(f"SSRF: Blocked due to DNS resolution failure for {hostname}")
+                return True  # Treat resolution failures as potentially unsafe
+            except OSError as e:
+                logger.warning(f"SSRF DNS resolution error for {hostname}: {e}")
+                return True  # Treat other DNS errors as unsafe
 
-        # If all resolved IPs are public and valid
-        logger.debug(f"SSRF: Allowed public host/IPs: {hostname} resolved to {ips}")
-        return False  # URL is considered safe
+        return _ssrf_check_resolved_ips(hostname, ips, allow_test)
 
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        # Catch-all for any unexpected errors during the check process
         logger.error(
             f"Unexpected error during SSRF check for '{url}': {e}", exc_info=True
         )
         return True  # Default to blocking in case of unexpected errors
 
 
-
 # --- Datetime Helpers (Copied from main.py if not in shared utils) ---
 def _datetime_to_iso(dt: Optional[datetime]) -> Optional[str]:
     # ... (implementation) ...
@@ -444,7 +606,6 @@ def get_relative_path(full_path: Path, base_path: Path) -> Optional[str]:
 
 
 
-import asyncio
 import aiofiles
 
 async def calculate_md5_async(file_path: Path, chunk_size: int = 8192) -> str:
@@ -482,6 +643,43 @@ async def calculate_md5_async(file_path: Path, chunk_size: int = 8192) -> str:
         raise # Re-raise unexpected errors
 
 
+_EXHAUSTED = object()
+
+
+async def iterate_in_executor(
+    iterator: Iterator[Any], executor: Optional[Executor] = None
+) -> AsyncIterator[Any]:
+    """
+    Yields the items of a blocking iterator, computing each one with `next`
+    on `executor` so the event loop is never blocked. When iteration stops
+    early (e.g. the consumer is cancelled because a client disconnected), the
+    step still running in the executor is awaited before the iterator is
+    closed: closing a generator while it executes raises ValueError.
+
+    Args:
+        iterator: The iterator to consume (e.g. a generator).
+        executor: Executor to run the steps on (None = the loop's default).
+    """
+    loop = asyncio.get_running_loop()
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            pending = loop.run_in_executor(executor, next, iterator, _EXHAUSTED)
+            # Shielded: cancelling the consumer must not detach it from the step
+            item = await asyncio.shield(pending)
+            if item is _EXHAUSTED:
+                break
+            yield item
+    finally:
+        if pending is not None:
+            await asyncio.wait([pending])
+            if not pending.cancelled():
+                pending.exception()  # Retrieved, so a late error is not reported as unhandled
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await loop.run_in_executor(executor, close)
+
+
 # --- Example Usage (if run directly) ---
 if __name__ == "__main__":
     print("--- Top-Level Utility Function Examples ---")
@@ -531,6 +729,17 @@ if __name__ == "__main__":
     for url in ssrf_urls_to_test:
         print(f"'{url}' -> Internal/Private: {is_url_private_or_internal(url)}")
 
+    async def _async_ssrf_demo():
+        dns_cache = DNSCache()
+        results = await asyncio.gather(
+            *(is_url_private_or_internal_async(url, dns_cache) for url in ssrf_urls_to_test)
+        )
+        for url, result in zip(ssrf_urls_to_test, results):
+            assert result == is_url_private_or_internal(url), url
+        print(f"Async SSRF checks agree with sync checks ({dns_cache.lookups} DNS lookups)")
+
+    asyncio.run(_async_ssrf_demo())
+
     # --- CHANGE: Added more keyword test cases ---
     print("\n--- Keyword Check ---")
     text_sample = "Sample document with KEYWORDS and Text."
@@ -0,0 +1,45 @@
+"""
+Unit tests for downloader/blob_store.py
+"""
+import hashlib
+import os
+
+import pytest
+
+from mcp_doc_retriever.downloader.blob_store import BlobStore
+from mcp_doc_retriever.downloader.fetchers import _write_page_file
+
+
+def _save(path, body):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    return hashlib.md5(body).hexdigest()
+
+
+def test_identical_bodies_are_stored_once_and_paths_stay_linked(tmp_path):
+    store = BlobStore(tmp_path)
+    body = b"<html>same</html>"
+    first, second = tmp_path / "content/a/x.html", tmp_path / "content/b/y.html"
+    digest = _save(first, body)
+    assert store.adopt(first, digest) == (tmp_path / "blobs" / digest[:2] / f"{digest}.html", True)
+    _save(second, body)
+    blob, stored = store.adopt(second, digest)
+    assert not stored and os.path.samefile(first, blob) and os.path.samefile(second, blob)
+    assert store.adopt(first, digest) == (blob, False)  # Re-adopting a linked copy is a no-op
+
+    # Fetchers replace files atomically, which must leave the shared blob intact
+    _write_page_file(first, b"<html>changed</html>")  # As the Playwright fetcher saves
+    assert first.read_bytes() == b"<html>changed</html>"
+    assert blob.read_bytes() == body and second.read_bytes() == body
+    assert not list(first.parent.glob("*.part"))
+
+
+def test_digest_collision_with_different_bytes_is_not_deduplicated(tmp_path):
+    store = BlobStore(tmp_path)
+    digest = _save(tmp_path / "a.html", b"one")
+    store.adopt(tmp_path / "a.html", digest)
+    _save(tmp_path / "b.html", b"two")
+    assert store.adopt(tmp_path / "b.html", digest) == (tmp_path / "b.html", False)
+    assert (tmp_path / "b.html").read_bytes() == b"two"
+    with pytest.raises(ValueError):
+        store.path_for("../../etc/passwd")
@@ -0,0 +1,28 @@
+"""
+Unit tests for the RenderProfile rules in downloader/browser_pool.py (no browser needed).
+"""
+import pytest
+
+from mcp_doc_retriever.downloader.browser_pool import RenderProfile
+
+DOC = "https://docs.example.com/guide/"
+
+
+def test_default_profile_blocks_heavy_assets_only():
+    profile = RenderProfile()
+    assert profile.should_block("image", "https://docs.example.com/logo.png", DOC)
+    assert profile.should_block("font", "https://fonts.gstatic.com/x.woff2", DOC)
+    assert not profile.should_block("script", "https://www.google-analytics.com/a.js", DOC)
+    assert not profile.should_block("document", "https://docs.example.com/next", DOC)
+
+
+def test_third_party_blocking_keeps_same_site_subdomains():
+    profile = RenderProfile(block_resource_types=(), block_third_party=True)
+    assert profile.should_block("script", "https://www.google-analytics.com/a.js", DOC)
+    assert not profile.should_block("script", "https://static.example.com/app.js", DOC)
+    assert not profile.should_block("xhr", "https://docs.example.com/api/toc.json", DOC)
+
+
+def test_invalid_wait_mode_rejected():
+    with pytest.raises(ValueError):
+        RenderProfile(wait_until="idle")
@@ -0,0 +1,50 @@
+"""
+Unit tests for downloader/compression.py and the compressed fetch/read paths
+"""
+import hashlib
+
+import httpx
+import pytest
+
+from mcp_doc_retriever.downloader.compression import (
+    ZSTD_AVAILABLE,
+    is_compressed,
+    read_page_bytes,
+    resolve_compression,
+)
+from mcp_doc_retriever.downloader.fetchers import fetch_single_url_requests, scan_local_copy
+from mcp_doc_retriever.searcher.helpers import read_file_with_fallback
+
+URL = "http://example.com/docs/page.html"
+HTML = ("<html><body><a href='/docs/next.html'>next</a>" + "<p>Grüße aus der Doku.</p>" * 500 + "</body></html>").encode("utf-8")
+
+
+@pytest.mark.asyncio
+async def test_gzip_storage_is_transparent_to_readers(tmp_path):
+    target = tmp_path / "page.html"
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=HTML, headers={"Content-Type": "text/html; charset=utf-8"})
+        )
+    )
+    async with client:
+        result = await fetch_single_url_requests(
+            URL, str(target), allowed_base_dir=str(tmp_path), client=client, compression="gzip"
+        )
+
+    assert result["status"] == "success"
+    assert is_compressed(target) and target.stat().st_size < len(HTML) // 5
+    # md5 and links describe the page, not the compressed file
+    assert result["content_md5"] == hashlib.md5(HTML).hexdigest()
+    assert scan_local_copy(URL, target)[:2] == (result["content_md5"], ["http://example.com/docs/next.html"])
+    assert read_page_bytes(target) == HTML
+    assert read_file_with_fallback(target) == HTML.decode("utf-8")
+
+
+def test_plain_files_still_read_and_compression_names_validated(tmp_path):
+    plain = tmp_path / "old.html"
+    plain.write_bytes(HTML)
+    assert not is_compressed(plain) and read_page_bytes(plain) == HTML
+    assert resolve_compression("zstd") == ("zstd" if ZSTD_AVAILABLE else "gzip")
+    with pytest.raises(ValueError):
+        resolve_compression("brotli")
@@ -0,0 +1,59 @@
+"""
+Unit tests for downloader/crawl_state.py
+"""
+import asyncio
+import json
+
+from mcp_doc_retriever.downloader.crawl_state import CrawlState, crawl_state_path
+from mcp_doc_retriever.downloader.index_writer import IndexWriter
+from mcp_doc_retriever.downloader.models import IndexRecord
+from mcp_doc_retriever.downloader.web_downloader import _load_reusable_records
+
+START = "http://example.com/"
+
+
+def test_checkpoint_persists_frontier_and_resumes(tmp_path):
+    db_path = crawl_state_path(tmp_path, "dl")
+
+    async def interrupted_crawl():
+        state = CrawlState(db_path)
+        assert state.open(START, 2) is False
+        async with IndexWriter(tmp_path / "index" / "dl.jsonl") as writer:
+            state.discovered(START, 0)
+            for page in ("a", "b"):
+                state.discovered(f"{START}{page}", 1)
+            await writer.write(IndexRecord(original_url=START, canonical_url=START, local_path="x.html", fetch_status="success"))
+            state.done(START)
+            await state.checkpoint(writer)
+            state.discovered(f"{START}c", 2)  # lost: never checkpointed
+        state.close()
+
+    asyncio.run(interrupted_crawl())
+
+    resumed = CrawlState(db_path)
+    assert resumed.open(START, 2) is True
+    frontier, visited = resumed.load()
+    assert frontier == [(f"{START}a", 1), (f"{START}b", 1)]
+    assert visited == {START, f"{START}a", f"{START}b"}
+    resumed.close()
+
+    other = CrawlState(db_path)
+    assert other.open(START, 3) is False  # Different crawl: state is discarded
+    assert other.load() == ([], set())
+    other.finish()
+    assert not db_path.exists()
+
+
+def test_load_reusable_records_requires_file_and_latest_success(tmp_path):
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "a.html").write_text("<a href='/b'>b</a>", encoding="utf-8")
+    index_path = tmp_path / "dl.jsonl"
+    lines = [
+        {"canonical_url": f"{START}a", "local_path": "content/a.html", "fetch_status": "success"},
+        {"canonical_url": f"{START}gone", "local_path": "content/gone.html", "fetch_status": "success"},
+        {"canonical_url": f"{START}b", "local_path": "content/a.html", "fetch_status": "success"},
+        {"canonical_url": f"{START}b", "local_path": "", "fetch_status": "failed_request"},
+    ]
+    index_path.write_text("\n".join(json.dumps(line) for line in lines) + "\n", encoding="utf-8")
+
+    assert list(_load_reusable_records(index_path, tmp_path)) == [f"{START}a"]
@@ -0,0 +1,171 @@
+"""
+Unit tests for downloader/fetchers.py (httpx fetcher, no network).
+"""
+import hashlib
+
+import httpx
+import pytest
+
+from mcp_doc_retriever.downloader.browser_pool import RenderProfile
+from mcp_doc_retriever.downloader.fetchers import (
+    _StreamingLinkExtractor,
+    _render_page_to_file,
+    fetch_single_url_requests,
+)
+from mcp_doc_retriever.downloader.parse_pool import ParsePool
+
+URL = "http://example.com/docs/page.html"
+HTML = b'<html><body><a href="/docs/next.html">next</a></body></html>'
+
+
+def _client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_conditional_request_returns_not_modified(tmp_path):
+    target = tmp_path / "page.html"
+    target.write_bytes(HTML)
+    seen_headers = {}
+
+    def handler(request):
+        seen_headers.update(request.headers)
+        return httpx.Response(304, headers={"ETag": '"v2"'})
+
+    async with _client(handler) as client:
+        result = await fetch_single_url_requests(
+            URL, str(target), allowed_base_dir=str(tmp_path), client=client,
+            validators={"etag": '"v1"', "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+        )
+
+    assert seen_headers["if-none-match"] == '"v1"'
+    assert seen_headers["if-modified-since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+    assert result["status"] == "not_modified"
+    assert result["etag"] == '"v2"'
+    assert result["last_modified"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+    assert result["content_md5"] == hashlib.md5(HTML).hexdigest()
+    assert result["detected_links"] == ["http://example.com/docs/next.html"]
+    assert target.read_bytes() == HTML
+
+
+@pytest.mark.asyncio
+async def test_success_records_validators_and_existing_file_without_them_is_skipped(tmp_path):
+    target = tmp_path / "page.html"
+
+    def handler(request):
+        assert "if-none-match" not in request.headers
+        return httpx.Response(
+            200, content=HTML,
+            headers={"Content-Type": "text/html", "ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+        )
+
+    async with _client(handler) as client:
+        result = await fetch_single_url_requests(URL, str(target), allowed_base_dir=str(tmp_path), client=client)
+        assert result["status"] == "success"
+        assert result["etag"] == '"v1"'
+        assert result["last_modified"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+        skipped = await fetch_single_url_requests(URL, str(target), allowed_base_dir=str(tmp_path), client=client)
+        assert skipped["status"] == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_is_hashed_and_links_span_chunks(tmp_path):
+    target = tmp_path / "big.html"
+    filler = b"<p>" + b"x" * 200_000 + b"</p>"
+    body = b"<html><body>" + filler + b'<a href="deep.html">deep</a>' + filler + b"</body></html>"
+
+    def handler(request):
+        return httpx.Response(200, content=body, headers={"Content-Type": "text/html; charset=utf-8"})
+
+    async with _client(handler) as client:
+        result = await fetch_single_url_requests(URL, str(target), allowed_base_dir=str(tmp_path), client=client)
+
+    assert result["status"] == "success"
+    assert result["content_md5"] == hashlib.md5(body).hexdigest()
+    assert result["detected_links"] == ["http://example.com/docs/deep.html"]
+    assert target.read_bytes() == body
+    assert list(tmp_path.iterdir()) == [target]
+
+
+@pytest.mark.asyncio
+async def test_parse_pool_hashes_and_extracts_links_in_worker_process(tmp_path):
+    target = tmp_path / "page.php"  # Suffix is not HTML: the content type decides
+    body = '<html><body><a href="caf\u00e9.html">caf\u00e9</a></body></html>'.encode("latin-1")
+
+    def handler(request):
+        return httpx.Response(200, content=body, headers={"Content-Type": "text/html; charset=latin-1"})
+
+    async with _client(handler) as client, ParsePool(processes=1) as pool:
+        result = await fetch_single_url_requests(
+            URL, str(target), allowed_base_dir=str(tmp_path), client=client, parse_pool=pool
+        )
+
+    assert result["status"] == "success"
+    assert result["content_md5"] == hashlib.md5(body).hexdigest()
+    assert result["detected_links"] == ["http://example.com/docs/caf\u00e9.html"]
+
+
+@pytest.mark.asyncio
+async def test_max_size_enforced_mid_stream_without_leftovers(tmp_path):
+    target = tmp_path / "huge.html"
+
+    async def body():
+        for _ in range(10):
+            yield b"a" * 1000
+
+    def handler(request):
+        # No Content-Length: only the streaming check can catch this
+        return httpx.Response(200, content=body(), headers={"Content-Type": "text/html"})
+
+    async with _client(handler) as client:
+        result = await fetch_single_url_requests(
+            URL, str(target), allowed_base_dir=str(tmp_path), client=client, max_size=2500
+        )
+
+    assert result["status"] == "failed"
+    assert "exceeds max_size 2500" in result["error_message"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_link_extractor_honours_base_href_and_filters_non_navigational_links():
+    html = (
+        b'<html><head><base href="https://cdn.example.com/v2/"></head><body>'
+        b'<a href="guide.html">g</a><a href="#top">t</a><a href=" JavaScript:void(0)">j</a>'
+        b'<a href="mailto:a@example.com">m</a><a href="tel:123">p</a><a>no href</a>'
+        b'<A HREF="/abs">abs</A><a href="https://other.org/x">x</a></body></html>'
+    )
+    extractor = _StreamingLinkExtractor(URL)
+    for i in range(0, len(html), 7):  # Tags split across chunks
+        extractor.feed_bytes(html[i:i + 7])
+    assert extractor.close() == [
+        "https://cdn.example.com/v2/guide.html",
+        "https://cdn.example.com/abs",
+        "https://other.org/x",
+    ]
+
+
+class _FakeRenderedPage:
+    """Stands in for a Playwright page that rendered `HTML` with `hrefs`."""
+
+    def __init__(self, hrefs):
+        self.hrefs = hrefs
+
+    async def goto(self, url, timeout, wait_until):
+        return type("Response", (), {"ok": True, "status": 200})()
+
+    async def content(self):
+        return HTML.decode()
+
+    async def eval_on_selector_all(self, selector, script):
+        return self.hrefs
+
+
+@pytest.mark.asyncio
+async def test_rendered_page_links_use_the_same_filter_as_httpx(tmp_path):
+    hrefs = ["guide.html", "#top", " JavaScript:void(0)", "MAILTO:a@example.com", "tel:123", None, "/abs"]
+    result = await _render_page_to_file(
+        _FakeRenderedPage(hrefs), URL, tmp_path / "page.html", 5, RenderProfile()
+    )
+    assert result["status"] == "success" and (tmp_path / "page.html").read_bytes() == HTML
+    assert result["detected_links"] == ["http://example.com/docs/guide.html", "http://example.com/abs"]
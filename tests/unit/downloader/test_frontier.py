@@ -0,0 +1,60 @@
+"""
+Unit tests for downloader/frontier.py
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from mcp_doc_retriever.downloader.frontier import DefaultScorer, make_frontier
+
+START = "https://docs.example.com/v2/"
+
+
+def _drain(frontier):
+    items = []
+    while not frontier.empty():
+        items.append(frontier.get_nowait())
+    return items
+
+
+def test_default_scorer_prefers_content_and_penalizes_duplicates():
+    score = DefaultScorer(START)
+    assert score(f"{START}docs/intro", 1) < score(f"{START}blog/post", 1) < score(f"{START}tags/x", 1)
+    assert score("https://docs.example.com/v1/docs/intro", 1) > score(f"{START}docs/intro", 1)
+    assert score(f"{START}page?sort=asc", 1) > score(f"{START}page", 1)
+    assert score(f"{START}a/b/a/b/page", 1) > score(f"{START}a/b/page", 1)
+    assert score(f"{START}docs/intro", 1) < score(f"{START}docs/intro", 2)  # depth dominates
+
+    now = datetime.now(timezone.utc)
+    assert score(f"{START}x", 1, now) < score(f"{START}x", 1, now - timedelta(days=720)) < score(f"{START}x", 1)
+
+
+def test_priority_frontier_serves_best_first_and_sentinel_last():
+    async def run():
+        frontier = make_frontier("priority", START)
+        await frontier.put(None)
+        for i in range(50):
+            await frontier.put((f"{START}tags/t{i}", 1))
+        await frontier.put((f"{START}api/client", 1))
+        frontier.set_lastmod(f"{START}whatsnew", datetime.now(timezone.utc))
+        await frontier.put((f"{START}whatsnew", 1))
+        first, second = await frontier.get(), await frontier.get()
+        rest = _drain(frontier)
+        return first, second, rest
+
+    first, second, rest = asyncio.run(run())
+    assert first == (f"{START}whatsnew", 1)  # Just modified: bonus of lastmod_weight
+    assert second == (f"{START}api/client", 1)
+    assert rest[:2] == [(f"{START}tags/t0", 1), (f"{START}tags/t1", 1)]  # Ties keep insertion order
+    assert rest[-1] is None
+
+
+def test_fifo_order_and_unknown_order():
+    frontier = make_frontier("fifo")
+    urls = [(f"{START}tags/x", 1), (f"{START}docs/a", 3), (f"{START}b", 0)]
+    for item in urls:
+        frontier.put_nowait(item)
+    assert _drain(frontier) == urls
+    with pytest.raises(ValueError):
+        make_frontier("random")
@@ -0,0 +1,48 @@
+"""
+Unit tests for downloader/http_client.py
+"""
+import httpx
+import pytest
+
+from mcp_doc_retriever.downloader.http_client import (
+    ConnectionStats,
+    make_client_limits,
+    make_crawl_client,
+)
+
+
+def test_pool_limits_follow_crawl_concurrency():
+    limits = make_client_limits(max_connections=50, per_host_connections=12, keepalive_expiry=30.0)
+    assert (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry) == (50, 12, 30.0)
+    # Never more idle connections than the pool may hold
+    assert make_client_limits(4, 12).max_keepalive_connections == 4
+
+
+@pytest.mark.asyncio
+async def test_connection_stats_count_new_and_reused_connections():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        # Stand-in for httpcore: the first request to a host opens a connection
+        trace = request.extensions["trace"]
+        if request.url.path == "/first":
+            await trace("connection.connect_tcp.complete", {})
+            await trace("connection.start_tls.complete", {})
+        return httpx.Response(200, text="ok")
+
+    stats = ConnectionStats()
+    client, returned = make_crawl_client(
+        8, 8, http2=False, stats=stats, transport=httpx.MockTransport(handler)
+    )
+    assert returned is stats
+    async with client:
+        for path in ("/first", "/second", "/third"):
+            await client.get(f"https://docs.example.com{path}")
+
+    counts = stats.snapshot()["docs.example.com"]
+    assert counts == {
+        "requests": 3,
+        "connections": 1,
+        "tls_handshakes": 1,
+        "reused": 2,
+        "http_versions": {"HTTP/1.1": 3},
+    }
+    assert "3 requests over 1 connections" in stats.summary()
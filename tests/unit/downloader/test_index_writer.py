@@ -0,0 +1,58 @@
+"""
+Unit tests for downloader/index_writer.py
+"""
+import asyncio
+import json
+
+from mcp_doc_retriever.downloader.index_writer import IndexWriter
+from mcp_doc_retriever.downloader.models import IndexRecord
+
+
+def _record(i, status="success"):
+    return IndexRecord(
+        original_url=f"http://example.com/{i}",
+        canonical_url=f"http://example.com/{i}",
+        local_path=f"content/dl/example.com/{i}.html" if status == "success" else "",
+        fetch_status=status,
+    )
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_records_are_batched_and_written_in_order(tmp_path):
+    index_path = tmp_path / "dl.jsonl"
+    index_path.write_text(json.dumps({"canonical_url": "http://example.com/old"}) + "\n", encoding="utf-8")
+    writes = []
+
+    async def run():
+        writer = IndexWriter(index_path, batch_size=50)
+        original = writer._write_lines
+        writer._write_lines = lambda f, lines: writes.append(len(lines)) or original(f, lines)
+        for i in range(200):
+            await writer.write(_record(i, "success" if i % 3 else "failed_request"))
+        await writer.close()
+
+    asyncio.run(run())
+    records = _read(index_path)
+    assert records[0]["canonical_url"] == "http://example.com/old"
+    assert [r["canonical_url"] for r in records[1:]] == [f"http://example.com/{i}" for i in range(200)]
+    assert "error_message" not in records[1]  # exclude_none, as before
+    assert len(writes) < 200 and max(writes) <= 50
+
+
+def test_checkpoint_and_interval_make_records_visible(tmp_path):
+    index_path = tmp_path / "dl.jsonl"
+
+    async def run():
+        async with IndexWriter(index_path, flush_interval=0.05, flush_records=1000) as writer:
+            await writer.write(_record(1))
+            await writer.checkpoint()
+            assert len(_read(index_path)) == 1
+
+            await writer.write(_record(2))
+            await asyncio.sleep(0.2)  # No checkpoint: the time threshold flushes it
+            assert len(_read(index_path)) == 2
+
+    asyncio.run(run())
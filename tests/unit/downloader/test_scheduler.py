@@ -0,0 +1,44 @@
+"""
+Unit tests for downloader/scheduler.py
+"""
+from urllib.robotparser import RobotFileParser
+
+import pytest
+
+from mcp_doc_retriever.downloader.scheduler import HostScheduler, parse_retry_after
+
+HOST = "docs.example.com"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_crawl_delay_paces_host():
+    rp = RobotFileParser()
+    rp.parse(["User-agent: *", "Crawl-delay: 2"])
+    scheduler = HostScheduler(max_concurrency=20)
+    scheduler.configure_host(HOST, rp, "MCPBot/1.0")
+    snap = scheduler.snapshot(HOST)
+    assert snap["interval"] == 2.0
+    assert snap["limit"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_when_healthy_and_halves_on_throttle():
+    scheduler = HostScheduler(max_concurrency=20, initial_concurrency=4)
+    for _ in range(12):
+        async with scheduler.slot(HOST) as slot:
+            slot.record(200)
+    grown = scheduler.snapshot(HOST)["limit"]
+    assert grown > 4
+
+    async with scheduler.slot(HOST) as slot:
+        slot.record(429, retry_after="30")
+    snap = scheduler.snapshot(HOST)
+    assert snap["limit"] == pytest.approx(grown / 2)
+    assert 29 < snap["blocked_for"] <= 30
+    assert snap["in_flight"] == 0
@@ -0,0 +1,103 @@
+"""
+Unit tests for downloader/segments.py and reading/fetching through segment locators
+"""
+import hashlib
+import io
+
+import httpx
+import pytest
+
+from mcp_doc_retriever.downloader import fetchers, segments
+from mcp_doc_retriever.downloader.compression import open_page_writer, page_stat, read_page_bytes
+from mcp_doc_retriever.downloader.fetchers import fetch_single_url_requests
+from mcp_doc_retriever.downloader.segments import (
+    SegmentStore,
+    iter_segment,
+    parse_segment_locator,
+    read_segment_page,
+)
+from mcp_doc_retriever.searcher.helpers import is_file_size_ok, read_file_with_fallback
+
+URL = "http://example.com/docs/page.html"
+HTML = b'<html><body><a href="/docs/next.html">next</a><p>Segment page</p></body></html>'
+
+
+def test_append_read_roll_over_and_truncated_tail(tmp_path):
+    store = SegmentStore(tmp_path, "job", max_segment_bytes=200)
+    locators = [store.append(f"https://a/{i}", HTML, ".html") for i in range(3)]
+    store.close()
+
+    assert [parse_segment_locator(p)[0].name for p in locators] == ["00001.seg", "00002.seg", "00003.seg"]
+    assert all(read_segment_page(p) == HTML for p in locators)
+    assert page_stat(locators[0]) == (0, len(HTML))
+    assert parse_segment_locator(tmp_path / "content" / "page.html") is None
+
+    segment = parse_segment_locator(locators[0])[0]
+    with open(segment, "ab") as f:
+        f.write(b"MCPSEG/1 500 https://a/partial\n<html>")  # Interrupted write
+    assert [url for url, _, _ in iter_segment(segment)] == ["https://a/0"]
+
+    # A new store never appends to existing segments
+    assert parse_segment_locator(SegmentStore(tmp_path, "job").append("https://a/3", HTML))[0].name == "00004.seg"
+
+
+def test_searcher_reads_compressed_segment_pages(tmp_path):
+    buffer = io.BytesIO()
+    with open_page_writer(buffer, "gzip") as f:
+        f.write(HTML)
+    locator = SegmentStore(tmp_path, "job").append(URL, buffer.getvalue(), ".html")
+
+    assert read_page_bytes(locator) == HTML
+    assert is_file_size_ok(locator)
+    assert read_file_with_fallback(locator) == HTML.decode()
+
+
+@pytest.mark.asyncio
+async def test_fetch_into_segment_then_skip_and_revalidate_stored_copy(tmp_path):
+    store = SegmentStore(tmp_path, "job")
+    target = tmp_path / "content" / "job" / "example.com" / "page.html"
+    responses = iter([
+        httpx.Response(200, content=HTML, headers={"Content-Type": "text/html", "ETag": '"v1"'}),
+        httpx.Response(304),
+    ])
+    async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: next(responses))) as client:
+        stored = await fetch_single_url_requests(URL, str(target), client=client, segment_store=store)
+        assert stored["status"] == "success" and not target.parent.exists()  # No per-URL file or directory
+        assert read_page_bytes(stored["target_path"]) == HTML
+        assert stored["content_md5"] == hashlib.md5(HTML).hexdigest()
+
+        skipped = await fetch_single_url_requests(
+            URL, str(target), client=client, segment_store=store, stored_copy=stored["target_path"]
+        )
+        assert skipped["status"] == "skipped" and skipped["target_path"] == stored["target_path"]
+
+        revalidated = await fetch_single_url_requests(
+            URL, str(target), client=client, segment_store=store,
+            stored_copy=stored["target_path"], validators={"etag": '"v1"'},
+        )
+    assert revalidated["status"] == "not_modified"
+    assert revalidated["detected_links"] == ["http://example.com/docs/next.html"]
+
+
+@pytest.mark.asyncio
+async def test_large_body_is_spooled_to_disk_and_copied_into_segment(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetchers, "SEGMENT_SPOOL_BYTES", 1024)  # Force the roll-over to disk
+    monkeypatch.setattr(segments, "COPY_CHUNK_BYTES", 4096)
+    body = HTML[:-14] + b"<p>filler</p>" * 20000 + b"</body></html>"
+    store = SegmentStore(tmp_path, "job")
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=body, headers={"Content-Type": "text/html"})
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        stored = await fetch_single_url_requests(
+            URL, str(tmp_path / "page.html"), client=client, segment_store=store, compression="gzip"
+        )
+    assert stored["status"] == "success"
+    assert read_page_bytes(stored["target_path"]) == body
+
+    # A body that ends early is rejected and the next page starts a new segment
+    with pytest.raises(ValueError):
+        store.append_file("https://a/short", io.BytesIO(HTML), len(HTML) + 10, ".html")
+    locator = store.append("https://a/next", HTML, ".html")
+    assert parse_segment_locator(locator)[0].name == "00002.seg" and read_segment_page(locator) == HTML
+    assert [url for url, _, _ in iter_segment(parse_segment_locator(stored["target_path"])[0])] == [URL]
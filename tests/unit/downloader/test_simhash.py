@@ -0,0 +1,149 @@
+"""
+Unit tests for downloader/simhash.py, the SimHash of the streaming extractor
+and how crawls treat the near-duplicates it finds
+"""
+import asyncio
+import functools
+import json
+import random
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mcp_doc_retriever.downloader import web_downloader
+from mcp_doc_retriever.downloader.fetchers import _StreamingLinkExtractor
+from mcp_doc_retriever.downloader.simhash import (
+    NearDuplicateIndex,
+    SimHasher,
+    hamming_distance,
+)
+from mcp_doc_retriever.searcher.searcher import SearchRequest, perform_search
+
+random.seed(3)
+VOCABULARY = [f"term{i}" for i in range(2000)]
+NAV = "<nav>" + "".join(f"<a href='/s{i}'>Section {i} overview</a>" for i in range(300)) + "</nav>"
+
+
+def _article(words):
+    return f"<html><body>{NAV}<main><h1>Title</h1><p>{' '.join(words)}</p></main><footer>Copyright</footer></body></html>"
+
+
+def _page_simhash(html, chunk_size=None):
+    extractor = _StreamingLinkExtractor("https://docs.example.com/", "utf-8")
+    data = html.encode("utf-8")
+    step = chunk_size or len(data)
+    for i in range(0, len(data), step):
+        extractor.feed_bytes(data[i : i + step])
+    extractor.close()
+    return extractor.simhash
+
+
+def test_near_duplicate_pages_match_and_distinct_pages_with_same_chrome_do_not():
+    words = random.choices(VOCABULARY, k=600)
+    other = random.choices(VOCABULARY, k=600)
+    edited = words[:300] + ["printable", "version"] + words[300:]
+
+    original = _page_simhash(_article(words))
+    assert original == _page_simhash(_article(words), chunk_size=7)  # Chunking never splits words
+    assert hamming_distance(original, _page_simhash(_article(edited))) <= 3
+    # 300 shared nav links would dominate if <nav> text were hashed
+    assert hamming_distance(original, _page_simhash(_article(other))) > 10
+    assert _page_simhash(_article(words[:5])) is None  # Too little text to tell
+
+
+def test_index_finds_within_distance_and_never_matches_same_url():
+    hasher = SimHasher()
+    hasher.update(" ".join(random.choices(VOCABULARY, k=200)))
+    base = hasher.digest()
+    index = NearDuplicateIndex(max_distance=3)
+    assert index.check(base, "https://a/1") is None
+    assert index.check(base, "https://a/1") is None  # Same page again: not its own duplicate
+
+    three_bits = base ^ (1 << 0 | 1 << 20 | 1 << 40)
+    four_bits = base ^ (1 << 0 | 1 << 17 | 1 << 33 | 1 << 49)  # One flip in every band
+    assert index.check(three_bits, "https://a/2") == "https://a/1"
+    assert index.check(four_bits, "https://a/3") is None
+    assert len(index) == 2
+
+    index.remove("https://a/1")
+    assert index.find(base) is None
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sphinx_like_site(tmp_path, monkeypatch):
+    """
+    Pages whose chrome is a large sidebar TOC in a plain <div> (as Sphinx
+    themes render it), each with 60 words of its own content. print.html
+    repeats a.html's text exactly and is the only page linking to leaf.html.
+    """
+    site = tmp_path / "site"
+    site.mkdir()
+    names = ["a", "b", "c", "d", "e"]
+    toc = "".join(
+        f"<li><a href='{n}.html'>Chapter {n} reference guide and tutorial overview</a></li>" for n in names
+    )
+    sidebar = f"<div class='sphinxsidebar'><h3>Table of contents</h3><ul>{toc * 8}</ul></div>"
+
+    def page(words, extra=""):
+        return f"<html><body>{sidebar}<div class='body'><p>{' '.join(words)}</p>{extra}</div></body></html>"
+
+    content = {n: random.sample(VOCABULARY, 60) for n in names + ["leaf"]}
+    for n in names + ["leaf"]:
+        (site / f"{n}.html").write_text(page(content[n]), encoding="utf-8")
+    (site / "print.html").write_text(page(content["a"], "<a href='leaf.html'></a>"), encoding="utf-8")
+    (site / "index.html").write_text(
+        page(random.sample(VOCABULARY, 60), "<a href='print.html'>Print view</a>"), encoding="utf-8"
+    )
+
+    async def not_internal(url, dns_cache=None):
+        return False
+
+    monkeypatch.setattr(web_downloader, "is_url_private_or_internal_async", not_internal)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(site)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", content
+    server.shutdown()
+    server.server_close()
+
+
+def _crawl(base_dir, start_url, **options):
+    (base_dir / "index").mkdir(parents=True)
+    asyncio.run(web_downloader.start_recursive_download(
+        f"{start_url}/index.html", 3, False, "dups", base_dir,
+        max_concurrent_requests=1, frontier_order="fifo", resume=False, **options,
+    ))
+    with (base_dir / "index" / "dups.jsonl").open(encoding="utf-8") as f:
+        return {r["canonical_url"].rsplit("/", 1)[-1]: r for r in map(json.loads, f)}
+
+
+def test_crawl_keeps_flagged_duplicates_and_their_links(tmp_path, sphinx_like_site):
+    start_url, content = sphinx_like_site
+
+    records = _crawl(tmp_path / "default", start_url)
+    assert {r["fetch_status"] for r in records.values()} == {"success"}  # Detection is opt-in
+    assert "leaf.html" in records
+
+    base_dir = tmp_path / "detect"
+    records = _crawl(base_dir, start_url, detect_duplicates=True)
+    # print.html repeats a.html's text; with this sidebar, distinct pages can
+    # be flagged too. Flagged pages keep their files and their links.
+    assert records["print.html"]["fetch_status"] == "duplicate"
+    assert records["print.html"]["duplicate_of"]
+    assert records["leaf.html"]["fetch_status"] in ("success", "duplicate")  # Only linked from print.html
+    assert all((base_dir / r["local_path"]).is_file() for r in records.values())
+    # Searches skip only the flagged pages
+    query = SearchRequest(download_id="dups", scan_keywords=[content["a"][0]], extract_selector="p")
+    expected = [f"{start_url}/a.html"] if records["a.html"]["fetch_status"] == "success" else []
+    assert [r.original_url for r in perform_search(query, base_dir)] == expected
+
+    base_dir = tmp_path / "delete"
+    records = _crawl(base_dir, start_url, detect_duplicates=True, delete_duplicates=True)
+    assert (records["print.html"]["fetch_status"], records["print.html"]["local_path"]) == ("duplicate", "")
+    assert not list((base_dir / "content").rglob("print*"))
+    assert "leaf.html" not in records  # Only linked from the deleted page
@@ -0,0 +1,82 @@
+"""
+Unit tests for downloader/sitemaps.py
+"""
+import asyncio
+import gzip
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from mcp_doc_retriever.downloader import sitemaps
+from mcp_doc_retriever.downloader.sitemaps import (
+    SitemapEntry,
+    _SitemapParser,
+    discover_sitemap_entries,
+    recrawl_rank,
+)
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+SITE = {
+    "/robots.txt": b"User-agent: *\nDisallow: /private/\nSitemap: https://docs.example.com/index.xml\n",
+    "/index.xml": f"<sitemapindex {NS}><sitemap><loc>https://docs.example.com/a.xml.gz</loc></sitemap>"
+    f"<sitemap><loc>https://docs.example.com/private/b.xml</loc></sitemap></sitemapindex>".encode(),
+    "/a.xml.gz": gzip.compress(
+        f"<urlset {NS}>"
+        "<url><loc>https://docs.example.com/old</loc><lastmod>2023-01-01</lastmod></url>"
+        "<url><loc>https://docs.example.com/undated</loc></url>"
+        "<url><loc>https://docs.example.com/new</loc><lastmod>2024-06-01T12:00:00Z</lastmod></url>"
+        "<url><loc>https://cdn.example.net/elsewhere</loc></url>"
+        "</urlset>".encode()
+    ),
+    "/sitemap.xml": f"<urlset {NS}><url><loc>https://docs.example.com/old</loc></url></urlset>".encode(),
+}
+
+
+def test_discovers_in_domain_pages_from_robots_and_nested_gzip_sitemaps(monkeypatch):
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        body = SITE.get(request.url.path)
+        return httpx.Response(200, content=body) if body else httpx.Response(404)
+
+    async def not_internal(url, dns_cache=None):
+        return False
+
+    monkeypatch.setattr(sitemaps, "is_url_private_or_internal_async", not_internal)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await discover_sitemap_entries("https://docs.example.com/", client, {}, "MCPBot/1.0")
+
+    entries = asyncio.run(run())
+    assert [e.url for e in entries] == [
+        "https://docs.example.com/new",
+        "https://docs.example.com/old",
+        "https://docs.example.com/undated",
+    ]
+    assert entries[0].lastmod == datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+    assert "/private/b.xml" not in requested  # robots.txt applies to sitemaps too
+
+
+def test_parser_handles_split_chunks_and_caps_inflated_size():
+    document = gzip.compress(f"<urlset {NS}>{'<url><loc>https://x/p</loc></url>' * 1000}</urlset>".encode())
+    parser = _SitemapParser()
+    for i in range(0, len(document), 1):  # Even a 1-byte first chunk is sniffed as gzip
+        parser.feed(document[i : i + 1])
+    parser.close()
+    assert len(parser.pages) == 1000
+
+    with pytest.raises(sitemaps.SitemapTooLarge):
+        _SitemapParser(max_bytes=10_000).feed(document)
+
+
+def test_recrawl_rank_puts_changed_pages_first():
+    stored = "Mon, 01 Jan 2024 00:00:00 GMT"
+    changed = SitemapEntry("u", datetime(2024, 2, 1, tzinfo=timezone.utc))
+    unchanged = SitemapEntry("u", datetime(2023, 12, 1, tzinfo=timezone.utc))
+    assert recrawl_rank(changed.lastmod, stored) == 0
+    assert recrawl_rank(None, stored) == 1
+    assert recrawl_rank(changed.lastmod, None) == 1
+    assert recrawl_rank(unchanged.lastmod, stored) == 2
@@ -0,0 +1,47 @@
+"""
+Unit tests for downloader/visited.py
+"""
+import pytest
+
+from mcp_doc_retriever.downloader import visited as visited_mod
+from mcp_doc_retriever.downloader.visited import make_visited_set
+
+URLS = [f"https://docs.example.com/page/{i}?q={i * 7}" for i in range(5000)]
+
+
+@pytest.mark.parametrize("backend", ["exact", "fingerprint", "bloom"])
+def test_backends_behave_like_a_set(backend, tmp_path):
+    visited = make_visited_set(backend, urls=URLS[:10], spill_dir=tmp_path)
+    try:
+        assert [visited.add(u) for u in URLS[:20]] == [False] * 10 + [True] * 10
+        assert all([visited.add(u) for u in URLS[20:]])
+        assert len(visited) == len(URLS)
+        assert all(u in visited for u in URLS)
+        assert "https://docs.example.com/page/5000" not in visited
+    finally:
+        visited.close()
+
+
+def test_fingerprint_set_grows_and_survives_collisions_in_slots():
+    visited = visited_mod.FingerprintVisitedSet(capacity=8)
+    fingerprints = [visited_mod.url_fingerprint(u) for u in URLS]
+    assert all(visited.add_fingerprint(fp) for fp in fingerprints)
+    assert len(visited._table) >= len(URLS) / visited.max_load
+    assert all(visited.contains_fingerprint(fp) for fp in fingerprints)
+
+
+def test_bloom_false_positives_are_resolved_on_disk(tmp_path):
+    visited = visited_mod.BloomVisitedSet(initial_capacity=1024, error_rate=0.2, spill_dir=tmp_path)
+    try:
+        new = [visited.add(u) for u in URLS]
+        assert all(new)  # A saturated filter still never drops an unseen URL
+        assert len(visited._stages) > 1
+        assert visited.disk_lookups > 0
+    finally:
+        visited.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        make_visited_set("roaring")
@@ -0,0 +1,41 @@
+"""
+Shared fixtures for the searcher unit tests
+"""
+import json
+
+import pytest
+
+
+@pytest.fixture
+def make_download():
+    """
+    Factory writing a download under `base_dir`: each page of `pages`
+    (file name -> HTML) is saved as content/<download_id>/example.com/<name>
+    and gets a 'success' record with URL http://example.com/<name without
+    suffix>. `extra_records` are appended after them (URLs default to
+    http://example.com/extra<n>). Returns the page paths, in order.
+    """
+
+    def make(base_dir, pages, extra_records=(), download_id="test"):
+        host_dir = base_dir / "content" / download_id / "example.com"
+        host_dir.mkdir(parents=True)
+        (base_dir / "index").mkdir(exist_ok=True)
+        paths = []
+        with (base_dir / "index" / f"{download_id}.jsonl").open("w", encoding="utf-8") as f:
+            for name, html in pages.items():
+                path = host_dir / name
+                path.write_text(html, encoding="utf-8")
+                paths.append(path)
+                url = f"http://example.com/{path.stem}"
+                f.write(json.dumps({
+                    "original_url": url,
+                    "canonical_url": url,
+                    "local_path": f"content/{download_id}/example.com/{name}",
+                    "fetch_status": "success",
+                }) + "\n")
+            for i, record in enumerate(extra_records):
+                url = f"http://example.com/extra{i}"
+                f.write(json.dumps({"original_url": url, "canonical_url": url, **record}) + "\n")
+        return paths
+
+    return make
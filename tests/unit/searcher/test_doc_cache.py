@@ -0,0 +1,76 @@
+"""
+Unit tests for searcher/doc_cache.py: parse-once sharing across search phases and LRU eviction
+"""
+import os
+
+import pytest
+
+from mcp_doc_retriever.searcher import doc_cache
+from mcp_doc_retriever.searcher.advanced_extractor import extract_advanced_snippets_with_options
+from mcp_doc_retriever.searcher.doc_cache import DocumentCache
+from mcp_doc_retriever.searcher.searcher import SearchRequest, perform_search
+
+DOWNLOAD_ID = "cache_test"
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """A fresh process cache, and the names of the pages it parses."""
+    monkeypatch.setattr(doc_cache, "_document_cache", DocumentCache())
+    parsed = []
+    real_parse = doc_cache.parse_html
+
+    def counting_parse(content):
+        parsed.append(content)
+        return real_parse(content)
+
+    monkeypatch.setattr(doc_cache, "parse_html", counting_parse)
+    return parsed
+
+
+def pages_with_bodies(*bodies):
+    return {f"p{i}.html": f"<html><body>{body}</body></html>" for i, body in enumerate(bodies)}
+
+
+def test_pages_are_parsed_once_across_phases_and_queries(tmp_path, parses, make_download):
+    # No manifest or inverted index, so searches scan every page
+    paths = make_download(tmp_path, pages_with_bodies(
+        "<p>Install with <code>pip install x</code></p>",
+        "<p>Unrelated page</p>",
+        "<p>Install from source</p>",
+    ), download_id=DOWNLOAD_ID)
+    query = SearchRequest(download_id=DOWNLOAD_ID, scan_keywords=["install"], extract_selector="p")
+
+    results = perform_search(query, tmp_path)
+    assert [r.original_url for r in results] == ["http://example.com/p0", "http://example.com/p2"]
+    assert len(parses) == 3  # Scan parsed each page; extraction reused the trees
+
+    assert len(perform_search(query, tmp_path)) == 2
+    advanced = extract_advanced_snippets_with_options(paths[0], ["pip"])
+    assert advanced and len(parses) == 3
+
+    paths[2].write_text("<html><body><p>Install again</p></body></html>", encoding="utf-8")
+    os.utime(paths[2], ns=(0, 0))
+    assert perform_search(query, tmp_path)[1].match_details == "Install again"
+    assert len(parses) == 4  # Only the rewritten page
+
+
+def test_evicts_least_recently_used_documents_by_memory(tmp_path, make_download):
+    paths = make_download(tmp_path, pages_with_bodies(*(f"<p>Page {i}</p>" for i in range(3))))
+    probe = DocumentCache()
+    probe.get(paths[0]).soup()
+    cache = DocumentCache(max_bytes=int(probe.stats()["bytes"] * 2.5))  # Two parsed pages fit
+
+    first = cache.get(paths[0])
+    first.soup()
+    cache.get(paths[1]).soup()
+    assert cache.get(paths[0]) is first  # Hit, now most recently used
+    cache.get(paths[2]).soup()
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert cache.get(paths[0]) is first
+    assert cache.stats()["misses"] == 3  # paths[1] was evicted, nothing re-read yet
+    cache.get(paths[1])
+    assert cache.stats()["misses"] == 4
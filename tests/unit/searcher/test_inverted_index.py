@@ -0,0 +1,128 @@
+"""
+Unit tests for searcher/inverted_index.py
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from mcp_doc_retriever.searcher import inverted_index
+
+DOWNLOAD_ID = "idx_test"
+
+PAGES = {
+    "validators.html": "<html><head><title>Validators</title></head><body><p>Use the field_validator decorator.</p></body></html>",
+    "gather.html": "<html><body><main><p>Async gather runs tasks concurrently.</p></main></body></html>",
+    "both.html": "<html><body><p>Gather validator results.</p></body></html>",
+}
+
+
+@pytest.fixture
+def indexed_download(tmp_path, make_download):
+    """Creates a download with three pages and builds its inverted index."""
+    base_dir = tmp_path / "downloads"
+    make_download(
+        base_dir, PAGES, [{"local_path": "", "fetch_status": "failed_request"}], download_id=DOWNLOAD_ID
+    )
+    inverted_index.build_inverted_index(base_dir, DOWNLOAD_ID)
+    return base_dir
+
+
+def _rel(name):
+    return f"content/{DOWNLOAD_ID}/example.com/{name}"
+
+
+def test_tokenize_text_keeps_first_offset():
+    assert inverted_index.tokenize_text("Foo bar foo") == {"foo": 0, "bar": 4}
+
+
+def test_single_token_keywords_are_exact_substring_matches(indexed_download):
+    result = inverted_index.find_candidate_paths(indexed_download, DOWNLOAD_ID, ["VALID"])
+    assert result == ({_rel("validators.html"), _rel("both.html")}, True)
+
+
+def test_keywords_are_intersected(indexed_download):
+    result = inverted_index.find_candidate_paths(indexed_download, DOWNLOAD_ID, ["gather", "validator"])
+    assert result == ({_rel("both.html")}, True)
+
+
+def test_multi_token_keyword_is_not_exact(indexed_download):
+    paths, exact = inverted_index.find_candidate_paths(indexed_download, DOWNLOAD_ID, ["async gather"])
+    assert paths == {_rel("gather.html")}
+    assert exact is False
+
+
+def test_stale_index_is_ignored(indexed_download):
+    index_file = indexed_download / "index" / f"{DOWNLOAD_ID}.jsonl"
+    with index_file.open("a", encoding="utf-8") as f:
+        f.write("\n")
+    os.utime(index_file, ns=(0, 0))
+    assert inverted_index.find_candidate_paths(indexed_download, DOWNLOAD_ID, ["gather"]) is None
+
+
+def test_missing_index_returns_none(tmp_path):
+    (tmp_path / "index").mkdir()
+    assert inverted_index.find_candidate_paths(tmp_path, "nope", ["gather"]) is None
+
+
+def test_update_reindexes_only_changed_documents(indexed_download, monkeypatch):
+    host_dir = indexed_download / "content" / DOWNLOAD_ID / "example.com"
+    (host_dir / "gather.html").write_text("<html><body><p>Semaphores limit tasks.</p></body></html>", encoding="utf-8")
+    index_file = indexed_download / "index" / f"{DOWNLOAD_ID}.jsonl"
+    with index_file.open("a", encoding="utf-8") as f:
+        for name, md5 in (("gather.html", "changed"), ("validators.html", None)):
+            f.write(json.dumps({
+                "original_url": f"http://example.com/{Path(name).stem}",
+                "canonical_url": f"http://example.com/{Path(name).stem}",
+                "local_path": _rel(name),
+                "content_md5": md5,
+                "fetch_status": "success",
+            }) + "\n")
+
+    reindexed = []
+    original = inverted_index._index_document
+    monkeypatch.setattr(
+        inverted_index, "_index_document",
+        lambda conn, term_ids, local_path, *a: reindexed.append(local_path) or original(conn, term_ids, local_path, *a),
+    )
+    inverted_index.update_inverted_index(indexed_download, DOWNLOAD_ID)
+
+    assert reindexed == [_rel("gather.html")]
+    assert inverted_index.find_candidate_paths(indexed_download, DOWNLOAD_ID, ["semaphores"]) == ({_rel("gather.html")}, True)
+    assert inverted_index.find_candidate_paths(indexed_download, DOWNLOAD_ID, ["gather"]) == ({_rel("both.html")}, True)
+
+
+def test_recrawled_page_at_new_path_supersedes_old_copy(indexed_download):
+    blob = indexed_download / "blobs" / "ab" / "abc.html"
+    blob.parent.mkdir(parents=True)
+    blob.write_text("<html><body><p>Validators moved to pydantic-core.</p></body></html>", encoding="utf-8")
+    index_file = indexed_download / "index" / f"{DOWNLOAD_ID}.jsonl"
+    with index_file.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "original_url": "http://example.com/validators",
+            "canonical_url": "http://example.com/validators",
+            "local_path": "blobs/ab/abc.html",
+            "fetch_status": "success",
+        }) + "\n")
+    inverted_index.update_inverted_index(indexed_download, DOWNLOAD_ID)
+
+    assert inverted_index.find_candidate_paths(indexed_download, DOWNLOAD_ID, ["decorator"]) == (set(), True)
+    assert inverted_index.find_candidate_paths(indexed_download, DOWNLOAD_ID, ["moved"]) == ({"blobs/ab/abc.html"}, True)
+
+
+def test_recrawl_record_with_missing_file_keeps_old_copy(indexed_download):
+    index_file = indexed_download / "index" / f"{DOWNLOAD_ID}.jsonl"
+    with index_file.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "original_url": "http://example.com/validators",
+            "canonical_url": "http://example.com/validators",
+            "local_path": "blobs/ab/missing.html",
+            "fetch_status": "success",
+        }) + "\n")
+    inverted_index.update_inverted_index(indexed_download, DOWNLOAD_ID)
+
+    # Same choice as the manifest/full scan: the existing older copy stays searchable
+    assert inverted_index.find_candidate_paths(indexed_download, DOWNLOAD_ID, ["decorator"]) == (
+        {_rel("validators.html")}, True
+    )
@@ -0,0 +1,89 @@
+"""
+Unit tests for searcher/manifest.py
+"""
+import json
+
+import pytest
+
+from mcp_doc_retriever.searcher import manifest
+from mcp_doc_retriever.searcher.searcher import SearchRequest, perform_search
+
+DOWNLOAD_ID = "manifest_test"
+
+
+@pytest.fixture
+def download(tmp_path, make_download):
+    """A download with two pages, a failed fetch and a page outside the base dir."""
+    base_dir = tmp_path / "downloads"
+    make_download(
+        base_dir,
+        {
+            "a.html": "<html><body><p>Install the client</p></body></html>",
+            "b.html": "<html><body><p>Configure the client</p></body></html>",
+        },
+        [
+            {"local_path": "", "fetch_status": "failed_request"},
+            {"local_path": "../outside.html", "fetch_status": "success"},
+        ],
+        download_id=DOWNLOAD_ID,
+    )
+    return base_dir
+
+
+def test_manifest_holds_validated_pages_and_answers_searches(download, monkeypatch):
+    assert manifest.load_manifest(download, DOWNLOAD_ID) is None
+    manifest.build_manifest(download, DOWNLOAD_ID)
+    entries = manifest.load_manifest(download, DOWNLOAD_ID)
+    assert [(e.original_url, e.path) for e in entries] == [
+        ("http://example.com/a", f"content/{DOWNLOAD_ID}/example.com/a.html"),
+        ("http://example.com/b", f"content/{DOWNLOAD_ID}/example.com/b.html"),
+    ]
+    assert entries[0].size == len("<html><body><p>Install the client</p></body></html>")
+
+    # Searches no longer read the JSONL while the manifest is fresh
+    def no_jsonl(*args):
+        raise AssertionError("JSONL index was re-read")
+
+    monkeypatch.setattr("mcp_doc_retriever.searcher.searcher.collect_searchable_records", no_jsonl)
+    query = SearchRequest(download_id=DOWNLOAD_ID, scan_keywords=["install"], extract_selector="p")
+    results = perform_search(query, download)
+    assert [(r.original_url, r.local_path) for r in results] == [
+        ("http://example.com/a", f"content/{DOWNLOAD_ID}/example.com/a.html")
+    ]
+
+
+def test_changed_jsonl_makes_manifest_stale(download):
+    manifest.build_manifest(download, DOWNLOAD_ID)
+    host_dir = download / "content" / DOWNLOAD_ID / "example.com"
+    (host_dir / "c.html").write_text("<p>Install again</p>", encoding="utf-8")
+    with (download / "index" / f"{DOWNLOAD_ID}.jsonl").open("a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "original_url": "http://example.com/c",
+            "canonical_url": "http://example.com/c",
+            "local_path": f"content/{DOWNLOAD_ID}/example.com/c.html",
+            "fetch_status": "success",
+        }) + "\n")
+
+    assert manifest.load_manifest(download, DOWNLOAD_ID) is None
+    query = SearchRequest(download_id=DOWNLOAD_ID, scan_keywords=["install"], extract_selector="p")
+    assert {r.original_url for r in perform_search(query, download)} == {
+        "http://example.com/a",
+        "http://example.com/c",
+    }
+
+
+def test_results_keep_index_order_and_extraction_stops_at_limit(download, monkeypatch):
+    import mcp_doc_retriever.searcher.searcher as searcher_module
+
+    extracted = []
+
+    def fake_extract(path, selector):
+        extracted.append(path.name)
+        return ["the client"]
+
+    monkeypatch.setattr(searcher_module, "extract_text_with_selector", fake_extract)
+    manifest.build_manifest(download, DOWNLOAD_ID)
+    query = SearchRequest(download_id=DOWNLOAD_ID, scan_keywords=["client"], extract_selector="p", limit=1)
+    results = perform_search(query, download)
+    assert [r.original_url for r in results] == ["http://example.com/a"]
+    assert extracted == ["a.html"]
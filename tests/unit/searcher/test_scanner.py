@@ -0,0 +1,57 @@
+"""
+Unit tests for searcher/scanner.py
+"""
+import pytest
+
+from mcp_doc_retriever.searcher import scanner
+from mcp_doc_retriever.searcher.doc_cache import configure_document_cache, get_document_cache
+
+
+@pytest.fixture
+def pages(tmp_path):
+    """80 pages (more than two shards); every third one mentions 'gather'."""
+    paths = []
+    for i in range(80):
+        path = tmp_path / f"page{i:02d}.html"
+        word = "gather" if i % 3 == 0 else "other"
+        path.write_text(f"<html><body><p>Async {word} page {i}</p></body></html>", encoding="utf-8")
+        paths.append(path)
+    return tmp_path.resolve(), paths
+
+
+def test_parallel_scan_matches_sequential_order(pages):
+    base_dir, paths = pages
+    sequential = scanner.scan_files_for_keywords(paths, ["GATHER"], [base_dir])
+    try:
+        parallel = scanner.scan_files_for_keywords(paths, ["GATHER"], [base_dir], processes=2)
+    finally:
+        scanner.shutdown_scan_pool()
+    assert [p.name for p in sequential] == [f"page{i:02d}.html" for i in range(0, 80, 3)]
+    assert parallel == sequential
+
+
+def test_stopping_early_cancels_remaining_shards(pages, monkeypatch):
+    base_dir, paths = pages
+    monkeypatch.setattr(scanner, "SCAN_SHARD_SIZE", 4)
+    try:
+        scan = scanner.iter_scan_files_for_keywords(paths, ["gather"], [base_dir], processes=2)
+        first = [next(scan), next(scan)]
+        scan.close()
+        # The pool is still usable after a cancelled scan
+        again = list(scanner.iter_scan_files_for_keywords(paths[:8], ["gather"], [base_dir], processes=2))
+    finally:
+        scanner.shutdown_scan_pool()
+    assert [p.name for p in first] == ["page00.html", "page03.html"]
+    assert [p.name for p in again] == ["page00.html", "page03.html", "page06.html"]
+
+
+def test_workers_share_the_document_cache_budget(pages):
+    base_dir, paths = pages
+    budget = get_document_cache().max_bytes
+    configure_document_cache(40 * 1024 * 1024)
+    try:
+        scanner.scan_files_for_keywords(paths, ["gather"], [base_dir], processes=4)
+        assert scanner._scan_pool._initargs == (10 * 1024 * 1024,)
+    finally:
+        scanner.shutdown_scan_pool()
+        configure_document_cache(budget)
@@ -0,0 +1,46 @@
+"""
+Unit tests for the streaming search (searcher.iter_search)
+"""
+import pytest
+
+import mcp_doc_retriever.searcher.searcher as searcher_module
+from mcp_doc_retriever.searcher.searcher import SearchRequest, iter_search, perform_search
+
+DOWNLOAD_ID = "stream_test"
+
+
+@pytest.fixture
+def download(tmp_path, make_download):
+    base_dir = tmp_path / "downloads"
+    pages = {f"p{i}.html": f"<p>Install step {i}</p>" for i in range(6)}
+    make_download(base_dir, pages, download_id=DOWNLOAD_ID)
+    return base_dir
+
+
+def test_results_stream_lazily_and_stop_when_closed(download, monkeypatch):
+    extracted = []
+    real_extract = searcher_module.extract_text_with_selector
+
+    def counting_extract(path, selector):
+        extracted.append(path.name)
+        return real_extract(path, selector)
+
+    monkeypatch.setattr(searcher_module, "extract_text_with_selector", counting_extract)
+    query = SearchRequest(download_id=DOWNLOAD_ID, scan_keywords=["install"], extract_selector="p", limit=5)
+    results = iter_search(query, download)
+    assert extracted == []  # Nothing is read until results are consumed
+
+    first = next(results)
+    assert (first.original_url, extracted) == ("http://example.com/p0", ["p0.html"])
+    results.close()
+    assert extracted == ["p0.html"]
+
+    assert [r.original_url for r in perform_search(query, download)] == [
+        f"http://example.com/p{i}" for i in range(5)
+    ]
+
+
+def test_missing_index_raises_before_streaming(download):
+    query = SearchRequest(download_id="unknown", scan_keywords=["install"], extract_selector="p")
+    with pytest.raises(FileNotFoundError):
+        iter_search(query, download)
@@ -25,6 +25,10 @@ Third-Party Documentation:
 - pytest: https://docs.pytest.org/
 """
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from mcp_doc_retriever import utils
 import socket
@@ -144,6 +148,39 @@ def test_is_url_private_or_internal_default(url, expected_is_internal):
 # TODO: Add tests for ALLOW_TEST_INTERNAL_URLS=True if needed, potentially requiring config mocking.
 
 
+def test_is_url_private_or_internal_async_shares_cached_resolution(monkeypatch):
+    """Async SSRF check resolves each host once per cache, off the event loop."""
+    calls = []
+
+    async def fake_getaddrinfo(self, host, port, **kwargs):
+        calls.append(host)
+        await asyncio.sleep(0)
+        addresses = {"docs.example.org": "93.184.216.34", "intranet.example.org": "10.1.2.3"}
+        if host not in addresses:
+            raise socket.gaierror(f"unknown host {host}")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (addresses[host], port))]
+
+    monkeypatch.setattr(asyncio.BaseEventLoop, "getaddrinfo", fake_getaddrinfo)
+
+    async def run_checks():
+        cache = utils.DNSCache()
+        urls = [f"https://docs.example.org/page{i}" for i in range(5)]
+        urls += ["https://intranet.example.org/", "https://missing.example.org/", "https://missing.example.org/x"]
+        return await asyncio.gather(*(utils.is_url_private_or_internal_async(u, cache) for u in urls))
+
+    results = asyncio.run(run_checks())
+    assert results == [False] * 5 + [True, True, True]
+    assert sorted(calls) == ["docs.example.org", "intranet.example.org", "missing.example.org"]
+
+
+@pytest.mark.parametrize("url", ["http://127.0.0.1", "http://[::1]", "http://example.local", "http://192.168.1.1"])
+def test_is_url_private_or_internal_async_blocks_without_dns(url):
+    """IP literals and internal host patterns are decided without a lookup."""
+    cache = utils.DNSCache()
+    assert asyncio.run(utils.is_url_private_or_internal_async(url, cache)) is True
+    assert cache.lookups == 0
+
+
 # --- Tests for contains_all_keywords ---
 
 @pytest.mark.parametrize("text, keywords, expected", [
@@ -162,4 +199,41 @@ def test_is_url_private_or_internal_default(url, expected_is_internal):
 ])
 def test_contains_all_keywords(text, keywords, expected):
     """Tests the keyword checking logic."""
-    assert utils.contains_all_keywords(text, keywords) == expected
\ No newline at end of file
+    assert utils.contains_all_keywords(text, keywords) == expected
+
+# --- Tests for iterate_in_executor ---
+
+@pytest.mark.asyncio
+async def test_iterate_in_executor_yields_items_in_order():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert [item async for item in utils.iterate_in_executor(iter(range(3)), executor)] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_executor_cancelled_mid_step_closes_after_step():
+    started, release = threading.Event(), threading.Event()
+    closed = []
+
+    def slow_results():
+        try:
+            yield 1
+            started.set()
+            release.wait(5)
+            yield 2
+        finally:
+            closed.append(True)
+
+    async def consume():
+        async for _ in utils.iterate_in_executor(slow_results(), executor):
+            pass
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        task = asyncio.create_task(consume())
+        await asyncio.get_running_loop().run_in_executor(executor, started.wait, 5)
+        task.cancel()  # e.g. the client disconnected while next() runs
+        await asyncio.sleep(0.05)
+        assert not task.done() and not closed  # Waits for the running step
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task  # No "generator already executing" ValueError
+    assert closed == [True]